@@ -7,11 +7,42 @@ class Settings(BaseSettings):
     secret_key: str = "change-me"
     access_token_expire_minutes: int = 60
     refresh_token_expire_minutes: int = 60 * 24 * 7
+    refresh_token_prune_minutes: int = 60
+    auth_stateless_roles: bool = False
     database_url: str = "sqlite:///./robotics.db"
     upload_root: Path = Path("uploads")
     google_service_account_file: Path | None = None
     google_sheet_id: str | None = None
     allowed_hosts: list[str] = ["*"]
+    rate_limit_enabled: bool = True
+    rate_limit_login_ip_per_minute: int = 30
+    rate_limit_login_account_per_minute: int = 10
+    rate_limit_scan_per_minute: int = 240
+    rate_limit_upload_per_minute: int = 30
+    trusted_proxies: list[str] = ["127.0.0.1", "::1"]
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
+    password_scheme: str = "bcrypt"
+    password_hash_target_ms: int = 250
+    password_hash_autotune: bool = True
+    password_bcrypt_rounds: int | None = None
+    password_argon2_time_cost: int | None = None
+    password_argon2_memory_kib: int = 65536
+    export_mode: str = "columnar"
+    export_workers: int = 4
+    export_snapshot: bool = True
+    export_cache: bool = True
+    export_cache_max_mb: int = 256
+    my_work_cache_entries: int = 1024
+    inventory_usage_half_life_days: float = 14.0
+    inventory_reorder_cover_days: int = 30
+    warmup_enabled: bool = True
+    metrics_enabled: bool = True
+    metrics_token: str | None = None
+    metrics_dir: Path | None = None
+    metrics_query_warn_threshold: int = 20
+    profile_interval_ms: int = 10
+    slow_request_ms: int = 2000
 
     class Config:
         env_file = ".env"
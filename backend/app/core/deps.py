@@ -1,8 +1,10 @@
-from typing import Annotated, Callable
+from dataclasses import dataclass
+from typing import Annotated, Any, Callable
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
+from . import revocation
 from .config import get_settings
 from .database import get_session
 from .. import models
@@ -16,17 +18,32 @@ OptionalTokenDep = Annotated[str | None, Depends(oauth2_scheme_optional)]
 SessionDep = Annotated[Session, Depends(get_session)]
 
 
-def _user_from_token(token: str, session: Session) -> models.User:
+@dataclass(frozen=True)
+class Principal:
+    """Who is calling, as far as authorization needs to know."""
+
+    id: int
+    role: models.Role
+
+
+def _access_claims(token: str) -> dict[str, Any]:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
     except jwt.PyJWTError as exc:  # type: ignore[attr-defined]
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
     if payload.get("type") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
-    user_id = payload.get("sub")
-    if not user_id:
+    if not payload.get("sub"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject")
-    statement = select(models.User).where(models.User.id == int(user_id))
+    return payload
+
+
+def _user_from_token(token: str, session: Session) -> models.User:
+    return _user_from_claims(_access_claims(token), session)
+
+
+def _user_from_claims(payload: dict[str, Any], session: Session) -> models.User:
+    statement = select(models.User).where(models.User.id == int(payload["sub"]))
     user = session.exec(statement).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
@@ -51,3 +68,38 @@ def require_roles(*roles: str) -> Callable[[models.User], models.User]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
         return user
     return dependency
+
+
+def _principal_from_claims(payload: dict[str, Any]) -> Principal | None:
+    """Trust the signed claims if nothing about the user changed since issue."""
+    if not settings.auth_stateless_roles or payload.get("act") is not True:
+        return None
+    user_id = int(payload["sub"])
+    roles = payload.get("roles") or []
+    if len(roles) != 1 or roles[0] not in models.Role._value2member_map_:
+        return None
+    if not revocation.is_current(user_id, payload.get("epoch"), payload.get("gen")):
+        return None
+    return Principal(id=user_id, role=models.Role(roles[0]))
+
+
+def get_principal(token: TokenDep, session: SessionDep) -> Principal:
+    """Authenticate without loading the user row when ``AUTH_STATELESS_ROLES`` allows.
+
+    For endpoints that only need the caller's id and role; falls back to the
+    database whenever the token predates a role, status or account change.
+    """
+    payload = _access_claims(token)
+    principal = _principal_from_claims(payload)
+    if principal is None:
+        user = _user_from_claims(payload, session)
+        principal = Principal(id=user.id, role=user.role)
+    return principal
+
+
+def require_role_claims(*roles: str) -> Callable[[Principal], Principal]:
+    def dependency(principal: Annotated[Principal, Depends(get_principal)]) -> Principal:
+        if principal.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+        return principal
+    return dependency
@@ -0,0 +1,126 @@
+"""Password-hash cost calibration.
+
+Picks bcrypt rounds (or argon2 time cost) so one verify takes roughly
+``PASSWORD_HASH_TARGET_MS`` on the current host. The resulting policy keeps a
+one-step tolerance either side of the chosen cost, so stored hashes are only
+rehashed at login when they are at least twice as fast or slow as intended.
+"""
+from __future__ import annotations
+import math
+import time
+from dataclasses import dataclass
+from typing import Any
+from passlib.hash import argon2, bcrypt
+from .config import Settings
+
+SCHEMES = ("bcrypt", "argon2")
+# Floors below which we will not go, however slow the host is.
+BCRYPT_MIN_ROUNDS = 10
+ARGON2_MIN_TIME_COST = 2
+PASSLIB_BCRYPT_ROUNDS = 12
+
+_PROBE_PASSWORD = "calibration-probe"
+
+
+@dataclass(frozen=True)
+class HashPolicy:
+    scheme: str
+    cost: int
+    memory_kib: int | None = None
+    measured_ms: float | None = None
+
+    def context_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for ``CryptContext`` / ``CryptContext.update``."""
+        low, high = max(self.cost - 1, 1), self.cost + 1
+        if self.scheme == "argon2":
+            return {
+                "schemes": ["argon2", "bcrypt"],
+                "default": "argon2",
+                "deprecated": ["bcrypt"],
+                "argon2__default_rounds": self.cost,
+                "argon2__min_rounds": low,
+                "argon2__max_rounds": high,
+                "argon2__memory_cost": self.memory_kib,
+            }
+        rounds = bcrypt_rounds(self.cost)
+        return {
+            "schemes": ["bcrypt"],
+            "default": "bcrypt",
+            "deprecated": [],
+            "bcrypt__default_rounds": rounds,
+            "bcrypt__min_rounds": bcrypt_rounds(rounds - 1),
+            "bcrypt__max_rounds": bcrypt_rounds(rounds + 1),
+        }
+
+    def env_lines(self) -> list[str]:
+        lines = [f"PASSWORD_SCHEME={self.scheme}"]
+        if self.scheme == "argon2":
+            lines.append(f"PASSWORD_ARGON2_TIME_COST={self.cost}")
+            lines.append(f"PASSWORD_ARGON2_MEMORY_KIB={self.memory_kib}")
+        else:
+            lines.append(f"PASSWORD_BCRYPT_ROUNDS={self.cost}")
+        return lines
+
+
+def bcrypt_rounds(rounds: int) -> int:
+    """Clamp a bcrypt cost to what we accept: BCRYPT_MIN_ROUNDS up to bcrypt's own limit of 31."""
+    return min(max(rounds, BCRYPT_MIN_ROUNDS), 31)
+
+
+def _best_ms(handler: Any, samples: int) -> float:
+    best = math.inf
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(_PROBE_PASSWORD)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def require_backend(scheme: str) -> None:
+    if scheme not in SCHEMES:
+        raise RuntimeError(f"Unknown PASSWORD_SCHEME {scheme!r}; expected one of {', '.join(SCHEMES)}")
+    if scheme == "argon2" and not argon2.has_backend():
+        raise RuntimeError("PASSWORD_SCHEME=argon2 needs the argon2-cffi package (pip install argon2-cffi)")
+
+
+def calibrate_bcrypt(target_ms: float, samples: int = 3) -> HashPolicy:
+    # Each bcrypt round doubles the work, so time a cheap cost and extrapolate,
+    # then confirm once at the chosen cost.
+    probe_rounds = 8
+    probe_ms = _best_ms(bcrypt.using(rounds=probe_rounds), samples)
+    steps = math.floor(math.log2(max(target_ms, 1) / max(probe_ms, 0.01)))
+    rounds = bcrypt_rounds(probe_rounds + steps)
+    return HashPolicy("bcrypt", rounds, measured_ms=_best_ms(bcrypt.using(rounds=rounds), 1))
+
+
+def calibrate_argon2(target_ms: float, memory_kib: int, samples: int = 3) -> HashPolicy:
+    require_backend("argon2")
+    # Argon2 time scales roughly linearly with time_cost at a fixed memory cost.
+    per_pass_ms = _best_ms(argon2.using(rounds=1, memory_cost=memory_kib), samples)
+    time_cost = max(math.floor(target_ms / max(per_pass_ms, 0.01)), ARGON2_MIN_TIME_COST)
+    measured = _best_ms(argon2.using(rounds=time_cost, memory_cost=memory_kib), 1)
+    return HashPolicy("argon2", time_cost, memory_kib=memory_kib, measured_ms=measured)
+
+
+def calibrate(scheme: str, target_ms: float, memory_kib: int = 65536) -> HashPolicy:
+    require_backend(scheme)
+    if scheme == "argon2":
+        return calibrate_argon2(target_ms, memory_kib)
+    return calibrate_bcrypt(target_ms)
+
+
+def policy_from_settings(settings: Settings) -> HashPolicy:
+    """Configured costs win; otherwise calibrate (or fall back to passlib's defaults)."""
+    scheme = settings.password_scheme.lower()
+    require_backend(scheme)
+    if scheme == "argon2":
+        if settings.password_argon2_time_cost:
+            return HashPolicy("argon2", settings.password_argon2_time_cost, memory_kib=settings.password_argon2_memory_kib)
+        if settings.password_hash_autotune:
+            return calibrate_argon2(settings.password_hash_target_ms, settings.password_argon2_memory_kib)
+        return HashPolicy("argon2", argon2.default_rounds, memory_kib=settings.password_argon2_memory_kib)
+    if settings.password_bcrypt_rounds:
+        return HashPolicy("bcrypt", bcrypt_rounds(settings.password_bcrypt_rounds))
+    if settings.password_hash_autotune:
+        return calibrate_bcrypt(settings.password_hash_target_ms)
+    return HashPolicy("bcrypt", PASSLIB_BCRYPT_ROUNDS)
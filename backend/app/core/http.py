@@ -0,0 +1,9 @@
+"""Conditional-request helpers shared by routers that send ETags."""
+from __future__ import annotations
+from fastapi import Request
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match already names ``etag``."""
+    candidates = request.headers.get("if-none-match", "")
+    return any(tag.strip() in (etag, "*") for tag in candidates.split(","))
@@ -0,0 +1,314 @@
+"""Per-route request and SQL metrics, rendered in the Prometheus text format.
+
+:class:`MetricsMiddleware` is plain ASGI, so it times the whole response
+(streamed bodies included) without the per-request task and queue that
+``BaseHTTPMiddleware`` adds. Routes are labelled by their path template, so
+``/jobs/{job_id}`` is one series whatever the id. SQL statements are counted
+through cursor events on the engine into a per-request record held in a
+context variable; the threadpool that runs sync endpoints copies the context,
+so queries issued there land on the request that caused them.
+
+A request that runs more than ``METRICS_QUERY_WARN_THRESHOLD`` statements is
+logged with its most repeated statement, which is usually a per-row lookup
+(N+1) that should be a join or an ``IN`` query.
+
+Metrics are kept per process. With several workers set ``METRICS_DIR``: each
+worker then writes a snapshot there at most once a second and ``/metrics``
+adds up the snapshots of all live workers.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from sqlalchemy import Engine, event
+from . import security
+from .config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger("uvicorn.error")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+WARN_INTERVAL = 60.0
+DUMP_INTERVAL = 1.0
+UNMATCHED = "<unmatched>"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _histogram(buckets: tuple) -> dict[str, Any]:
+    return {"counts": [0] * (len(buckets) + 1), "sum": 0.0}
+
+
+def _observe(histogram: dict[str, Any], buckets: tuple, value: float) -> None:
+    index = len(buckets)
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            index = i
+            break
+    histogram["counts"][index] += 1
+    histogram["sum"] += value
+
+
+def _new_route() -> dict[str, Any]:
+    return {
+        "status": {},
+        "latency": _histogram(LATENCY_BUCKETS),
+        "size": _histogram(SIZE_BUCKETS),
+        "queries": _histogram(QUERY_BUCKETS),
+        "db_seconds": 0.0,
+        "query_warnings": 0,
+    }
+
+
+# (method, route) -> counters. Only the event loop thread touches this.
+_routes: dict[tuple[str, str], dict[str, Any]] = {}
+# id(scope) -> (scope, root_path) for requests being served.
+_in_flight: dict[int, tuple[dict[str, Any], str]] = {}
+_last_warning: dict[tuple[str, str], float] = {}
+_last_dump = 0.0
+
+
+def _route_stats(key: tuple[str, str]) -> dict[str, Any]:
+    stats = _routes.get(key)
+    if stats is None:
+        stats = _routes[key] = _new_route()
+    return stats
+
+
+def instrument(engine: Engine) -> None:
+    """Count statements and their time for whichever request is running them."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _current.get() is not None:
+            conn.info["metrics_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = _current.get()
+        started = conn.info.pop("metrics_started", None)
+        if stats is None or started is None:
+            return
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+        stats.statements[statement] += 1
+
+
+def route_label(scope: dict[str, Any], root_path: str) -> str:
+    """Route template for a request, so metrics group by endpoint rather than by URL."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    # Mounts (static uploads) set no route but extend root_path.
+    mounted = scope.get("root_path", "")
+    if mounted != root_path:
+        return mounted[len(root_path):] + "/{path}"
+    return UNMATCHED
+
+
+def _warn_queries(key: tuple[str, str], stats: RequestStats) -> None:
+    now = time.monotonic()
+    if now - _last_warning.get(key, 0.0) < WARN_INTERVAL:
+        return
+    _last_warning[key] = now
+    statement, repeats = stats.statements.most_common(1)[0]
+    logger.warning(
+        "%s %s ran %d SQL statements (%.0f ms); most repeated x%d: %s",
+        key[0],
+        key[1],
+        stats.queries,
+        stats.db_seconds * 1000,
+        repeats,
+        " ".join(statement.split())[:200],
+    )
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        root_path = scope.get("root_path", "")
+        request = RequestStats()
+        token = _current.set(request)
+        status_code = 500
+        size = 0
+        _in_flight[id(scope)] = (scope, root_path)
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            del _in_flight[id(scope)]
+            key = (scope["method"], route_label(scope, root_path))
+            stats = _route_stats(key)
+            status = str(status_code)
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+            _observe(stats["latency"], LATENCY_BUCKETS, time.perf_counter() - started)
+            _observe(stats["size"], SIZE_BUCKETS, size)
+            _observe(stats["queries"], QUERY_BUCKETS, request.queries)
+            stats["db_seconds"] += request.db_seconds
+            if request.queries > settings.metrics_query_warn_threshold:
+                stats["query_warnings"] += 1
+                _warn_queries(key, request)
+            if settings.metrics_dir is not None:
+                _maybe_dump()
+
+
+def _snapshot() -> dict[str, list[list[Any]]]:
+    # Requests are labelled with their route once routing has run.
+    in_flight = Counter((scope["method"], route_label(scope, root)) for scope, root in _in_flight.values())
+    return {
+        "routes": [[method, route, stats] for (method, route), stats in _routes.items()],
+        "in_flight": [[method, route, count] for (method, route), count in in_flight.items()],
+        "password_hash_pending": security.password_queue_depth(),
+    }
+
+
+def _maybe_dump() -> None:
+    global _last_dump
+    now = time.monotonic()
+    if now - _last_dump < DUMP_INTERVAL:
+        return
+    _last_dump = now
+    directory = Path(settings.metrics_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"worker-{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(_snapshot()), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(into: dict[str, Any], other: dict[str, Any]) -> None:
+    for status, count in other["status"].items():
+        into["status"][status] = into["status"].get(status, 0) + count
+    for name in ("latency", "size", "queries"):
+        into[name]["counts"] = [a + b for a, b in zip(into[name]["counts"], other[name]["counts"])]
+        into[name]["sum"] += other[name]["sum"]
+    into["db_seconds"] += other["db_seconds"]
+    into["query_warnings"] += other["query_warnings"]
+
+
+def _collect() -> tuple[dict[tuple[str, str], dict[str, Any]], Counter, int]:
+    """This worker's live counters plus the latest snapshot of every other live worker."""
+    merged: dict[tuple[str, str], dict[str, Any]] = {}
+    in_flight: Counter = Counter()
+    hash_pending = 0
+    snapshots = [_snapshot()]
+    if settings.metrics_dir is not None:
+        for path in Path(settings.metrics_dir).glob("worker-*.json"):
+            pid = int(path.stem.split("-", 1)[1])
+            if pid == os.getpid():
+                continue
+            if not _alive(pid):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+    for snapshot in snapshots:
+        for method, route, stats in snapshot["routes"]:
+            key = (method, route)
+            if key not in merged:
+                merged[key] = _new_route()
+            _merge(merged[key], stats)
+        for method, route, count in snapshot["in_flight"]:
+            in_flight[(method, route)] += count
+        hash_pending += snapshot.get("password_hash_pending", 0)
+    return merged, in_flight, hash_pending
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _render_histogram(lines: list[str], name: str, buckets: tuple, histogram: dict[str, Any], labels: dict[str, str]) -> None:
+    cumulative = 0
+    for bound, count in zip((*buckets, "+Inf"), histogram["counts"]):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=str(bound))} {cumulative}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram['sum']:.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+
+
+def render() -> str:
+    collected, in_flight, hash_pending = _collect()
+    routes = sorted(collected.items())
+    lines: list[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    family("http_requests_total", "counter", "Requests by route and status code.")
+    for (method, route), stats in routes:
+        for status, count in sorted(stats["status"].items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+    family("http_requests_in_flight", "gauge", "Requests being served; ones not yet routed count as <unmatched>.")
+    for (method, route), count in sorted(in_flight.items()):
+        lines.append(f"http_requests_in_flight{_labels(method=method, route=route)} {count}")
+    for name, key, buckets, help_text in (
+        ("http_request_duration_seconds", "latency", LATENCY_BUCKETS, "Time to the last byte of the response."),
+        ("http_response_size_bytes", "size", SIZE_BUCKETS, "Response body size."),
+        ("http_request_db_queries", "queries", QUERY_BUCKETS, "SQL statements run per request."),
+    ):
+        family(name, "histogram", help_text)
+        for (method, route), stats in routes:
+            if sum(stats[key]["counts"]):
+                _render_histogram(lines, name, buckets, stats[key], {"method": method, "route": route})
+    family("http_request_db_seconds_total", "counter", "Time spent executing SQL statements.")
+    for (method, route), stats in routes:
+        lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} {stats['db_seconds']:.6f}")
+    family(
+        "http_request_db_query_warnings_total",
+        "counter",
+        "Requests that ran more SQL statements than METRICS_QUERY_WARN_THRESHOLD.",
+    )
+    for (method, route), stats in routes:
+        lines.append(f"http_request_db_query_warnings_total{_labels(method=method, route=route)} {stats['query_warnings']}")
+    family("password_hash_pending", "gauge", "Password hash and verify calls waiting for or running on the hash pool.")
+    lines.append(f"password_hash_pending {hash_pending}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,307 @@
+"""Versioned schema migrations.
+
+``schema_version`` holds one row: the number of migration steps applied.
+When it matches ``LATEST`` startup costs that single read and nothing else.
+Otherwise the pending steps run in order inside one ``BEGIN IMMEDIATE``
+transaction, so concurrent workers serialize and a failed step leaves the
+database untouched. A database without tables is created from the models
+and stamped as current without running any step.
+
+Append new steps to ``STEPS``; never edit or reorder shipped ones. Tables
+that are new in a release come from ``create_all`` before the steps run and
+missing model indexes are created after them, so steps only need to alter
+existing tables and move data.
+"""
+from __future__ import annotations
+import logging
+import time
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel
+from ..services import inventory_usage
+from . import revocation
+
+Step = Callable[[Connection], None]
+logger = logging.getLogger("uvicorn.error")
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info('{table}')")}
+
+
+def _add_columns(conn: Connection, table: str, columns: dict[str, str]) -> set[str]:
+    existing = _columns(conn, table)
+    added = set()
+    for name, ddl in columns.items():
+        if name not in existing:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+            added.add(name)
+    return added
+
+
+def _rebuild_attendance(conn: Connection) -> None:
+    attendance_cols = list(conn.exec_driver_sql("PRAGMA table_info('attendanceentry')"))
+    names = {row[1] for row in attendance_cols}
+    user_col = next((row for row in attendance_cols if row[1] == "user_id"), None)
+    if "recorded_student_id" in names and "recorded_barcode_id" in names and not (user_col and user_col[3] == 1):
+        return
+    conn.exec_driver_sql("ALTER TABLE attendanceentry RENAME TO attendanceentry_old")
+    conn.exec_driver_sql(
+        """
+        CREATE TABLE attendanceentry (
+            id INTEGER NOT NULL PRIMARY KEY,
+            user_id INTEGER NULL REFERENCES user (id),
+            recorded_student_id VARCHAR,
+            recorded_barcode_id VARCHAR,
+            check_in DATETIME,
+            check_out DATETIME,
+            status VARCHAR(11) NOT NULL,
+            note VARCHAR
+        )
+        """
+    )
+    conn.exec_driver_sql(
+        """
+        INSERT INTO attendanceentry (
+            id, user_id, recorded_student_id, recorded_barcode_id,
+            check_in, check_out, status, note
+        )
+        SELECT id, user_id, NULL, NULL, check_in, check_out, status, note
+        FROM attendanceentry_old
+        """
+    )
+    conn.exec_driver_sql("DROP TABLE attendanceentry_old")
+
+
+def _legacy_columns(conn: Connection) -> None:
+    """Bring a database from before versioning up to the columns it expects."""
+    _add_columns(conn, "user", {"student_id": "VARCHAR"})
+    _rebuild_attendance(conn)
+    added = _add_columns(
+        conn,
+        "shopjob",
+        {"queue_position": "INTEGER DEFAULT 0", "claimed_by_id": "INTEGER", "claimed_at": "DATETIME"},
+    )
+    if "queue_position" in added:
+        conn.exec_driver_sql(
+            """
+            UPDATE shopjob SET queue_position = ranked.position
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY shop ORDER BY created_at, id) AS position
+                FROM shopjob
+            ) AS ranked
+            WHERE ranked.id = shopjob.id
+            """
+        )
+    added = _add_columns(
+        conn,
+        "inventoryitem",
+        {"vendor_link": "VARCHAR", "part_type": "VARCHAR", "vendor_name": "VARCHAR"},
+    )
+    if "part_type" in added:
+        conn.exec_driver_sql("UPDATE inventoryitem SET part_type = 'custom' WHERE part_type IS NULL")
+    _add_columns(
+        conn,
+        "manufacturingpart",
+        {
+            "student_eta_minutes": "INTEGER",
+            "eta_note": "VARCHAR",
+            "eta_updated_at": "DATETIME",
+            "eta_by_id": "INTEGER",
+            "eta_target": "DATETIME",
+            "actual_start": "DATETIME",
+            "actual_complete": "DATETIME",
+            "cad_file_name": "VARCHAR",
+            "cad_file_path": "VARCHAR",
+            "cam_file_name": "VARCHAR",
+            "cam_file_path": "VARCHAR",
+        },
+    )
+
+
+def _assignments_from_json(conn: Connection) -> None:
+    """Move the JSON assignee arrays on manufacturingpart into manufacturing_assignment."""
+    existing = _columns(conn, "manufacturingpart")
+    for column, role in (("assigned_student_ids", "student"), ("assigned_lead_ids", "lead")):
+        if column not in existing:
+            continue
+        conn.exec_driver_sql(
+            f"""
+            INSERT OR IGNORE INTO manufacturing_assignment (part_id, role, user_id, position)
+            SELECT part.id, '{role}', CAST(ids.value AS INTEGER), CAST(ids.key AS INTEGER)
+            FROM manufacturingpart AS part, json_each(part.{column}) AS ids
+            WHERE ids.value IN (SELECT id FROM user)
+            """
+        )
+        # DROP COLUMN needs SQLite 3.35+.
+        conn.exec_driver_sql(f"ALTER TABLE manufacturingpart DROP COLUMN {column}")
+
+
+def _shared_versions(conn: Connection) -> None:
+    """Nothing to move: versions used to live in each process's memory.
+
+    The step exists so databases already at version 2 run create_all, which
+    adds the shared_version table.
+    """
+
+
+def _inventory_indexes(conn: Connection) -> None:
+    """Indexes for paging inventory by name and filtering by vendor; _finish creates them."""
+
+
+def _inventory_usage(conn: Connection) -> None:
+    """Add the decayed usage columns and fold each item's past consumption into them.
+
+    _finish creates the partial low-stock index.
+    """
+    added = _add_columns(conn, "inventoryitem", {"usage_decayed": "FLOAT NOT NULL DEFAULT 0", "usage_at": "DATETIME"})
+    if "usage_decayed" not in added:
+        return
+    reasons = ", ".join(f"'{reason.name}'" for reason in inventory_usage.CONSUMING_REASONS)
+    rows = conn.exec_driver_sql(
+        f"""
+        SELECT item_id, delta, created_at FROM inventorytransaction
+        WHERE delta < 0 AND reason IN ({reasons})
+        ORDER BY item_id, created_at
+        """
+    )
+    usage: dict[int, tuple[float, datetime]] = {}
+    for item_id, delta, created_at in rows:
+        at = datetime.fromisoformat(created_at)
+        total, since = usage.get(item_id, (0.0, None))
+        usage[item_id] = (inventory_usage.decayed(total, since, at) - delta, at)
+    if not usage:
+        return
+    conn.exec_driver_sql(
+        "UPDATE inventoryitem SET usage_decayed = ?, usage_at = ? WHERE id = ?",
+        [(total, at.strftime("%Y-%m-%d %H:%M:%S.%f"), item_id) for item_id, (total, at) in usage.items()],
+    )
+
+
+SKU_INDEX = "ix_inventoryitem_sku"
+
+
+def sku_index_unique(conn: Connection) -> bool:
+    return any(row[1] == SKU_INDEX and row[2] for row in conn.exec_driver_sql("PRAGMA index_list('inventoryitem')"))
+
+
+def shared_skus(conn: Connection, limit: int = 20) -> list[str]:
+    """SKUs carried by more than one item; blank SKUs do not count."""
+    return [
+        row[0]
+        for row in conn.exec_driver_sql(
+            "SELECT sku FROM inventoryitem WHERE TRIM(sku) != '' GROUP BY sku HAVING COUNT(*) > 1 ORDER BY sku LIMIT ?",
+            (limit,),
+        )
+    ]
+
+
+def make_sku_unique(conn: Connection) -> None:
+    conn.exec_driver_sql("UPDATE inventoryitem SET sku = NULL WHERE TRIM(sku) = ''")
+    conn.exec_driver_sql(f"DROP INDEX IF EXISTS {SKU_INDEX}")
+    conn.exec_driver_sql(f"CREATE UNIQUE INDEX {SKU_INDEX} ON inventoryitem (sku)")
+
+
+def _unique_sku(conn: Connection) -> None:
+    """Make sku unique so imports can upsert on it.
+
+    Older imports always inserted, so a database may hold the same SKU on
+    several items. Those are left for someone to merge; the import endpoint
+    reports them and makes the index unique once they are gone.
+    """
+    if sku_index_unique(conn):
+        return
+    shared = shared_skus(conn)
+    if shared:
+        logger.warning("SKUs shared by several inventory items, imports cannot upsert until merged: %s", ", ".join(shared))
+        return
+    make_sku_unique(conn)
+
+
+def _auth_epoch(conn: Connection) -> None:
+    """Nothing to move: the epoch used to be seeded by the first request needing it.
+
+    That request could already hold the write lock, so _finish seeds it now.
+    """
+
+
+STEPS: list[Step] = [
+    _legacy_columns,
+    _assignments_from_json,
+    _shared_versions,
+    _inventory_indexes,
+    _inventory_usage,
+    _unique_sku,
+    _auth_epoch,
+]
+LATEST = len(STEPS)
+
+
+def read_version(conn: Connection) -> int | None:
+    """The applied version, or None for a database that predates versioning."""
+    try:
+        row = conn.exec_driver_sql("SELECT version FROM schema_version").first()
+    except OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def _is_empty(conn: Connection) -> bool:
+    return conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1").first() is None
+
+
+def _stamp(conn: Connection, version: int) -> None:
+    conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+    conn.exec_driver_sql("DELETE FROM schema_version")
+    conn.exec_driver_sql("INSERT INTO schema_version (version) VALUES (?)", (version,))
+
+
+def _finish(conn: Connection) -> None:
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    conn.exec_driver_sql("INSERT OR IGNORE INTO appconfig (id, restrict_attendance_to_schedule) VALUES (1, 1)")
+    revocation.seed_epoch(conn)
+
+
+def pending(version: int | None) -> list[Step]:
+    return STEPS[version or 0:]
+
+
+def upgrade(engine: Engine, dry_run: bool = False) -> list[tuple[str, float]]:
+    """Apply pending steps; returns ``(step name, seconds)`` for each one run.
+
+    With ``dry_run`` the steps run exactly as they would and are then rolled back.
+    """
+    with engine.connect() as conn:
+        if read_version(conn) == LATEST:
+            return []
+        conn.rollback()
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock: another worker may have just finished.
+            version = read_version(conn)
+            applied: list[tuple[str, float]] = []
+            if version != LATEST:
+                fresh = version is None and _is_empty(conn)
+                started = time.perf_counter()
+                SQLModel.metadata.create_all(conn)
+                if fresh:
+                    applied.append(("create_all", time.perf_counter() - started))
+                else:
+                    for step in pending(version):
+                        started = time.perf_counter()
+                        step(conn)
+                        applied.append((step.__name__.lstrip("_"), time.perf_counter() - started))
+                _finish(conn)
+                _stamp(conn, LATEST)
+        except BaseException:
+            conn.rollback()
+            raise
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+        return applied
@@ -0,0 +1,200 @@
+"""Sampling profiler over the threads of this worker process.
+
+Samples come from ``sys._current_frames()``: the Python stack of every thread
+is read at a fixed interval without tracing hooks, so the code being measured
+runs at full speed and only the sampler pays. Stacks are folded into the
+collapsed format (``frame;frame;frame count`` per line, root first, thread
+name as the root) that flamegraph.pl, speedscope and inferno read directly.
+Threads parked waiting for work (idle threadpool workers, the event loop in
+``select``) are left out unless asked for.
+
+:class:`SlowRequestMiddleware` uses the same sampler as a watchdog. Once a
+request has run for ``SLOW_REQUEST_MS``, the busy threads are sampled until it
+finishes, and the request is logged and kept with its samples. Sync
+endpoints run on threadpool threads that a stack does not tie to a request,
+so the samples cover every busy thread while the request was slow.
+"""
+from __future__ import annotations
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Any
+from .config import get_settings
+from .metrics import route_label
+
+settings = get_settings()
+logger = logging.getLogger("uvicorn.error")
+
+# (file name, function) of frames a thread sits in while it has nothing to do.
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("connection.py", "wait"),
+    ("socket.py", "accept"),
+}
+SLOW_REQUEST_HISTORY = 50
+# Slow by design.
+UNWATCHED_PATHS = {"/debug/profile"}
+SLOW_REQUEST_TOP_STACKS = 20
+
+_profile_lock = threading.Lock()
+_labels: dict[Any, str] = {}
+# Threads running a sampler, left out of every sample.
+_samplers: set[int] = set()
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    label = _labels.get(code)
+    if label is None:
+        module = frame.f_globals.get("__name__") or Path(code.co_filename).stem
+        label = _labels[code] = f"{module}:{code.co_qualname}"
+    return label
+
+
+def _is_idle(frame: FrameType) -> bool:
+    return (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in IDLE_LEAVES
+
+
+def _fold(frame: FrameType) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def take_sample(into: Counter, include_idle: bool = False) -> None:
+    """Add one folded stack per thread to ``into``."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    for ident, frame in sys._current_frames().items():
+        if ident in _samplers or (not include_idle and _is_idle(frame)):
+            continue
+        name = names.get(ident, f"thread-{ident}").replace(";", ":").replace(" ", "_")
+        into[f"{name};{_fold(frame)}"] += 1
+
+
+def collapsed(samples: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+def profile(seconds: float, interval: float, include_idle: bool = False) -> tuple[Counter, int] | None:
+    """Sample every thread for ``seconds``; None if a profile is already running."""
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    _samplers.add(threading.get_ident())
+    try:
+        samples: Counter = Counter()
+        ticks = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            take_sample(samples, include_idle)
+            ticks += 1
+            time.sleep(interval)
+        return samples, ticks
+    finally:
+        _samplers.discard(threading.get_ident())
+        _profile_lock.release()
+
+
+@dataclass
+class _Tracked:
+    method: str
+    path: str
+    started: float
+    samples: Counter = field(default_factory=Counter)
+
+
+class _Watchdog:
+    def __init__(self, threshold: float, interval: float) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.active: dict[int, _Tracked] = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def track(self, key: int, tracked: _Tracked) -> None:
+        with self.lock:
+            self.active[key] = tracked
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="slow-request-watchdog", daemon=True)
+                self.thread.start()
+        self.wake.set()
+
+    def untrack(self, key: int) -> _Tracked:
+        with self.lock:
+            return self.active.pop(key)
+
+    def _run(self) -> None:
+        _samplers.add(threading.get_ident())
+        while True:
+            with self.lock:
+                oldest = min((tracked.started for tracked in self.active.values()), default=None)
+            if oldest is None:
+                # Nothing in flight: sleep until a request arrives.
+                self.wake.wait()
+                self.wake.clear()
+                continue
+            due = oldest + self.threshold - time.perf_counter()
+            if due > 0:
+                self.wake.wait(due)
+                self.wake.clear()
+                continue
+            sample: Counter = Counter()
+            take_sample(sample)
+            now = time.perf_counter()
+            with self.lock:
+                for tracked in self.active.values():
+                    if now - tracked.started >= self.threshold:
+                        tracked.samples.update(sample)
+            time.sleep(self.interval)
+
+
+recent_slow: deque[dict[str, Any]] = deque(maxlen=SLOW_REQUEST_HISTORY)
+
+
+class SlowRequestMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+        self.watchdog = _Watchdog(settings.slow_request_ms / 1000, settings.profile_interval_ms / 1000)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in UNWATCHED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        root_path = scope.get("root_path", "")
+        key = id(scope)
+        self.watchdog.track(key, _Tracked(scope["method"], scope["path"], time.perf_counter()))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            tracked = self.watchdog.untrack(key)
+            elapsed = time.perf_counter() - tracked.started
+            if elapsed >= self.watchdog.threshold:
+                self._record(tracked, route_label(scope, root_path), elapsed)
+
+    def _record(self, tracked: _Tracked, route: str, elapsed: float) -> None:
+        top = tracked.samples.most_common(SLOW_REQUEST_TOP_STACKS)
+        recent_slow.append(
+            {
+                "method": tracked.method,
+                "path": tracked.path,
+                "route": route,
+                "ms": round(elapsed * 1000, 1),
+                "finished_at": datetime.utcnow(),
+                "samples": sum(tracked.samples.values()),
+                "stacks": [{"stack": stack, "count": count} for stack, count in top],
+            }
+        )
+        hottest = ";".join(top[0][0].split(";")[-3:]) if top else "no samples"
+        logger.warning("Slow request %s %s took %.0f ms; hottest stack: %s", tracked.method, tracked.path, elapsed * 1000, hottest)
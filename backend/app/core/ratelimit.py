@@ -0,0 +1,123 @@
+"""In-process token-bucket rate limiting.
+
+Each bucket refills continuously at ``per_minute / 60`` tokens per second up
+to ``per_minute`` tokens, which behaves like a sliding one-minute window
+without keeping per-request timestamps. A check is a dict lookup plus a few
+float operations. Buckets are not locked: a race between two threads can at
+worst let one extra request through, which is fine for throttling.
+
+Buckets live in each worker process, so with ``--workers N`` a client can
+make up to N times the configured rate.
+
+Behind a reverse proxy every request arrives from the proxy's address, so
+clients are keyed by ``X-Forwarded-For`` / ``X-Real-IP`` when, and only
+when, the peer is listed in ``TRUSTED_PROXIES``.
+"""
+from __future__ import annotations
+import ipaddress
+import math
+import time
+from functools import lru_cache
+from typing import Callable
+from fastapi import HTTPException, Request, status
+from .config import get_settings
+
+settings = get_settings()
+_clock = time.monotonic
+
+
+class TokenBucket:
+    __slots__ = ("name", "capacity", "rate", "max_keys", "_buckets")
+
+    def __init__(self, name: str, per_minute: int, max_keys: int = 50_000) -> None:
+        self.name = name
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets: dict[str, list[float]] = {}
+
+    def hit(self, key: str, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens for ``key``; returns 0 if allowed, else seconds to wait."""
+        if self.rate <= 0:
+            return 0.0
+        now = _clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._sweep(now)
+            self._buckets[key] = [self.capacity - cost, now]
+            return 0.0
+        tokens = bucket[0] + (now - bucket[1]) * self.rate
+        if tokens > self.capacity:
+            tokens = self.capacity
+        bucket[1] = now
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return 0.0
+        bucket[0] = tokens
+        return (cost - tokens) / self.rate
+
+    def _sweep(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping.
+        for key, (tokens, stamp) in list(self._buckets.items()):
+            if tokens + (now - stamp) * self.rate >= self.capacity:
+                del self._buckets[key]
+        overflow = len(self._buckets) - int(self.max_keys * 0.9)
+        for key in list(self._buckets)[:max(overflow, 0)]:
+            del self._buckets[key]
+
+
+login_by_ip = TokenBucket("login-ip", settings.rate_limit_login_ip_per_minute)
+login_by_account = TokenBucket("login-account", settings.rate_limit_login_account_per_minute)
+scan_by_ip = TokenBucket("scan", settings.rate_limit_scan_per_minute)
+upload_by_ip = TokenBucket("upload", settings.rate_limit_upload_per_minute)
+
+
+_trusted_proxies = [ipaddress.ip_network(value, strict=False) for value in settings.trusted_proxies]
+
+
+@lru_cache(maxsize=4096)
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies)
+
+
+def client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else None
+    if peer is None:
+        return "unknown"
+    if not _is_trusted(peer):
+        return peer
+    forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if forwarded:
+        # Each proxy appends the address it received from; the nearest hop
+        # that is not one of ours is the client.
+        for hop in reversed(forwarded):
+            if not _is_trusted(hop):
+                return hop
+        return forwarded[0]
+    real_ip = request.headers.get("x-real-ip", "").strip()
+    return real_ip or peer
+
+
+def enforce(bucket: TokenBucket, key: str) -> None:
+    if not settings.rate_limit_enabled:
+        return
+    wait = bucket.hit(key)
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests; slow down",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+
+def limit(bucket: TokenBucket, key: Callable[[Request], str] = client_ip) -> Callable[[Request], None]:
+    """Route dependency that throttles by ``key(request)``, the client IP by default."""
+    # async so the check runs on the event loop instead of costing a threadpool hop.
+    async def dependency(request: Request) -> None:
+        enforce(bucket, key(request))
+    return dependency
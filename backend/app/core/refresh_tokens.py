@@ -0,0 +1,133 @@
+"""Refresh-token rotation with per-login families and reuse detection.
+
+Every login starts a family; each refresh marks the presented token used
+and issues its successor in the same family. Presenting a token that was
+already used (or revoked) revokes the whole family, which logs out both the
+legitimate holder and whoever replayed it. Only SHA-256 digests of token ids
+are stored.
+"""
+from __future__ import annotations
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+from fastapi import HTTPException, status
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+from .. import models
+from . import security
+from .config import get_settings
+
+settings = get_settings()
+
+# Families revoked in this process; lets replays be refused without a query.
+REVOKED_CACHE_SIZE = 10_000
+_revoked: OrderedDict[str, None] = OrderedDict()
+_lock = threading.Lock()
+_last_prune = 0.0
+
+
+def _digest(jti: str) -> str:
+    return hashlib.sha256(jti.encode("utf-8")).hexdigest()
+
+
+def _remember_revoked(family: str) -> None:
+    with _lock:
+        _revoked[family] = None
+        _revoked.move_to_end(family)
+        while len(_revoked) > REVOKED_CACHE_SIZE:
+            _revoked.popitem(last=False)
+
+
+def _known_revoked(family: str) -> bool:
+    with _lock:
+        return family in _revoked
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+def issue(session: Session, user_id: int, family: str | None = None) -> str:
+    """Add a refresh token row to ``session`` and return the signed token; caller commits."""
+    jti = secrets.token_urlsafe(16)
+    family = family or secrets.token_urlsafe(12)
+    now = datetime.utcnow()
+    session.add(
+        models.RefreshToken(
+            token_hash=_digest(jti),
+            family_id=family,
+            user_id=user_id,
+            created_at=now,
+            expires_at=now + timedelta(minutes=settings.refresh_token_expire_minutes),
+        )
+    )
+    maybe_prune(session)
+    return security.create_refresh_token(str(user_id), jti, family)
+
+
+def revoke_family(session: Session, family: str) -> None:
+    session.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.family_id == family, models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    _remember_revoked(family)
+
+
+def rotate(session: Session, payload: dict[str, Any]) -> tuple[models.User, str]:
+    """Consume a refresh token and return its user plus the successor token."""
+    jti, family = payload.get("jti"), payload.get("fam")
+    if not jti or not family:
+        raise _unauthorized("Refresh token no longer accepted; sign in again")
+    if _known_revoked(family):
+        raise _unauthorized("Refresh token revoked")
+    row = session.exec(
+        select(models.RefreshToken, models.User)
+        .join(models.User, models.User.id == models.RefreshToken.user_id)
+        .where(models.RefreshToken.token_hash == _digest(jti))
+    ).first()
+    if row is None:
+        raise _unauthorized("Invalid refresh token")
+    token, user = row
+    if token.family_id != family or str(user.id) != str(payload.get("sub")):
+        raise _unauthorized("Invalid refresh token")
+    if token.revoked_at is not None:
+        _remember_revoked(family)
+        raise _unauthorized("Refresh token revoked")
+    # Compare-and-set, so two concurrent refreshes with one token cannot both win.
+    claimed = session.execute(
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.id == token.id,
+            models.RefreshToken.used_at.is_(None),
+            models.RefreshToken.revoked_at.is_(None),
+        )
+        .values(used_at=datetime.utcnow())
+    ).rowcount
+    if not claimed:
+        revoke_family(session, family)
+        session.commit()
+        raise _unauthorized("Refresh token reuse detected; sign in again")
+    if not user.is_active:
+        session.rollback()
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return user, issue(session, user.id, family)
+
+
+def forget_user(session: Session, user_id: int) -> None:
+    session.execute(delete(models.RefreshToken).where(models.RefreshToken.user_id == user_id))
+
+
+def maybe_prune(session: Session) -> None:
+    """Drop expired rows, at most once per ``REFRESH_TOKEN_PRUNE_MINUTES``."""
+    global _last_prune
+    now = time.monotonic()
+    with _lock:
+        if now - _last_prune < settings.refresh_token_prune_minutes * 60:
+            return
+        _last_prune = now
+    session.execute(delete(models.RefreshToken).where(models.RefreshToken.expires_at < datetime.utcnow()))
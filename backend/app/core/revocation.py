@@ -0,0 +1,63 @@
+"""Per-user token generations for the stateless authorization fast path.
+
+Access tokens carry the user's generation and the database's epoch. Changing
+a user's role or active flag, or deleting the user, bumps the generation in
+the same transaction as the change, so in every worker process tokens minted
+before it no longer qualify for the fast path and are re-checked against the
+database. Generations are shared counters in :mod:`versions`; the epoch is a
+random value stored there once, so tokens never carry over to a database
+that was recreated and restarted its generations from zero.
+"""
+from __future__ import annotations
+import secrets
+from sqlalchemy import Connection, event
+from sqlalchemy.orm import object_session
+from .. import models
+from . import versions
+
+EPOCH_KEY = "auth-epoch"
+
+
+def _key(user_id: int) -> str:
+    return f"auth-generation:{user_id}"
+
+
+def seed_epoch(conn: Connection) -> None:
+    """Store the epoch; migrations call this so requests never write it."""
+    versions.seed(conn, EPOCH_KEY, secrets.randbelow(2**31 - 1) + 1)
+
+
+def current_epoch() -> int:
+    return versions.current(EPOCH_KEY)
+
+
+def generation(user_id: int) -> int:
+    return versions.current(_key(user_id))
+
+
+def bump(user: models.User) -> None:
+    if user.id is None:
+        return
+    session = object_session(user)
+    if session is not None:
+        versions.touch(session, _key(user.id))
+    else:
+        versions.bump(_key(user.id))
+
+
+def is_current(user_id: int, token_epoch: object, token_generation: object) -> bool:
+    return token_epoch == current_epoch() and token_generation == generation(user_id)
+
+
+# The bump is written by the commit that persists the change, so a rolled
+# back change bumps nothing. Objects outside a session bump immediately.
+@event.listens_for(models.User.role, "set")
+@event.listens_for(models.User.is_active, "set")
+def _claims_changed(target: models.User, value, oldvalue, initiator) -> None:
+    if value != oldvalue:
+        bump(target)
+
+
+@event.listens_for(models.User, "after_delete")
+def _user_deleted(mapper, connection, target: models.User) -> None:
+    bump(target)
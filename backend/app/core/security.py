@@ -1,26 +1,146 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, TypeVar
 import jwt
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 from .config import get_settings
+from . import revocation
+from .hashing import HashPolicy, policy_from_settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 settings = get_settings()
 
+T = TypeVar("T")
+
+_hash_pool: ProcessPoolExecutor | None = None
+_hash_pool_lock = threading.Lock()
+_hash_pending = 0
+_policy: HashPolicy | None = None
+_policy_lock = threading.Lock()
+
+def _apply_policy(policy: HashPolicy) -> None:
+    global _policy
+    pwd_context.update(**policy.context_kwargs())
+    _policy = policy
+
+def configure_password_hashing() -> HashPolicy:
+    """Resolve the hash policy once per process, calibrating if configured to."""
+    with _policy_lock:
+        if _policy is None:
+            _apply_policy(policy_from_settings(settings))
+        return _policy
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    configure_password_hashing()
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify and, when the stored hash is off-policy, return a replacement."""
+    configure_password_hashing()
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
+    configure_password_hashing()
     return pwd_context.hash(password)
 
+def _hash_many(passwords: list[str]) -> list[str]:
+    return [get_password_hash(password) for password in passwords]
+
+def _password_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # spawn rather than fork: the server process already runs threads.
+            # Children re-import __main__, so scripts using the async helpers
+            # need an ``if __name__ == "__main__"`` guard.
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                # Workers reuse the parent's policy instead of calibrating again.
+                initializer=_apply_policy,
+                initargs=(configure_password_hashing(),),
+            )
+        return _hash_pool
+
+def password_queue_depth() -> int:
+    """Hash/verify calls submitted but not yet finished."""
+    return _hash_pending
+
+async def _run_hashing(fn: Callable[..., T], *args: Any) -> T:
+    global _hash_pending
+    if _hash_pending >= settings.password_hash_max_pending:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests; try again shortly",
+            headers={"Retry-After": "2"},
+        )
+    _hash_pending += 1
+    try:
+        if settings.password_hash_workers <= 0:
+            return await run_in_threadpool(fn, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_pool(), fn, *args)
+    finally:
+        _hash_pending -= 1
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return await _run_hashing(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
+
+async def get_password_hashes_async(passwords: list[str]) -> list[str]:
+    """Hash a batch across every pool worker; counts one pending call per worker."""
+    if not passwords:
+        return []
+    chunk = -(-len(passwords) // max(settings.password_hash_workers, 1))
+    parts = await asyncio.gather(
+        *(_run_hashing(_hash_many, passwords[start:start + chunk]) for start in range(0, len(passwords), chunk))
+    )
+    return [hashed for part in parts for hashed in part]
+
+def _noop() -> None:
+    return None
+
+async def warm_password_pool() -> None:
+    """Spawn every hash worker now rather than on the first sign-ins."""
+    if settings.password_hash_workers <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    pool = _password_pool()
+    await asyncio.gather(*(loop.run_in_executor(pool, _noop) for _ in range(settings.password_hash_workers)))
+
+def shutdown_password_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=False, cancel_futures=True)
+            _hash_pool = None
+
 def create_token(data: dict[str, Any], expires_minutes: int) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=expires_minutes)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.secret_key, algorithm="HS256")
 
-def create_access_token(subject: str, roles: list[str]) -> str:
-    return create_token({"sub": subject, "roles": roles, "type": "access"}, settings.access_token_expire_minutes)
+def create_access_token(subject: str, roles: list[str], active: bool = True) -> str:
+    claims = {
+        "sub": subject,
+        "roles": roles,
+        "type": "access",
+        "act": active,
+        "gen": revocation.generation(int(subject)),
+        "epoch": revocation.current_epoch(),
+    }
+    return create_token(claims, settings.access_token_expire_minutes)
 
-def create_refresh_token(subject: str) -> str:
-    return create_token({"sub": subject, "type": "refresh"}, settings.refresh_token_expire_minutes)
+def create_refresh_token(subject: str, jti: str, family: str) -> str:
+    return create_token(
+        {"sub": subject, "type": "refresh", "jti": jti, "fam": family},
+        settings.refresh_token_expire_minutes,
+    )
@@ -0,0 +1,157 @@
+"""Per-table write versions used to key caches and export snapshot tokens.
+
+Versions are rows of the ``shared_version`` table, so every worker process
+sees the same values. A commit that writes tables bumps their rows inside the
+same transaction, and each process mirrors the table in memory, re-reading
+only the rows changed since its last look and only when SQLite's
+``PRAGMA data_version`` reports that another connection committed. That check
+costs a few microseconds, so reading a version stays cheap while never
+lagging a commit that has already returned.
+
+Every committed session bumps the tables it flushed or touched through
+ORM-enabled ``update``/``delete``/``insert`` statements. Code that writes with
+raw ``text()`` SQL must call :func:`touch` (or :func:`bump`, outside a
+session) itself. Other modules keep their own cross-process counters here
+under non-table names (see :mod:`revocation`).
+"""
+from __future__ import annotations
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.orm import Session, UOWTransaction
+
+
+def _code_fingerprint() -> str:
+    # Tokens survive restarts now that versions are persistent, but cached
+    # exports must not outlive a deploy that changes how they are rendered.
+    package = Path(__file__).resolve().parents[1]
+    digest = hashlib.sha1()
+    for path in sorted(package.rglob("*.py")):
+        stat = path.stat()
+        digest.update(f"{path.relative_to(package)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:8]
+
+
+_code_id = _code_fingerprint()
+_engine: Engine | None = None
+_reader: Any = None
+_data_version: int | None = None
+_seq = 0
+_versions: dict[str, int] = {}
+_lock = threading.Lock()
+_TOUCHED_KEY = "touched_tables"
+
+_UPSERT = (
+    "INSERT INTO shared_version (name, version, seq) "
+    "VALUES (?, 1, (SELECT COALESCE(MAX(seq), 0) + 1 FROM shared_version)) "
+    "ON CONFLICT(name) DO UPDATE SET version = version + 1, seq = excluded.seq"
+)
+
+
+def bind(engine: Engine) -> None:
+    global _engine
+    _engine = engine
+
+
+def _refresh() -> None:
+    global _reader, _data_version, _seq
+    if _engine is None:
+        return
+    with _lock:
+        if _reader is None:
+            # A dedicated pooled connection: data_version is per connection.
+            _reader = _engine.raw_connection()
+        cursor = _reader.cursor()
+        try:
+            data_version = cursor.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == _data_version:
+                return
+            rows = cursor.execute(
+                "SELECT name, version, seq FROM shared_version WHERE seq > ?", (_seq,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return  # before migrations have created the table
+        finally:
+            cursor.close()
+        for name, version, seq in rows:
+            _versions[name] = version
+            _seq = max(_seq, seq)
+        _data_version = data_version
+
+
+def _write(conn: Connection, names: Iterable[str]) -> None:
+    for name in sorted(names):
+        conn.exec_driver_sql(_UPSERT, (name,))
+
+
+def bump(*names: str) -> None:
+    """Bump ``names`` in a transaction of their own."""
+    if _engine is None:
+        return
+    with _engine.begin() as conn:
+        _write(conn, names)
+
+
+def seed(conn: Connection, name: str, value: int) -> None:
+    """Create ``name`` with ``value`` in ``conn``'s transaction unless it exists."""
+    conn.exec_driver_sql(
+        "INSERT OR IGNORE INTO shared_version (name, version, seq) "
+        "VALUES (?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM shared_version))",
+        (name, value),
+    )
+
+
+def current(name: str) -> int:
+    _refresh()
+    return _versions.get(name, 0)
+
+
+def token(tables: Iterable[str], *extra: str) -> str:
+    """Opaque token that changes whenever any of ``tables`` is written."""
+    _refresh()
+    parts = [_code_id, *(f"{name}:{_versions.get(name, 0)}" for name in sorted(set(tables))), *extra]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def _touched(session: Session) -> set[str]:
+    return session.info.setdefault(_TOUCHED_KEY, set())
+
+
+def touch(session: Session, *names: str) -> None:
+    """Mark ``names`` as written by ``session``; they are bumped in its commit."""
+    _touched(session).update(names)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session: Session, flush_context: UOWTransaction) -> None:
+    touched = _touched(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            touched.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk(orm_execute_state) -> None:
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _touched(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_in_transaction(session: Session) -> None:
+    # Flush first: commit's own flush runs after this hook, and the tables it
+    # writes must be bumped in the same transaction.
+    session.flush()
+    touched = session.info.pop(_TOUCHED_KEY, None)
+    if touched:
+        _write(session.connection(), touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_TOUCHED_KEY, None)
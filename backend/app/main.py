@@ -1,15 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from .core import metrics as request_metrics, profiling
 from .core.database import init_db
 from .core.config import get_settings
+from .core.security import configure_password_hashing, shutdown_password_pool
+from .services import warmup
 from .routers import (
     auth,
     attendance,
+    debug,
     exports,
     inventory,
     jobs,
     manufacturing,
+    me,
+    metrics,
     orders,
     schedules,
     settings as settings_router,
@@ -19,8 +25,20 @@ from .routers import (
 app_settings = get_settings()
 
 def build_app() -> FastAPI:
-    init_db()
     app = FastAPI(title=app_settings.app_name)
+    # Migrations run at startup rather than import, so importing the app
+    # (tooling, reload parents, OpenAPI dumps) never touches the database.
+    app.add_event_handler("startup", init_db)
+    app.add_event_handler("startup", configure_password_hashing)
+    app.state.warmup = None
+    if app_settings.warmup_enabled:
+        # Startup handlers finish before uvicorn accepts connections, so the
+        # server only reports ready once this is done.
+        async def warm_up() -> None:
+            app.state.warmup = await warmup.run(app)
+
+        app.add_event_handler("startup", warm_up)
+    app.add_event_handler("shutdown", shutdown_password_pool)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=app_settings.allowed_hosts,
@@ -28,16 +46,30 @@ def build_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if app_settings.slow_request_ms > 0:
+        app.add_middleware(profiling.SlowRequestMiddleware)
+    if app_settings.metrics_enabled:
+        # Added last so it is outermost and also times CORS preflights.
+        app.add_middleware(request_metrics.MetricsMiddleware)
+        app.include_router(metrics.router)
     app.include_router(auth.router)
     app.include_router(attendance.router)
     app.include_router(schedules.router)
     app.include_router(jobs.router)
     app.include_router(manufacturing.router)
+    app.include_router(me.router)
     app.include_router(inventory.router)
     app.include_router(orders.router)
     app.include_router(exports.router)
     app.include_router(settings_router.router)
     app.include_router(tickets.router)
+    app.include_router(debug.router)
+
+    @app.get("/health", include_in_schema=False)
+    def health():
+        report = app.state.warmup
+        return {"status": "ok", "warmup_ms": report["ms"] if report else None}
+
     app.mount("/uploads", StaticFiles(directory=app_settings.upload_root, html=False), name="uploads")
     return app
 
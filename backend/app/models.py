@@ -1,7 +1,7 @@
 from __future__ import annotations
 from datetime import datetime, time
 from enum import Enum
-from sqlalchemy import Column, JSON
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 class Role(str, Enum):
@@ -70,6 +70,16 @@ class User(SQLModel, table=True):
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class RefreshToken(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+    token_hash: str = Field(index=True, unique=True)
+    family_id: str = Field(index=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
+    used_at: datetime | None = None
+    revoked_at: datetime | None = None
+
 class PendingUser(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     email: str = Field(index=True, unique=True)
@@ -107,12 +117,12 @@ class ShopJob(SQLModel, table=True):
     status: JobStatus = Field(default=JobStatus.submitted, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     queue_position: int = Field(default=0, index=True)
-    claimed_by_id: int | None = Field(default=None, foreign_key="user.id")
+    claimed_by_id: int | None = Field(default=None, foreign_key="user.id", index=True)
     claimed_at: datetime | None = None
 
 class OrderRequest(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    requester_id: int | None = Field(default=None, foreign_key="user.id")
+    requester_id: int | None = Field(default=None, foreign_key="user.id", index=True)
     requester_name: str
     part_name: str
     vendor_link: str
@@ -124,17 +134,25 @@ class OrderRequest(SQLModel, table=True):
 
 class InventoryItem(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    part_name: str
-    sku: str | None = Field(default=None, index=True)
+    part_name: str = Field(index=True)
+    sku: str | None = Field(default=None, unique=True, index=True)
     part_type: InventoryPartType = Field(default=InventoryPartType.custom, index=True)
     location: str | None = Field(default=None, index=True)
     quantity: int = Field(default=0)
     unit_cost: float | None = None
     reorder_threshold: int | None = None
     tags: str | None = None
-    vendor_name: str | None = None
+    vendor_name: str | None = Field(default=None, index=True)
     vendor_link: str | None = None
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Units consumed, exponentially decayed to usage_at; see services.inventory_usage.
+    usage_decayed: float = Field(default=0)
+    usage_at: datetime | None = None
+
+# SQLite keeps only the items at or below their threshold in this index, so
+# low-stock queries that repeat the condition read just those rows.
+INVENTORY_LOW_STOCK = InventoryItem.quantity <= InventoryItem.reorder_threshold
+Index("ix_inventoryitem_low_stock", InventoryItem.part_name, sqlite_where=INVENTORY_LOW_STOCK)
 
 class InventoryTransaction(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
@@ -176,14 +194,6 @@ class ManufacturingPart(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     last_status_change: datetime = Field(default_factory=datetime.utcnow)
-    assigned_student_ids: list[int] = Field(
-        default_factory=list,
-        sa_column=Column(JSON, nullable=False, default=list),
-    )
-    assigned_lead_ids: list[int] = Field(
-        default_factory=list,
-        sa_column=Column(JSON, nullable=False, default=list),
-    )
     student_eta_minutes: int | None = None
     eta_note: str | None = None
     eta_updated_at: datetime | None = None
@@ -197,6 +207,27 @@ class ManufacturingPart(SQLModel, table=True):
     cam_file_path: str | None = None
 
 
+class SharedVersion(SQLModel, table=True):
+    """Cross-process counters; see ``core.versions``."""
+    __tablename__ = "shared_version"
+    name: str = Field(primary_key=True)
+    version: int = 0
+    seq: int = Field(default=0, index=True)
+
+
+class AssignmentRole(str, Enum):
+    student = "student"
+    lead = "lead"
+
+
+class ManufacturingAssignment(SQLModel, table=True):
+    __tablename__ = "manufacturing_assignment"
+    part_id: int = Field(foreign_key="manufacturingpart.id", primary_key=True)
+    role: AssignmentRole = Field(primary_key=True)
+    user_id: int = Field(foreign_key="user.id", primary_key=True, index=True)
+    position: int = Field(default=0)
+
+
 class TicketType(str, Enum):
     feature = "feature"
     issue = "issue"
@@ -221,7 +252,7 @@ class Ticket(SQLModel, table=True):
     status: TicketStatus = Field(default=TicketStatus.open, index=True)
     subject: str
     details: str
-    requester_id: int | None = Field(default=None, foreign_key="user.id")
+    requester_id: int | None = Field(default=None, foreign_key="user.id", index=True)
     requester_name: str
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -2,10 +2,13 @@
 from . import (
     auth,
     attendance,
+    debug,
     exports,
     inventory,
     jobs,
     manufacturing,
+    me,
+    metrics,
     orders,
     schedules,
     settings,
@@ -15,10 +18,13 @@ from . import (
 __all__ = [
     "auth",
     "attendance",
+    "debug",
     "exports",
     "inventory",
     "jobs",
     "manufacturing",
+    "me",
+    "metrics",
     "orders",
     "schedules",
     "settings",
@@ -1,46 +1,16 @@
 from datetime import datetime, time
 from collections import defaultdict
-from dataclasses import dataclass
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from .. import models, schemas
 from ..core.database import get_session
-from ..core import deps
-from ..models_config import AppConfig
+from ..core import deps, ratelimit
+from ..services import attendance
 
 router = APIRouter(prefix="/attendance", tags=["attendance"])
 
 
-def _current_block(ts: datetime, session: Session) -> models.ScheduleBlock | None:
-    weekday = ts.weekday()
-    query = select(models.ScheduleBlock).where(
-        models.ScheduleBlock.weekday == weekday,
-        models.ScheduleBlock.active == True,  # noqa: E712
-    )
-    for block in session.exec(query):
-        if block.start_time <= ts.time() <= block.end_time:
-            return block
-    return None
-
-
-def _restrict(session: Session) -> bool:
-    config = session.get(AppConfig, 1)
-    if not config:
-        config = AppConfig(id=1, restrict_attendance_to_schedule=True)
-        session.add(config)
-        session.commit()
-        session.refresh(config)
-    return config.restrict_attendance_to_schedule
-
-
-@dataclass
-class ResolvedAttendee:
-    user: models.User | None
-    student_id: str | None
-    barcode_id: str | None
-
-
-def _resolve_attendee(payload: schemas.AttendanceScan, session: Session) -> ResolvedAttendee:
+def _resolve_attendee(payload: schemas.AttendanceScan, session: Session) -> attendance.ResolvedAttendee:
     barcode = payload.barcode_id.strip() if payload.barcode_id else None
     student_id = payload.student_id.strip() if payload.student_id else None
 
@@ -54,7 +24,7 @@ def _resolve_attendee(payload: schemas.AttendanceScan, session: Session) -> Reso
     recorded_barcode_id = barcode or (user.barcode_id if user else None)
 
     if user:
-        return ResolvedAttendee(user=user, student_id=recorded_student_id, barcode_id=recorded_barcode_id)
+        return attendance.ResolvedAttendee(user=user, student_id=recorded_student_id, barcode_id=recorded_barcode_id)
 
     if not student_id:
         raise HTTPException(status_code=404, detail="ID not registered")
@@ -62,21 +32,7 @@ def _resolve_attendee(payload: schemas.AttendanceScan, session: Session) -> Reso
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="student_id must be a 6-digit number"
         )
-    return ResolvedAttendee(user=None, student_id=recorded_student_id, barcode_id=recorded_barcode_id)
-
-
-def _open_entry(session: Session, attendee: ResolvedAttendee) -> models.AttendanceEntry | None:
-    statement = select(models.AttendanceEntry).where(models.AttendanceEntry.check_out.is_(None))
-    if attendee.user:
-        statement = statement.where(models.AttendanceEntry.user_id == attendee.user.id)
-    elif attendee.student_id:
-        statement = statement.where(models.AttendanceEntry.recorded_student_id == attendee.student_id)
-    elif attendee.barcode_id:
-        statement = statement.where(models.AttendanceEntry.recorded_barcode_id == attendee.barcode_id)
-    else:
-        return None
-    statement = statement.order_by(models.AttendanceEntry.check_in.desc())
-    return session.exec(statement).first()
+    return attendance.ResolvedAttendee(user=None, student_id=recorded_student_id, barcode_id=recorded_barcode_id)
 
 
 def _to_read(entry: models.AttendanceEntry, student: models.User | None) -> schemas.AttendanceRead:
@@ -97,7 +53,11 @@ def _to_read(entry: models.AttendanceEntry, student: models.User | None) -> sche
     )
 
 
-@router.post("/scan", response_model=schemas.AttendanceRead)
+@router.post(
+    "/scan",
+    response_model=schemas.AttendanceRead,
+    dependencies=[Depends(ratelimit.limit(ratelimit.scan_by_ip))],
+)
 def record_scan(
     payload: schemas.AttendanceScan,
     session: Session = Depends(get_session),
@@ -110,10 +70,10 @@ def record_scan(
     note_text = (payload.note or "").strip() or None
 
     now = payload.timestamp
-    block = _current_block(now, session)
-    restrict = _restrict(session)
+    block = attendance.current_block(now, session)
+    restrict = attendance.restricted_to_schedule(session)
     mode = (payload.mode or "in").lower()
-    open_entry = _open_entry(session, attendee)
+    open_entry = attendance.find_open_entry(session, attendee)
 
     is_admin_attendee = bool(student and student.role == models.Role.admin)
     flag_unverified = restrict and not block and not is_admin_attendee
@@ -152,7 +112,7 @@ def record_scan(
 @router.get("/summary/today", response_model=schemas.AttendanceSummary)
 def today_summary(
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.get_current_user),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
     today = datetime.utcnow().date()
     start = datetime.combine(today, time.min)
@@ -169,7 +129,7 @@ def today_summary(
 @router.get("/today_logs", response_model=list[schemas.AttendanceLogItem])
 def today_logs(
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.get_current_user),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
     today = datetime.utcnow().date()
     start = datetime.combine(today, time.min)
@@ -240,7 +200,7 @@ def update_entry_status(
 @router.get("/logs_by_date", response_model=list[schemas.AttendanceDay])
 def logs_by_date(
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.require_roles(models.Role.lead.value, models.Role.admin.value)),
+    _: deps.Principal = Depends(deps.require_role_claims(models.Role.lead.value, models.Role.admin.value)),
 ):
     rows = session.exec(select(models.AttendanceEntry).order_by(models.AttendanceEntry.check_in)).all()
     grouped = defaultdict(list)
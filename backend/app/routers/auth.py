@@ -1,45 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+from typing import TypeVar
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import func, or_
+from pydantic import ValidationError
+from sqlalchemy import delete, func, or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 import jwt
 from .. import models, schemas
-from ..core import security
+from ..core import ratelimit, refresh_tokens, security
 from ..core.database import get_session
 from ..core.config import get_settings
 from ..core import deps
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 settings = get_settings()
+T = TypeVar("T")
+
+
+# Handlers that hash passwords are async so they await the hash pool without
+# holding a threadpool thread. Everything touching the session runs through
+# run_in_threadpool: a SQLite busy-wait on the event loop would stall every
+# request, kiosk scans included.
+
+
+def _release_connection(session: Session) -> None:
+    # Hashing can queue behind other logins; hand the pooled connection back
+    # first so a burst of sign-ins cannot exhaust the engine's pool while the
+    # event loop waits on it.
+    session.rollback()
+
+
+async def _hash_password(session: Session, password: str) -> str:
+    await run_in_threadpool(_release_connection, session)
+    return await security.get_password_hash_async(password)
+
+
+async def _hash_passwords(session: Session, passwords: list[str]) -> list[str]:
+    await run_in_threadpool(_release_connection, session)
+    return await security.get_password_hashes_async(passwords)
+
+
+def _save(session: Session, row: T) -> T:
+    session.add(row)
+    session.commit()
+    session.refresh(row)
+    return row
 
 
 @router.post("/register", response_model=schemas.UserRead)
-def register_user(
+async def register_user(
     payload: schemas.UserCreate,
     session: Session = Depends(get_session),
     current_user: models.User | None = Depends(deps.get_current_user_optional),
 ):
-    first_user_exists = session.exec(select(models.User.id).limit(1)).first()
-    if first_user_exists and (not current_user or current_user.role != models.Role.admin):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin approval required")
-    existing = session.exec(select(models.User).where(models.User.email == payload.email)).first()
-    if existing:
-        raise HTTPException(status_code=409, detail="Email already registered")
-    if payload.barcode_id:
-        conflict = session.exec(select(models.User).where(models.User.barcode_id == payload.barcode_id)).first()
-        if conflict:
-            raise HTTPException(status_code=409, detail="Barcode already registered")
+    await run_in_threadpool(_check_registration, session, payload, current_user)
     user = models.User(
         email=str(payload.email).lower(),
         full_name=payload.full_name,
         role=models.Role(payload.role),
         barcode_id=payload.barcode_id,
         student_id=payload.student_id,
-        hashed_password=security.get_password_hash(payload.password),
+        hashed_password=await _hash_password(session, payload.password),
     )
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    user = await run_in_threadpool(_save, session, user)
     return schemas.UserRead(
         id=user.id,
         email=user.email,
@@ -51,23 +78,48 @@ def register_user(
     )
 
 
-@router.post("/request", response_model=schemas.PendingUserRead)
-def request_account(payload: schemas.PendingUserCreate, session: Session = Depends(get_session)):
-    # prevent duplicates with existing users or pending entries
-    email = str(payload.email).lower()
+def _check_registration(session: Session, payload: schemas.UserCreate, current_user: models.User | None) -> None:
+    first_user_exists = session.exec(select(models.User.id).limit(1)).first()
+    if first_user_exists and (not current_user or current_user.role != models.Role.admin):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin approval required")
+    existing = session.exec(select(models.User).where(models.User.email == payload.email)).first()
+    if existing:
+        raise HTTPException(status_code=409, detail="Email already registered")
+    if payload.barcode_id:
+        conflict = session.exec(select(models.User).where(models.User.barcode_id == payload.barcode_id)).first()
+        if conflict:
+            raise HTTPException(status_code=409, detail="Barcode already registered")
+
+
+def _check_email_free(session: Session, email: str) -> None:
+    if session.exec(select(models.User).where(models.User.email == email)).first():
+        raise HTTPException(status_code=409, detail="Email already registered")
+
+
+def _check_account_request(session: Session, email: str) -> None:
     if session.exec(select(models.User).where(models.User.email == email)).first():
         raise HTTPException(status_code=409, detail="Email already exists")
     if session.exec(select(models.PendingUser).where(models.PendingUser.email == email)).first():
         raise HTTPException(status_code=409, detail="A request for this email already exists")
+
+
+@router.post(
+    "/request",
+    response_model=schemas.PendingUserRead,
+    dependencies=[Depends(ratelimit.limit(ratelimit.login_by_ip))],
+)
+async def request_account(payload: schemas.PendingUserCreate, session: Session = Depends(get_session)):
+    # prevent duplicates with existing users or pending entries
+    email = str(payload.email).lower()
+    ratelimit.enforce(ratelimit.login_by_account, f"request:{email}")
+    await run_in_threadpool(_check_account_request, session, email)
     pending = models.PendingUser(
         email=email,
         full_name=payload.full_name,
-        password_hash=security.get_password_hash(payload.password),
+        password_hash=await _hash_password(session, payload.password),
         requested_role=models.Role(payload.requested_role),
     )
-    session.add(pending)
-    session.commit()
-    session.refresh(pending)
+    pending = await run_in_threadpool(_save, session, pending)
     return schemas.PendingUserRead(
         id=pending.id,
         email=pending.email,
@@ -80,7 +132,7 @@ def request_account(payload: schemas.PendingUserCreate, session: Session = Depen
 @router.get("/requests", response_model=list[schemas.PendingUserRead])
 def list_requests(
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.require_roles(models.Role.admin.value)),
+    _: deps.Principal = Depends(deps.require_role_claims(models.Role.admin.value)),
 ):
     rows = session.exec(select(models.PendingUser).order_by(models.PendingUser.created_at.desc())).all()
     return [
@@ -131,6 +183,51 @@ def approve_request(
     )
 
 
+@router.post("/requests/approve", response_model=schemas.BulkUserResult)
+def approve_requests(
+    payload: schemas.BulkApprovePending,
+    session: Session = Depends(get_session),
+    _: models.User = Depends(deps.require_roles(models.Role.admin.value)),
+):
+    role_override = _role_or_422(payload.role) if payload.role else None
+    request_ids = list(dict.fromkeys(payload.request_ids))
+    pending = {
+        req.id: req
+        for req in session.exec(select(models.PendingUser).where(models.PendingUser.id.in_(request_ids))).all()
+    }
+    taken = set(
+        session.exec(
+            select(models.User.email).where(models.User.email.in_([req.email for req in pending.values()]))
+        ).all()
+    )
+    errors: list[schemas.BulkRowError] = []
+    users: list[models.User] = []
+    for req_id in request_ids:
+        req = pending.get(req_id)
+        if req is None:
+            errors.append(schemas.BulkRowError(row=req_id, detail="Request not found"))
+        elif req.email in taken:
+            errors.append(schemas.BulkRowError(row=req_id, email=req.email, detail="Email already registered"))
+        else:
+            users.append(
+                models.User(
+                    email=req.email,
+                    full_name=req.full_name,
+                    role=role_override or req.requested_role,
+                    hashed_password=req.password_hash,
+                    is_active=True,
+                )
+            )
+    # Conflicting requests are dropped too, as the single-request approval does.
+    session.execute(
+        delete(models.PendingUser)
+        .where(models.PendingUser.id.in_(list(pending)))
+        .execution_options(synchronize_session=False)
+    )
+    created = _insert_users(session, users, "Users changed during approval; nothing was approved, retry")
+    return schemas.BulkUserResult(created=created, errors=errors)
+
+
 @router.post("/requests/{req_id}/reject")
 def reject_request(
     req_id: int,
@@ -146,26 +243,22 @@ def reject_request(
 
 
 @router.post("/create", response_model=schemas.UserRead)
-def create_user_as_admin(
+async def create_user_as_admin(
     payload: schemas.UserCreate,
     session: Session = Depends(get_session),
     _: models.User = Depends(deps.require_roles(models.Role.admin.value)),
 ):
     email = str(payload.email).lower()
-    existing = session.exec(select(models.User).where(models.User.email == email)).first()
-    if existing:
-        raise HTTPException(status_code=409, detail="Email already registered")
+    await run_in_threadpool(_check_email_free, session, email)
     user = models.User(
         email=email,
         full_name=payload.full_name,
         role=models.Role(payload.role),
         barcode_id=payload.barcode_id,
         student_id=payload.student_id,
-        hashed_password=security.get_password_hash(payload.password),
+        hashed_password=await _hash_password(session, payload.password),
     )
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    user = await run_in_threadpool(_save, session, user)
     return schemas.UserRead(
         id=user.id,
         email=user.email,
@@ -177,36 +270,215 @@ def create_user_as_admin(
     )
 
 
-@router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
-    statement = select(models.User).where(models.User.email == form_data.username.lower())
-    user = session.exec(statement).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+def _role_or_422(value: str) -> models.Role:
+    try:
+        return models.Role(value)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=f"Invalid role '{value}'") from exc
+
+
+def _user_read(user: models.User) -> schemas.UserRead:
+    return schemas.UserRead(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role.value,
+        barcode_id=user.barcode_id,
+        student_id=user.student_id,
+        is_active=user.is_active,
+    )
+
+
+def _import_rows(file: UploadFile, raw_bytes: bytes) -> list[tuple[int, dict]]:
+    try:
+        decoded = raw_bytes.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail="File must be utf-8 encoded") from exc
+    if (file.filename or "").lower().endswith(".json") or file.content_type == "application/json":
+        try:
+            records = json.loads(decoded)
+        except json.JSONDecodeError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {exc.msg}") from exc
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise HTTPException(status_code=400, detail="JSON must be a list of user objects")
+        rows = list(enumerate(records, start=1))
+    else:
+        reader = csv.DictReader(io.StringIO(decoded))
+        missing = {"email", "full_name", "password"}.difference(reader.fieldnames or [])
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(sorted(missing))}")
+        rows = list(enumerate(reader, start=2))
+    return [
+        (index, {key: (value.strip() or None) if isinstance(value, str) else value for key, value in row.items() if key})
+        for index, row in rows
+    ]
+
+
+def _row_email(row: dict) -> str | None:
+    # JSON rows may carry any type here; the report echoes it as text.
+    value = row.get("email")
+    return str(value) if value is not None else None
+
+
+def _registered_values(session: Session, seen: dict[str, set[str]]) -> dict[str, set[str]]:
+    # One query per unique column instead of one per row.
+    return {
+        field: set(session.exec(select(column).where(column.in_(list(seen[field])))).all())
+        for field, column in (
+            ("email", models.User.email),
+            ("barcode_id", models.User.barcode_id),
+            ("student_id", models.User.student_id),
+        )
+    }
+
+
+def _insert_users(
+    session: Session,
+    users: list[models.User],
+    conflict: str = "Users changed during import; nothing was imported, retry",
+) -> list[schemas.UserRead]:
+    session.add_all(users)
+    try:
+        session.flush()
+    except IntegrityError as exc:
+        session.rollback()
+        raise HTTPException(status_code=409, detail=conflict) from exc
+    created = [_user_read(user) for user in users]
+    session.commit()
+    return created
+
+
+@router.post(
+    "/users/import",
+    response_model=schemas.BulkUserResult,
+    dependencies=[Depends(ratelimit.limit(ratelimit.upload_by_ip))],
+)
+async def import_users(
+    file: UploadFile = File(...),
+    session: Session = Depends(get_session),
+    _: models.User = Depends(deps.require_roles(models.Role.admin.value)),
+):
+    """Create users from a CSV or JSON list; rows that fail validation are reported, the rest inserted."""
+    errors: list[schemas.BulkRowError] = []
+    candidates: list[tuple[int, schemas.UserCreate]] = []
+    seen: dict[str, set[str]] = {"email": set(), "barcode_id": set(), "student_id": set()}
+    for index, row in _import_rows(file, await file.read()):
+        try:
+            payload = schemas.UserCreate(**{**row, "role": row.get("role") or models.Role.student.value})
+            _role_or_422(payload.role)
+        except ValidationError as exc:
+            first = exc.errors()[0]
+            field = ".".join(str(part) for part in first["loc"])
+            errors.append(schemas.BulkRowError(row=index, email=_row_email(row), detail=f"{field}: {first['msg']}"))
+            continue
+        except HTTPException as exc:
+            errors.append(schemas.BulkRowError(row=index, email=_row_email(row), detail=exc.detail))
+            continue
+        payload.email = str(payload.email).lower()
+        duplicate = next(
+            (field for field in seen if getattr(payload, field) and getattr(payload, field) in seen[field]), None
+        )
+        if duplicate:
+            errors.append(schemas.BulkRowError(row=index, email=payload.email, detail=f"Duplicate {duplicate} in file"))
+            continue
+        for field in seen:
+            if getattr(payload, field):
+                seen[field].add(getattr(payload, field))
+        candidates.append((index, payload))
+
+    taken = await run_in_threadpool(_registered_values, session, seen)
+    accepted: list[schemas.UserCreate] = []
+    for index, payload in candidates:
+        clash = next((field for field in taken if getattr(payload, field) in taken[field]), None)
+        if clash:
+            errors.append(schemas.BulkRowError(row=index, email=payload.email, detail=f"{clash} already registered"))
+        else:
+            accepted.append(payload)
+
+    hashes = await _hash_passwords(session, [payload.password for payload in accepted])
+    users = [
+        models.User(
+            email=payload.email,
+            full_name=payload.full_name,
+            role=models.Role(payload.role),
+            barcode_id=payload.barcode_id,
+            student_id=payload.student_id,
+            hashed_password=hashed,
+        )
+        for payload, hashed in zip(accepted, hashes)
+    ]
+    created = await run_in_threadpool(_insert_users, session, users)
+    return schemas.BulkUserResult(created=created, errors=sorted(errors, key=lambda error: error.row))
+
+
+@router.post(
+    "/login",
+    response_model=schemas.Token,
+    dependencies=[Depends(ratelimit.limit(ratelimit.login_by_ip))],
+)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
+    ratelimit.enforce(ratelimit.login_by_account, form_data.username.lower())
+    user = await run_in_threadpool(_login_user, session, form_data.username.lower())
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    verified, rehashed = await security.verify_and_update_password_async(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
-    access = security.create_access_token(str(user.id), [user.role.value])
-    refresh = security.create_refresh_token(str(user.id))
+    return await run_in_threadpool(_issue_login_tokens, session, user, rehashed)
+
+
+def _login_user(session: Session, email: str) -> models.User | None:
+    user = session.exec(select(models.User).where(models.User.email == email)).first()
+    if user is not None:
+        # Load what the login needs before the connection goes back to the pool.
+        session.expunge(user)
+    _release_connection(session)
+    return user
+
+
+def _issue_login_tokens(session: Session, user: models.User, rehashed: str | None) -> schemas.Token:
+    if rehashed:
+        # Only replace the hash we verified, never a password changed meanwhile.
+        session.execute(
+            update(models.User)
+            .where(models.User.id == user.id, models.User.hashed_password == user.hashed_password)
+            .values(hashed_password=rehashed)
+        )
+    access = security.create_access_token(str(user.id), [user.role.value], user.is_active)
+    refresh = refresh_tokens.issue(session, user.id)
+    session.commit()
     return schemas.Token(access_token=access, refresh_token=refresh)
 
 
-@router.post("/refresh", response_model=schemas.Token)
-def refresh(token: schemas.TokenRefresh, session: Session = Depends(get_session)):
+def _refresh_claims(raw_token: str) -> dict:
     try:
-        payload = jwt.decode(token.refresh_token, settings.secret_key, algorithms=["HS256"])
+        payload = jwt.decode(raw_token, settings.secret_key, algorithms=["HS256"])
     except jwt.PyJWTError as exc:  # type: ignore[attr-defined]
         raise HTTPException(status_code=401, detail="Invalid refresh token") from exc
     if payload.get("type") != "refresh":
         raise HTTPException(status_code=401, detail="Invalid token type")
-    subject = payload.get("sub")
-    if not subject:
+    if not payload.get("sub"):
         raise HTTPException(status_code=401, detail="Invalid token subject")
-    user = session.get(models.User, int(subject))
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    access = security.create_access_token(str(user.id), [user.role.value])
-    refresh_token = security.create_refresh_token(str(user.id))
+    return payload
+
+
+@router.post("/refresh", response_model=schemas.Token)
+def refresh(token: schemas.TokenRefresh, session: Session = Depends(get_session)):
+    user, refresh_token = refresh_tokens.rotate(session, _refresh_claims(token.refresh_token))
+    access = security.create_access_token(str(user.id), [user.role.value], user.is_active)
+    session.commit()
     return schemas.Token(access_token=access, refresh_token=refresh_token)
 
 
+@router.post("/logout")
+def logout(token: schemas.TokenRefresh, session: Session = Depends(get_session)):
+    family = _refresh_claims(token.refresh_token).get("fam")
+    if family:
+        refresh_tokens.revoke_family(session, family)
+        session.commit()
+    return {"status": "logged_out"}
+
+
 @router.get("/me", response_model=schemas.UserRead)
 def read_me(current: models.User = Depends(deps.get_current_user)):
     return schemas.UserRead(
@@ -221,12 +493,19 @@ def read_me(current: models.User = Depends(deps.get_current_user)):
 
 
 @router.patch("/me", response_model=schemas.UserRead)
-def update_me(
+async def update_me(
     payload: schemas.UserSelfUpdate,
     session: Session = Depends(get_session),
     current: models.User = Depends(deps.get_current_user),
 ):
-    user = session.get(models.User, current.id)
+    # Releasing the connection for the hash expires ``current``; read its id first.
+    user_id = current.id
+    hashed = await _hash_password(session, payload.password) if payload.password else None
+    return await run_in_threadpool(_update_self, session, user_id, payload, hashed)
+
+
+def _update_self(session: Session, user_id: int, payload: schemas.UserSelfUpdate, hashed: str | None) -> schemas.UserRead:
+    user = session.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if payload.full_name is not None:
@@ -235,11 +514,9 @@ def update_me(
         user.barcode_id = payload.barcode_id
     if payload.student_id is not None:
         user.student_id = payload.student_id
-    if payload.password:
-        user.hashed_password = security.get_password_hash(payload.password)
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    if hashed:
+        user.hashed_password = hashed
+    user = _save(session, user)
     return schemas.UserRead(
         id=user.id,
         email=user.email,
@@ -255,7 +532,7 @@ def update_me(
 def list_users(
     search: str | None = None,
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.require_roles(models.Role.admin.value)),
+    _: deps.Principal = Depends(deps.require_role_claims(models.Role.admin.value)),
 ):
     statement = select(models.User)
     if search:
@@ -286,12 +563,17 @@ def list_users(
 
 
 @router.patch("/users/{user_id}", response_model=schemas.UserRead)
-def update_user(
+async def update_user(
     user_id: int,
     payload: schemas.UserUpdate,
     session: Session = Depends(get_session),
     _: models.User = Depends(deps.require_roles(models.Role.admin.value)),
 ):
+    hashed = await _hash_password(session, payload.password) if payload.password else None
+    return await run_in_threadpool(_update_user, session, user_id, payload, hashed)
+
+
+def _update_user(session: Session, user_id: int, payload: schemas.UserUpdate, hashed: str | None) -> schemas.UserRead:
     user = session.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -303,11 +585,9 @@ def update_user(
         user.barcode_id = payload.barcode_id
     if payload.student_id is not None:
         user.student_id = payload.student_id
-    if payload.password:
-        user.hashed_password = security.get_password_hash(payload.password)
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    if hashed:
+        user.hashed_password = hashed
+    user = _save(session, user)
     return schemas.UserRead(
         id=user.id,
         email=user.email,
@@ -320,35 +600,47 @@ def update_user(
 
 
 def _unlink_user_references(session: Session, user: models.User) -> None:
-    entries = session.exec(
-        select(models.AttendanceEntry).where(models.AttendanceEntry.user_id == user.id)
-    ).all()
-    for entry in entries:
-        if not entry.recorded_student_id and user.student_id:
-            entry.recorded_student_id = user.student_id
-        if not entry.recorded_barcode_id and user.barcode_id:
-            entry.recorded_barcode_id = user.barcode_id
-        entry.user_id = None
-        session.add(entry)
-
-    jobs = session.exec(select(models.ShopJob).where(models.ShopJob.submitter_id == user.id)).all()
-    for job in jobs:
-        job.submitter_id = None
-        session.add(job)
-
-    orders = session.exec(
-        select(models.OrderRequest).where(models.OrderRequest.requester_id == user.id)
-    ).all()
-    for order in orders:
-        order.requester_id = None
-        session.add(order)
-
-    transactions = session.exec(
-        select(models.InventoryTransaction).where(models.InventoryTransaction.performed_by == user.id)
-    ).all()
-    for txn in transactions:
-        txn.performed_by = None
-        session.add(txn)
+    """Detach ``user`` from everything that points at it, one statement per column."""
+    uid = user.id
+    session.execute(
+        update(models.AttendanceEntry)
+        .where(models.AttendanceEntry.user_id == uid)
+        .values(
+            recorded_student_id=func.coalesce(
+                func.nullif(models.AttendanceEntry.recorded_student_id, ""),
+                user.student_id,
+                models.AttendanceEntry.recorded_student_id,
+            ),
+            recorded_barcode_id=func.coalesce(
+                func.nullif(models.AttendanceEntry.recorded_barcode_id, ""),
+                user.barcode_id,
+                models.AttendanceEntry.recorded_barcode_id,
+            ),
+            user_id=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    for column in (
+        models.ShopJob.submitter_id,
+        models.ShopJob.claimed_by_id,
+        models.OrderRequest.requester_id,
+        models.InventoryTransaction.performed_by,
+        models.ManufacturingPart.approved_by_id,
+        models.ManufacturingPart.eta_by_id,
+        models.Ticket.requester_id,
+        models.SheetLink.updated_by_id,
+    ):
+        session.execute(
+            update(column.class_)
+            .where(column == uid)
+            .values({column.key: None})
+            .execution_options(synchronize_session=False)
+        )
+    session.execute(
+        delete(models.ManufacturingAssignment)
+        .where(models.ManufacturingAssignment.user_id == uid)
+        .execution_options(synchronize_session=False)
+    )
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -363,5 +655,6 @@ def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     _unlink_user_references(session, user)
+    refresh_tokens.forget_user(session, user.id)
     session.delete(user)
     session.commit()
@@ -0,0 +1,43 @@
+"""Admin-only diagnostics for the worker process that serves the request."""
+from __future__ import annotations
+import os
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from .. import models
+from ..core import deps, profiling
+from ..core.config import get_settings
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    dependencies=[Depends(deps.require_roles(models.Role.admin.value))],
+)
+settings = get_settings()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+def profile(
+    seconds: float = Query(default=10, gt=0, le=120),
+    idle: bool = Query(default=False, description="include threads waiting for work"),
+):
+    # Runs on a threadpool thread, so the event loop keeps serving the
+    # requests being profiled.
+    result = profiling.profile(seconds, settings.profile_interval_ms / 1000, include_idle=idle)
+    if result is None:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    samples, ticks = result
+    filename = f"profile-{os.getpid()}-{datetime.utcnow():%Y%m%dT%H%M%S}.folded"
+    return PlainTextResponse(
+        profiling.collapsed(samples),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Ticks": str(ticks),
+        },
+    )
+
+
+@router.get("/slow-requests")
+def slow_requests():
+    """Recent requests slower than SLOW_REQUEST_MS, newest first, with their stack samples."""
+    return list(reversed(profiling.recent_slow))
@@ -1,40 +1,133 @@
 from __future__ import annotations
 from datetime import datetime
-from io import StringIO, BytesIO
-import csv
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
-from sqlmodel import Session
-from ..core import deps
-from ..core.database import get_session
+from typing import Callable, Iterator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from ..core import deps, versions
+from ..core.config import get_settings
+from ..core.database import read_snapshot
+from ..core.http import not_modified
 from .. import models
-from ..services.export_data import get_section_dataset
+from ..services import export_cache
+from ..services.export_bundle import stream_bundle
+from ..services.export_data import HEADERS_MAP, SECTION_TABLES, TITLE_MAP, section_batches
+from ..services.export_formats import EXPORT_FORMATS, ExportFormat, format_available
 
 router = APIRouter(prefix="/exports", tags=["exports"])
 
 
-def _safe_filename(section: models.SheetSection, provided: str | None) -> str:
+def _safe_filename(section: models.SheetSection, provided: str | None, extension: str = ".csv") -> str:
     base = provided.strip() if provided and provided.strip() else f"{section.value}-{datetime.utcnow().date().isoformat()}"
-    if not base.lower().endswith(".csv"):
-        base += ".csv"
-    return base.replace("\n", " ").replace("\r", " ")
+    lowered = base.lower()
+    for known in sorted({fmt.extension for fmt in EXPORT_FORMATS.values()}, key=len, reverse=True):
+        if lowered.endswith(known):
+            base = base[: -len(known)]
+            break
+    base += extension
+    return base.replace("\n", " ").replace("\r", " ").replace('"', "'")
+
+
+def _resolve_format(value: str) -> ExportFormat:
+    export_format = EXPORT_FORMATS.get(value.lower())
+    if not export_format:
+        raise HTTPException(status_code=422, detail=f"Unsupported format. Expected: {', '.join(EXPORT_FORMATS)}")
+    if not format_available(export_format):
+        raise HTTPException(status_code=501, detail=f"{value} export requires the {export_format.requires} package")
+    return export_format
+
+
+def _snapshot_token(sections: list[models.SheetSection], export_format: ExportFormat) -> str:
+    # Taken in the route, before the stream opens its snapshot, so a token can
+    # only ever lag the data it is sent with, never run ahead of it.
+    tables = [table for section in sections for table in SECTION_TABLES[section]]
+    return versions.token(
+        tables,
+        export_format.extension,
+        get_settings().export_mode,
+        *(section.value for section in sections),
+    )
+
+
+def _cache_headers(etag: str, filename: str) -> dict[str, str]:
+    return {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def _export_response(
+    token: str,
+    extension: str,
+    media_type: str,
+    headers: dict[str, str],
+    stream: Callable[[], Iterator[bytes]],
+):
+    if not get_settings().export_cache:
+        return StreamingResponse(stream(), media_type=media_type, headers=headers)
+    cached = export_cache.lookup(token, extension)
+    if cached:
+        return FileResponse(cached, media_type=media_type, headers=headers)
+    return StreamingResponse(export_cache.fill(token, extension, stream()), media_type=media_type, headers=headers)
+
+
+def _stream_section(section: models.SheetSection, export_format: ExportFormat) -> Iterator[bytes]:
+    # The request-scoped session is closed before the body streams, so the
+    # generator holds its own read snapshot for the lifetime of the download.
+    with read_snapshot() as session:
+        yield from export_format.writer(
+            TITLE_MAP[section],
+            HEADERS_MAP[section],
+            section_batches(section, session),
+        )
+
+
+@router.get("/bundle")
+def export_bundle(
+    request: Request,
+    sections: str | None = Query(None, description="Comma-separated sections; defaults to all"),
+    filename: str | None = Query(None, max_length=100),
+    export_format: str = Query("csv", alias="format"),
+    _: deps.Principal = Depends(deps.get_principal),
+):
+    fmt = _resolve_format(export_format)
+    selected: list[models.SheetSection] = []
+    for raw in (sections or "").split(","):
+        if not raw.strip():
+            continue
+        try:
+            section = models.SheetSection(raw.strip())
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=f"Unknown section '{raw.strip()}'") from exc
+        if section not in selected:
+            selected.append(section)
+    if not selected:
+        selected = list(models.SheetSection)
+    base = (filename or "").strip() or f"export-bundle-{datetime.utcnow().date().isoformat()}"
+    if not base.lower().endswith(".zip"):
+        base += ".zip"
+    safe_name = base.replace("\n", " ").replace("\r", " ").replace('"', "'")
+    token = _snapshot_token(selected, fmt)
+    etag = f'W/"{token}"'
+    headers_resp = _cache_headers(etag, safe_name)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers_resp)
+    return _export_response(token, ".zip", "application/zip", headers_resp, lambda: stream_bundle(selected, fmt))
 
 
 @router.get("/{section}")
 def export_section(
+    request: Request,
     section: models.SheetSection,
     filename: str | None = Query(None, max_length=100),
-    session: Session = Depends(get_session),
-    _: models.User = Depends(deps.get_current_user),
+    export_format: str = Query("csv", alias="format"),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
-    title, headers, rows = get_section_dataset(section, session)
-    csv_buffer = StringIO()
-    writer = csv.writer(csv_buffer)
-    writer.writerow(headers)
-    writer.writerows(rows)
-    csv_buffer.seek(0)
-    data = csv_buffer.getvalue().encode("utf-8")
-    stream = BytesIO(data)
-    safe_name = _safe_filename(section, filename or title)
-    headers_resp = {"Content-Disposition": f'attachment; filename="{safe_name}"'}
-    return StreamingResponse(stream, media_type="text/csv", headers=headers_resp)
+    fmt = _resolve_format(export_format)
+    safe_name = _safe_filename(section, filename or TITLE_MAP[section], fmt.extension)
+    token = _snapshot_token([section], fmt)
+    etag = f'W/"{token}"'
+    headers_resp = _cache_headers(etag, safe_name)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers_resp)
+    return _export_response(token, fmt.extension, fmt.media_type, headers_resp, lambda: _stream_section(section, fmt))
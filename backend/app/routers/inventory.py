@@ -1,15 +1,60 @@
+import base64
+import binascii
 import csv
 import io
+import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from typing import Any
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from sqlalchemy import or_
+from sqlalchemy import and_, false, func, insert, or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 from .. import models, schemas
 from ..core.database import get_session
-from ..core import deps
+from ..core import deps, migrations, ratelimit, versions
+from ..services import inventory_usage
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
+Item = models.InventoryItem
+SORT_FIELDS = {
+    "part_name": Item.part_name,
+    "part_type": Item.part_type,
+    "sku": Item.sku,
+    "location": Item.location,
+    "quantity": Item.quantity,
+    "unit_cost": Item.unit_cost,
+    "reorder_threshold": Item.reorder_threshold,
+    "vendor_name": Item.vendor_name,
+    "updated_at": Item.updated_at,
+}
+NULLABLE_SORT_FIELDS = {"sku", "location", "unit_cost", "reorder_threshold", "vendor_name"}
+MAX_SORT_FIELDS = 4
+FACET_CACHE_ENTRIES = 256
+IMPORT_REQUIRED_COLUMNS = {"part_name", "part_type", "sku", "location", "quantity", "unit_cost", "reorder_threshold"}
+IMPORT_UPSERT_COLUMNS = (
+    "part_name",
+    "part_type",
+    "location",
+    "quantity",
+    "unit_cost",
+    "reorder_threshold",
+    "tags",
+    "vendor_name",
+    "vendor_link",
+    "updated_at",
+)
+IMPORT_BATCH_ROWS = 1000
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+_facet_cache: OrderedDict[tuple, tuple[str, int, schemas.InventoryFacets]] = OrderedDict()
+_facet_cache_lock = threading.Lock()
+# Set once this process has seen the sku index unique; imports upsert on it.
+_sku_unique = False
+
 def _serialize_item(item: models.InventoryItem) -> schemas.InventoryItemRead:
     return schemas.InventoryItemRead(
         id=item.id,
@@ -31,26 +76,263 @@ def list_items(
     session: Session = Depends(get_session),
     q: str | None = Query(default=None, description="Search by name, sku, location, tags"),
     location: str | None = None,
-    _: models.User = Depends(deps.get_current_user),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
     statement = select(models.InventoryItem)
     if q:
-        like = f"%{q}%"
-        statement = statement.where(
-            or_(
-                models.InventoryItem.part_name.ilike(like),
-                models.InventoryItem.sku.ilike(like),
-                 models.InventoryItem.vendor_name.ilike(like),
-                models.InventoryItem.location.ilike(like),
-                models.InventoryItem.tags.ilike(like),
-            )
-        )
+        statement = statement.where(_search(q))
     if location:
         statement = statement.where(models.InventoryItem.location == location)
     items = session.exec(statement.order_by(models.InventoryItem.part_name)).all()
     return [_serialize_item(item) for item in items]
 
 
+def _search(q: str):
+    like = f"%{q}%"
+    return or_(
+        Item.part_name.ilike(like),
+        Item.sku.ilike(like),
+        Item.vendor_name.ilike(like),
+        Item.location.ilike(like),
+        Item.tags.ilike(like),
+    )
+
+
+def _parse_sort(sort: str) -> list[tuple[str, bool]]:
+    keys: list[tuple[str, bool]] = []
+    for raw in sort.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        name = raw.lstrip("-")
+        if name not in SORT_FIELDS:
+            raise HTTPException(status_code=422, detail=f"Cannot sort by '{name}'")
+        if any(name == existing for existing, _ in keys):
+            raise HTTPException(status_code=422, detail=f"'{name}' appears twice in sort")
+        keys.append((name, raw.startswith("-")))
+    if len(keys) > MAX_SORT_FIELDS:
+        raise HTTPException(status_code=422, detail=f"Sort by at most {MAX_SORT_FIELDS} fields")
+    return keys or [("part_name", False)]
+
+
+def _order_by(keys: list[tuple[str, bool]]) -> list:
+    # NULLs rank lowest in both directions, as SQLite does by default; the
+    # keyset condition below relies on that order. id breaks ties.
+    clauses = []
+    for name, descending in keys:
+        column = SORT_FIELDS[name]
+        if name in NULLABLE_SORT_FIELDS:
+            clauses.append(column.desc().nulls_last() if descending else column.asc().nulls_first())
+        else:
+            clauses.append(column.desc() if descending else column.asc())
+    return [*clauses, Item.id.asc()]
+
+
+def _beyond(name: str, value: Any, descending: bool):
+    column = SORT_FIELDS[name]
+    if value is None:
+        # After a NULL come the non-NULLs when ascending, nothing when descending.
+        return false() if descending else column.is_not(None)
+    if descending:
+        return or_(column < value, column.is_(None)) if name in NULLABLE_SORT_FIELDS else column < value
+    return column > value
+
+
+def _after(keys: list[tuple[str, bool]], values: list[Any], item_id: int):
+    """Rows strictly after the cursor row in the requested order."""
+    clauses = []
+    equal = []
+    for (name, descending), value in zip(keys, values):
+        clauses.append(and_(*equal, _beyond(name, value, descending)))
+        column = SORT_FIELDS[name]
+        equal.append(column.is_(None) if value is None else column == value)
+    clauses.append(and_(*equal, Item.id > item_id))
+    condition = or_(*clauses)
+    # A plain range on the leading key lets SQLite seek an index to the cursor.
+    name, descending = keys[0]
+    if values[0] is not None and not (descending and name in NULLABLE_SORT_FIELDS):
+        column = SORT_FIELDS[name]
+        condition = and_(column <= values[0] if descending else column >= values[0], condition)
+    return condition
+
+
+def _cursor_value(name: str, value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, models.InventoryPartType):
+        return value.value
+    return value
+
+
+def _column_value(name: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if name == "updated_at":
+        return datetime.fromisoformat(value)
+    if name == "part_type":
+        return models.InventoryPartType(value)
+    return value
+
+
+def _encode_cursor(sort: str, keys: list[tuple[str, bool]], item: models.InventoryItem) -> str:
+    after = [_cursor_value(name, getattr(item, name)) for name, _ in keys]
+    raw = json.dumps({"sort": sort, "after": [*after, item.id]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str, keys: list[tuple[str, bool]]) -> tuple[list[Any], int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        *after, item_id = data["after"]
+        if data["sort"] != sort or len(after) != len(keys):
+            raise ValueError
+        values = [_column_value(name, value) for (name, _), value in zip(keys, after)]
+        return values, int(item_id)
+    except (binascii.Error, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor for this sort")
+
+
+def _facets(
+    session: Session,
+    base: list,
+    part_type: models.InventoryPartType | None,
+    location: str | None,
+    cache_key: tuple,
+) -> tuple[int, schemas.InventoryFacets]:
+    token = versions.token(("inventoryitem",))
+    with _facet_cache_lock:
+        cached = _facet_cache.get(cache_key)
+        if cached is not None and cached[0] == token:
+            _facet_cache.move_to_end(cache_key)
+            return cached[1], cached[2]
+    # One grouped query serves every count: each facet applies the other
+    # facet's filter but not its own, so the UI can offer the alternatives.
+    rows = session.exec(
+        select(Item.location, Item.part_type, func.count()).where(*base).group_by(Item.location, Item.part_type)
+    ).all()
+
+    def matches_location(value: str | None) -> bool:
+        return location is None or value == (location or None)
+
+    by_location: dict[str | None, int] = {}
+    by_type: dict[str, int] = {}
+    total = 0
+    for row_location, row_type, count in rows:
+        if part_type is None or row_type == part_type:
+            by_location[row_location] = by_location.get(row_location, 0) + count
+        if matches_location(row_location):
+            by_type[row_type.value] = by_type.get(row_type.value, 0) + count
+            if part_type is None or row_type == part_type:
+                total += count
+    facets = schemas.InventoryFacets(
+        location=[
+            schemas.FacetCount(value=value, count=count)
+            for value, count in sorted(by_location.items(), key=lambda entry: (entry[0] is not None, entry[0] or ""))
+        ],
+        part_type=[schemas.FacetCount(value=value, count=count) for value, count in sorted(by_type.items())],
+    )
+    with _facet_cache_lock:
+        _facet_cache[cache_key] = (token, total, facets)
+        _facet_cache.move_to_end(cache_key)
+        while len(_facet_cache) > FACET_CACHE_ENTRIES:
+            _facet_cache.popitem(last=False)
+    return total, facets
+
+
+@router.get("/items/page", response_model=schemas.InventoryPage)
+def list_items_page(
+    session: Session = Depends(get_session),
+    q: str | None = Query(default=None, description="Search by name, sku, location, vendor, tags"),
+    part_type: str | None = None,
+    location: str | None = Query(default=None, description="Exact location; empty matches items without one"),
+    vendor_name: str | None = None,
+    low_stock: bool = Query(default=False, description="Only items at or below their reorder threshold"),
+    sort: str = Query(default="part_name", description="Comma-separated fields, '-' prefix for descending"),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+    _: deps.Principal = Depends(deps.get_principal),
+):
+    """One page of the catalog in keyset order; the first page also carries counts."""
+    keys = _parse_sort(sort)
+    sort = ",".join(f"{'-' if descending else ''}{name}" for name, descending in keys)
+    try:
+        type_filter = models.InventoryPartType(part_type) if part_type else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid part_type '{part_type}'")
+
+    base = []
+    if q:
+        base.append(_search(q))
+    if vendor_name:
+        base.append(Item.vendor_name == vendor_name)
+    if low_stock:
+        base.append(models.INVENTORY_LOW_STOCK)
+    conditions = list(base)
+    if type_filter is not None:
+        conditions.append(Item.part_type == type_filter)
+    if location is not None:
+        conditions.append(Item.location == location if location else Item.location.is_(None))
+
+    statement = select(Item).where(*conditions)
+    if cursor:
+        values, item_id = _decode_cursor(cursor, sort, keys)
+        statement = statement.where(_after(keys, values, item_id))
+    items = session.exec(statement.order_by(*_order_by(keys)).limit(limit + 1)).all()
+    page = items[:limit]
+    next_cursor = _encode_cursor(sort, keys, page[-1]) if len(items) > limit else None
+
+    total = facets = None
+    if not cursor:
+        cache_key = (q, vendor_name, low_stock, type_filter, location)
+        total, facets = _facets(session, base, type_filter, location, cache_key)
+    return schemas.InventoryPage(
+        items=[_serialize_item(item) for item in page],
+        next_cursor=next_cursor,
+        total=total,
+        facets=facets,
+    )
+
+
+@router.get("/low-stock", response_model=list[schemas.LowStockItem])
+def low_stock(
+    session: Session = Depends(get_session),
+    part_type: str | None = None,
+    location: str | None = None,
+    _: deps.Principal = Depends(deps.get_principal),
+):
+    """Items at or below their reorder threshold, soonest to run out first."""
+    statement = select(Item).where(models.INVENTORY_LOW_STOCK)
+    if part_type:
+        try:
+            statement = statement.where(Item.part_type == models.InventoryPartType(part_type))
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid part_type '{part_type}'")
+    if location:
+        statement = statement.where(Item.location == location)
+    now = datetime.utcnow()
+    rows = []
+    for item in session.exec(statement).all():
+        rate = inventory_usage.rate_per_day(item, now)
+        rows.append(
+            schemas.LowStockItem(
+                **_serialize_item(item).dict(),
+                usage_per_day=round(rate, 3),
+                days_left=round(max(item.quantity, 0) / rate, 1) if rate > 0 else None,
+                suggested_order=inventory_usage.suggested_order(item, rate),
+            )
+        )
+    rows.sort(key=lambda row: (row.days_left is None, row.days_left or 0, row.part_name))
+    return rows
+
+
+def _commit_unique_sku(session: Session) -> None:
+    try:
+        session.commit()
+    except IntegrityError as exc:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Another item already has this SKU") from exc
+
+
 @router.post("/items", response_model=schemas.InventoryItemRead)
 def create_item(
     payload: schemas.InventoryItemCreate,
@@ -59,7 +341,7 @@ def create_item(
 ):
     item = models.InventoryItem(**payload.dict())
     session.add(item)
-    session.commit()
+    _commit_unique_sku(session)
     session.refresh(item)
     return _serialize_item(item)
 
@@ -78,11 +360,61 @@ def update_item(
         setattr(item, field, value)
     item.updated_at = datetime.utcnow()
     session.add(item)
-    session.commit()
+    _commit_unique_sku(session)
     session.refresh(item)
     return _serialize_item(item)
 
 
+def _reason(value: str) -> models.InventoryReason:
+    try:
+        return models.InventoryReason(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid reason '{value}'")
+
+
+def _apply_adjustment(
+    session: Session,
+    item_id: int,
+    delta: int,
+    reason: models.InventoryReason,
+    note: str | None,
+    reserve: bool,
+    performed_by: int | None,
+    now: datetime,
+) -> models.InventoryItem | None:
+    """Add ``delta`` in the database and log it; None if the item is missing or, reserving, short."""
+    statement = update(Item).where(Item.id == item_id).values(quantity=Item.quantity + delta, updated_at=now)
+    if reserve and delta < 0:
+        statement = statement.where(Item.quantity + delta >= 0)
+    item = session.execute(
+        statement.returning(Item), execution_options={"populate_existing": True}
+    ).scalar_one_or_none()
+    if item is None:
+        return None
+    # The UPDATE took SQLite's write lock, held until commit, so the usage
+    # columns returned with it cannot change underneath.
+    inventory_usage.record(item, delta, reason, now)
+    session.add(
+        models.InventoryTransaction(
+            item_id=item_id,
+            delta=delta,
+            reason=reason,
+            note=note,
+            performed_by=performed_by,
+            created_at=now,
+        )
+    )
+    return item
+
+
+def _not_applied(session: Session, item_id: int, delta: int) -> str | None:
+    """Why an adjustment matched no row: None if the item is missing, else the shortage."""
+    quantity = session.exec(select(Item.quantity).where(Item.id == item_id)).first()
+    if quantity is None:
+        return None
+    return f"item {item_id} has {quantity}, {-delta} requested"
+
+
 @router.post("/items/{item_id}/adjust", response_model=schemas.InventoryItemRead)
 def adjust_item(
     item_id: int,
@@ -90,23 +422,51 @@ def adjust_item(
     session: Session = Depends(get_session),
     current: models.User = Depends(deps.require_roles(models.Role.lead.value, models.Role.admin.value)),
 ):
-    item = session.get(models.InventoryItem, item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    item.quantity += payload.delta
-    item.updated_at = datetime.utcnow()
-    transaction = models.InventoryTransaction(
-        item_id=item.id,
-        delta=payload.delta,
-        reason=models.InventoryReason(payload.reason),
-        note=payload.note,
-        performed_by=current.id,
+    reason = _reason(payload.reason)
+    item = _apply_adjustment(
+        session, item_id, payload.delta, reason, payload.note, payload.reserve, current.id, datetime.utcnow()
     )
-    session.add(item)
-    session.add(transaction)
+    if item is None:
+        shortage = _not_applied(session, item_id, payload.delta)
+        session.rollback()
+        if shortage is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        raise HTTPException(status_code=409, detail=f"Not enough stock: {shortage}")
+    # RETURNING already loaded the row; serialize before commit expires it.
+    result = _serialize_item(item)
     session.commit()
-    session.refresh(item)
-    return _serialize_item(item)
+    return result
+
+
+@router.post("/items/adjust", response_model=list[schemas.InventoryItemRead])
+def adjust_items(
+    payload: schemas.InventoryBatchAdjust,
+    session: Session = Depends(get_session),
+    current: models.User = Depends(deps.require_roles(models.Role.lead.value, models.Role.admin.value)),
+):
+    """Apply a pick list in one transaction: every line or none."""
+    reason = _reason(payload.reason)
+    now = datetime.utcnow()
+    adjusted: dict[int, models.InventoryItem] = {}
+    shortages: list[str] = []
+    for line in payload.lines:
+        item = _apply_adjustment(
+            session, line.item_id, line.delta, reason, payload.note, payload.reserve, current.id, now
+        )
+        if item is not None:
+            adjusted[item.id] = item
+            continue
+        shortage = _not_applied(session, line.item_id, line.delta)
+        if shortage is None:
+            session.rollback()
+            raise HTTPException(status_code=404, detail=f"Item {line.item_id} not found")
+        shortages.append(shortage)
+    if shortages:
+        session.rollback()
+        raise HTTPException(status_code=409, detail=f"Not enough stock: {'; '.join(shortages)}")
+    result = [_serialize_item(item) for item in adjusted.values()]
+    session.commit()
+    return result
 
 
 @router.delete("/items/{item_id}")
@@ -123,88 +483,238 @@ def delete_item(
     return {"status": "deleted"}
 
 
-@router.post("/items/import")
-async def import_items(
+def _import_values(row: dict[str, str | None], has_vendor: bool) -> dict[str, Any]:
+    """Validate one CSV row into InventoryItem columns; ValueError says what is wrong.
+
+    Without a vendor_name column a COTS row may still update an item that
+    has a vendor; _upsert_batch rejects the ones that would be new.
+    """
+
+    def cleaned(field: str) -> str:
+        return (row.get(field) or "").strip()
+
+    part_name = cleaned("part_name")
+    part_type_raw = cleaned("part_type").lower()
+    sku = cleaned("sku")
+    location = cleaned("location")
+    vendor_name = cleaned("vendor_name")
+
+    if not part_name:
+        raise ValueError("part_name is required")
+    if not part_type_raw:
+        raise ValueError("part_type is required")
+    try:
+        part_type = models.InventoryPartType(part_type_raw)
+    except ValueError:
+        valid = ", ".join([ptype.value for ptype in models.InventoryPartType])
+        raise ValueError(f"invalid part_type '{part_type_raw}'. Expected: {valid}")
+    if not sku:
+        raise ValueError("sku is required")
+    if not location:
+        raise ValueError("location is required")
+    if part_type == models.InventoryPartType.cots and has_vendor and not vendor_name:
+        raise ValueError("vendor_name required for COTS items")
+
+    try:
+        quantity = int(cleaned("quantity"))
+    except ValueError:
+        raise ValueError("quantity must be an integer")
+
+    unit_cost_raw = cleaned("unit_cost")
+    try:
+        unit_cost = float(unit_cost_raw) if unit_cost_raw else None
+    except ValueError:
+        raise ValueError("unit_cost must be a number")
+
+    reorder_raw = cleaned("reorder_threshold")
+    try:
+        reorder_threshold = int(reorder_raw) if reorder_raw else None
+    except ValueError:
+        raise ValueError("reorder_threshold must be an integer")
+
+    return {
+        "part_name": part_name,
+        "part_type": part_type,
+        "sku": sku,
+        "location": location,
+        "quantity": quantity,
+        "unit_cost": unit_cost,
+        "reorder_threshold": reorder_threshold,
+        "tags": cleaned("tags") or None,
+        "vendor_name": vendor_name or None,
+        "vendor_link": cleaned("vendor_link") or None,
+    }
+
+
+def _require_unique_sku(session: Session, dry_run: bool) -> None:
+    global _sku_unique
+    if _sku_unique:
+        return
+    conn = session.connection()
+    if not migrations.sku_index_unique(conn):
+        shared = migrations.shared_skus(conn)
+        if shared:
+            session.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"Several items share SKU {', '.join(shared)}; give each its own SKU before importing",
+            )
+        if dry_run:
+            session.rollback()
+            return
+        migrations.make_sku_unique(conn)
+        versions.touch(session, "inventoryitem")
+    session.commit()
+    _sku_unique = True
+
+
+def _upsert_batch(
+    session: Session,
+    rows: list[tuple[int, dict[str, Any]]],
+    update_columns: list[str],
+    performed_by: int | None,
+    now: datetime,
+    dry_run: bool,
+) -> tuple[int, int, list[int]]:
+    """Insert or update a batch by sku and commit it.
+
+    Existing items only get ``update_columns`` overwritten. Returns the
+    inserted and updated counts and the CSV rows rejected as new COTS items
+    without a vendor.
+    """
+    existing = {
+        sku: (item_id, quantity)
+        for sku, item_id, quantity in session.exec(
+            select(Item.sku, Item.id, Item.quantity).where(Item.sku.in_([values["sku"] for _, values in rows]))
+        ).all()
+    }
+    rejected = [
+        row_index
+        for row_index, values in rows
+        if values["sku"] not in existing
+        and values["part_type"] == models.InventoryPartType.cots
+        and not values["vendor_name"]
+    ]
+    skipped = set(rejected)
+    batch = [values for row_index, values in rows if row_index not in skipped]
+    if not batch:
+        session.rollback()
+        return 0, 0, rejected
+    if dry_run:
+        session.rollback()
+        return len(batch) - len(existing), len(existing), rejected
+    statement = sqlite_insert(Item)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Item.sku],
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
+    session.execute(statement, [{**values, "updated_at": now} for values in batch])
+    # Overwritten quantities stay explained in the item history.
+    corrections = [
+        {
+            "item_id": existing[values["sku"]][0],
+            "delta": values["quantity"] - existing[values["sku"]][1],
+            "reason": models.InventoryReason.correction,
+            "note": "CSV import",
+            "performed_by": performed_by,
+            "created_at": now,
+        }
+        for values in batch
+        if values["sku"] in existing and values["quantity"] != existing[values["sku"]][1]
+    ]
+    if corrections:
+        session.execute(insert(models.InventoryTransaction), corrections)
+    session.commit()
+    return len(batch) - len(existing), len(existing), rejected
+
+
+@router.post(
+    "/items/import",
+    response_model=schemas.InventoryImportResult,
+    dependencies=[Depends(ratelimit.limit(ratelimit.upload_by_ip))],
+)
+def import_items(
     file: UploadFile = File(...),
+    dry_run: bool = Query(default=False, description="Validate and count without writing"),
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.require_roles(models.Role.lead.value, models.Role.admin.value)),
+    current: models.User = Depends(deps.require_roles(models.Role.lead.value, models.Role.admin.value)),
 ):
-    raw_bytes = await file.read()
+    """Create or update items by sku from a CSV, a batch at a time; bad rows are reported, not fatal.
+
+    Each batch commits on its own so the write lock is never held for long.
+    If the upload breaks off, the batches before it stay imported, and
+    importing the same file again is safe because rows update by sku.
+    """
+    _require_unique_sku(session, dry_run)
+    # Runs on the threadpool and reads the spooled upload a row at a time.
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
     try:
-        decoded = raw_bytes.decode("utf-8-sig")
-    except UnicodeDecodeError as exc:
-        raise HTTPException(status_code=400, detail="CSV must be utf-8 encoded") from exc
-
-    reader = csv.DictReader(io.StringIO(decoded))
-    required_columns = {"part_name", "part_type", "sku", "location", "quantity", "unit_cost", "reorder_threshold"}
-    missing = required_columns.difference(reader.fieldnames or [])
-    if missing:
-        raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(sorted(missing))}")
-
-    items_to_create: list[models.InventoryItem] = []
-    for row_index, row in enumerate(reader, start=2):
-        def cleaned(field: str) -> str:
-            return (row.get(field) or "").strip()
-
-        part_name = cleaned("part_name")
-        part_type_raw = cleaned("part_type").lower()
-        sku = cleaned("sku")
-        location = cleaned("location")
-        vendor_name = cleaned("vendor_name")
-
-        if not part_name:
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: part_name is required")
-        if not part_type_raw:
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: part_type is required")
+        reader = csv.DictReader(text)
         try:
-            part_type = models.InventoryPartType(part_type_raw)
-        except ValueError:
-            valid = ", ".join([ptype.value for ptype in models.InventoryPartType])
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: invalid part_type '{part_type_raw}'. Expected: {valid}")
-        if not sku:
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: sku is required")
-        if not location:
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: location is required")
-        if part_type == models.InventoryPartType.cots and not vendor_name:
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: vendor_name required for COTS items")
-
-        tags = cleaned("tags") or None
-        vendor_link = cleaned("vendor_link") or None
+            fieldnames = reader.fieldnames
+        except UnicodeDecodeError as exc:
+            raise HTTPException(status_code=400, detail="CSV must be utf-8 encoded") from exc
+        missing = IMPORT_REQUIRED_COLUMNS.difference(fieldnames or [])
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(sorted(missing))}")
+        # Optional columns the file leaves out keep their stored values.
+        update_columns = [column for column in IMPORT_UPSERT_COLUMNS if column in fieldnames or column == "updated_at"]
 
-        try:
-            quantity = int(cleaned("quantity"))
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: quantity must be an integer")
+        now = datetime.utcnow()
+        inserted = updated = error_count = 0
+        errors: list[schemas.InventoryImportError] = []
+        seen: dict[str, int] = {}
+        has_vendor = "vendor_name" in fieldnames
+        batch: list[tuple[int, dict[str, Any]]] = []
 
-        unit_cost_raw = cleaned("unit_cost")
-        try:
-            unit_cost = float(unit_cost_raw) if unit_cost_raw else None
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: unit_cost must be a number")
+        def flush() -> None:
+            nonlocal inserted, updated
+            added, changed, rejected = _upsert_batch(session, batch, update_columns, current.id, now, dry_run)
+            inserted += added
+            updated += changed
+            by_row = dict(batch)
+            for row_index in rejected:
+                report(row_index, by_row[row_index]["sku"], "vendor_name required for COTS items")
+            batch.clear()
+
+        def report(row_index: int, sku: str | None, detail: str) -> None:
+            nonlocal error_count
+            error_count += 1
+            if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                errors.append(schemas.InventoryImportError(row=row_index, sku=sku, detail=detail))
 
-        reorder_raw = cleaned("reorder_threshold")
+        row_index = 1
         try:
-            reorder_threshold = int(reorder_raw) if reorder_raw else None
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Row {row_index}: reorder_threshold must be an integer")
-
-        item = models.InventoryItem(
-            part_name=part_name,
-            part_type=part_type,
-            sku=sku,
-            location=location,
-            quantity=quantity,
-            unit_cost=unit_cost,
-            reorder_threshold=reorder_threshold,
-            tags=tags,
-            vendor_name=vendor_name or None,
-            vendor_link=vendor_link,
-        )
-        items_to_create.append(item)
+            for row_index, row in enumerate(reader, start=2):
+                try:
+                    values = _import_values(row, has_vendor)
+                except ValueError as exc:
+                    report(row_index, (row.get("sku") or "").strip() or None, str(exc))
+                    continue
+                first = seen.setdefault(values["sku"], row_index)
+                if first != row_index:
+                    report(row_index, values["sku"], f"Duplicate sku, first on row {first}")
+                    continue
+                batch.append((row_index, values))
+                if len(batch) >= IMPORT_BATCH_ROWS:
+                    flush()
+        except UnicodeDecodeError as exc:
+            session.rollback()
+            done = "nothing was imported" if dry_run or not (inserted or updated) else "earlier rows were imported"
+            raise HTTPException(
+                status_code=400, detail=f"CSV must be utf-8 encoded; stopped after row {row_index}, {done}"
+            ) from exc
+        if batch:
+            flush()
+    finally:
+        text.detach()
 
-    if not items_to_create:
+    if not seen and not error_count:
         raise HTTPException(status_code=400, detail="No rows parsed from CSV")
-
-    session.add_all(items_to_create)
-    session.commit()
-    return {"inserted": len(items_to_create)}
+    return schemas.InventoryImportResult(
+        dry_run=dry_run,
+        inserted=inserted,
+        updated=updated,
+        error_count=error_count,
+        errors=sorted(errors, key=lambda error: error.row),
+    )
@@ -1,4 +1,3 @@
-from pathlib import Path
 from datetime import datetime
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, Query, Form
 from sqlalchemy import func
@@ -6,21 +5,14 @@ from sqlmodel import Session, select
 from .. import models, schemas
 from ..core.database import get_session
 from ..core.config import get_settings
-from ..core import deps
+from ..core import deps, ratelimit
+from ..services.serializers import job_to_dict
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 settings = get_settings()
 
 
-def _file_url_from_path(p: str) -> str | None:
-    try:
-        rel = Path(p).resolve().relative_to(settings.upload_root.resolve())
-        return f"/uploads/{rel.as_posix()}"
-    except Exception:
-        return None
-
-
-@router.post("/")
+@router.post("/", dependencies=[Depends(ratelimit.limit(ratelimit.upload_by_ip))])
 async def submit_job(
     shop: str = Form(...),
     part_name: str = Form(...),
@@ -59,20 +51,20 @@ async def submit_job(
     session.add(job)
     session.commit()
     session.refresh(job)
-    return _job_to_dict(job, session)
+    return job_to_dict(job, session)
 
 
 @router.get("/")
 def list_jobs(
     shop: str | None = Query(default=None),
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.get_current_user),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
     statement = select(models.ShopJob).order_by(models.ShopJob.queue_position.asc(), models.ShopJob.created_at.asc())
     if shop:
         statement = statement.where(models.ShopJob.shop == models.ShopType(shop))
     jobs = session.exec(statement).all()
-    return [_job_to_dict(job, session) for job in jobs]
+    return [job_to_dict(job, session) for job in jobs]
 
 
 @router.patch("/{job_id}")
@@ -97,7 +89,7 @@ def update_job_status(
     session.add(job)
     session.commit()
     session.refresh(job)
-    return _job_to_dict(job, session)
+    return job_to_dict(job, session)
 
 
 @router.delete("/{job_id}")
@@ -152,7 +144,7 @@ def reorder_jobs(
         .where(models.ShopJob.shop == shop_enum)
         .order_by(models.ShopJob.queue_position.asc(), models.ShopJob.created_at.asc())
     ).all()
-    return [_job_to_dict(job, session) for job in refreshed]
+    return [job_to_dict(job, session) for job in refreshed]
 
 
 @router.post("/{job_id}/claim", response_model=schemas.ShopJobRead)
@@ -171,7 +163,7 @@ def claim_job(
     session.add(job)
     session.commit()
     session.refresh(job)
-    return _job_to_dict(job, session)
+    return job_to_dict(job, session)
 
 
 @router.post("/{job_id}/unclaim", response_model=schemas.ShopJobRead)
@@ -192,27 +184,4 @@ def unclaim_job(
     session.add(job)
     session.commit()
     session.refresh(job)
-    return _job_to_dict(job, session)
-
-
-def _job_to_dict(job: models.ShopJob, session: Session) -> dict:
-    claimed_name = None
-    if job.claimed_by_id:
-        user = session.get(models.User, job.claimed_by_id)
-        claimed_name = user.full_name if user else None
-    return {
-        "id": job.id,
-        "shop": job.shop.value,
-        "part_name": job.part_name,
-        "owner_name": job.owner_name,
-        "status": job.status.value,
-        "notes": job.notes,
-        "file_name": job.file_name,
-        "created_at": job.created_at,
-        "file_url": _file_url_from_path(job.file_path),
-        "queue_position": job.queue_position,
-        "claimed_by_id": job.claimed_by_id,
-        "claimed_by_name": claimed_name,
-        "claimed_at": job.claimed_at,
-    }
-
+    return job_to_dict(job, session)
@@ -4,32 +4,17 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import shutil
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, status
-from sqlalchemy import func, or_
+from sqlalchemy import delete, func, or_
 from sqlmodel import Session, select
 from .. import models, schemas
-from ..core import deps
+from ..core import deps, ratelimit
 from ..core.database import get_session
 from ..core.config import get_settings
+from ..services.serializers import PRIORITY_WEIGHT, STATUS_ORDER, parts_to_read
 
 router = APIRouter(prefix="/manufacturing", tags=["manufacturing"])
 settings = get_settings()
 
-STATUS_LABELS = {
-    models.ManufacturingStatus.design_submitted: "Design Submitted",
-    models.ManufacturingStatus.ready_for_manufacturing: "Ready for Manufacturing",
-    models.ManufacturingStatus.in_progress: "In Progress",
-    models.ManufacturingStatus.quality_check: "Quality Check",
-    models.ManufacturingStatus.completed: "Completed",
-}
-
-STATUS_ORDER = {status: idx for idx, status in enumerate(STATUS_LABELS.keys())}
-
-PRIORITY_WEIGHT = {
-    models.ManufacturingPriority.urgent: 0,
-    models.ManufacturingPriority.normal: 1,
-    models.ManufacturingPriority.low: 2,
-}
-
 TYPE_REQUIRED_FIELDS = {
     models.ManufacturingType.cnc: ["cam_link", "cam_student", "cnc_operator", "material_stock"],
     models.ManufacturingType.printing: ["printer_assignment", "slicer_profile", "filament_type"],
@@ -132,74 +117,76 @@ def _ensure_positive_quantity(quantity: int | None) -> None:
         raise HTTPException(status_code=422, detail="Quantity must be at least 1")
 
 
-def _load_users_map(session: Session, parts: list[models.ManufacturingPart]) -> dict[int, models.User]:
-    ids: set[int] = set()
-    for part in parts:
-        ids.add(part.created_by_id)
-        if part.approved_by_id:
-            ids.add(part.approved_by_id)
-        if part.eta_by_id:
-            ids.add(part.eta_by_id)
-        for sid in part.assigned_student_ids or []:
-            ids.add(sid)
-        for lid in part.assigned_lead_ids or []:
-            ids.add(lid)
-    if not ids:
-        return {}
-    rows = session.exec(select(models.User).where(models.User.id.in_(ids))).all()
-    return {row.id: row for row in rows if row}
-
-
 def _manufacturing_upload_dir(part_id: int) -> Path:
     folder = settings.upload_root / "manufacturing" / str(part_id)
     folder.mkdir(parents=True, exist_ok=True)
     return folder
 
 
-def _file_url_from_path(path: str | None) -> str | None:
-    if not path:
-        return None
-
-
 def _remove_part_files(part_id: int) -> None:
     folder = settings.upload_root / "manufacturing" / str(part_id)
     if folder.exists():
         shutil.rmtree(folder, ignore_errors=True)
-    try:
-        rel = Path(path).resolve().relative_to(settings.upload_root.resolve())
-        return f"/uploads/{rel.as_posix()}"
-    except Exception:
-        return None
 
 
-def _assignment_from_user(user: models.User | None) -> schemas.ManufacturingAssignment | None:
-    if not user:
-        return None
-    return schemas.ManufacturingAssignment(id=user.id, name=user.full_name, role=user.role.value)
+def _is_assigned(
+    session: Session,
+    part_id: int,
+    user_id: int,
+    role: models.AssignmentRole | None = None,
+) -> bool:
+    statement = select(models.ManufacturingAssignment.part_id).where(
+        models.ManufacturingAssignment.part_id == part_id,
+        models.ManufacturingAssignment.user_id == user_id,
+    )
+    if role is not None:
+        statement = statement.where(models.ManufacturingAssignment.role == role)
+    return session.exec(statement.limit(1)).first() is not None
 
 
-def _assignments_from_ids(
-    ids: list[int] | None,
-    user_map: dict[int, models.User],
-) -> list[schemas.ManufacturingAssignment]:
-    if not ids:
-        return []
-    assignments: list[schemas.ManufacturingAssignment] = []
-    for uid in ids:
-        user = user_map.get(uid)
-        if not user:
-            continue
-        assignments.append(
-            schemas.ManufacturingAssignment(id=user.id, name=user.full_name, role=user.role.value)
+def _set_assignments(
+    session: Session,
+    part_id: int,
+    role: models.AssignmentRole,
+    user_ids: list[int],
+) -> None:
+    session.execute(
+        delete(models.ManufacturingAssignment).where(
+            models.ManufacturingAssignment.part_id == part_id,
+            models.ManufacturingAssignment.role == role,
         )
-    return assignments
+    )
+    session.add_all(
+        models.ManufacturingAssignment(part_id=part_id, role=role, user_id=uid, position=position)
+        for position, uid in enumerate(user_ids)
+    )
+
 
+def _add_assignment(session: Session, part_id: int, role: models.AssignmentRole, user_id: int) -> None:
+    last = session.exec(
+        select(func.max(models.ManufacturingAssignment.position)).where(
+            models.ManufacturingAssignment.part_id == part_id,
+            models.ManufacturingAssignment.role == role,
+        )
+    ).first()
+    session.add(
+        models.ManufacturingAssignment(
+            part_id=part_id,
+            role=role,
+            user_id=user_id,
+            position=0 if last is None else last + 1,
+        )
+    )
 
-def _can_touch(part: models.ManufacturingPart, user: models.User) -> bool:
-    if _is_lead(user):
+
+def _can_touch(
+    session: Session,
+    part: models.ManufacturingPart,
+    user: models.User,
+) -> bool:
+    if _is_lead(user) or part.created_by_id == user.id:
         return True
-    assignments = (part.assigned_student_ids or []) + (part.assigned_lead_ids or [])
-    return part.created_by_id == user.id or user.id in assignments
+    return _is_assigned(session, part.id, user.id)
 
 
 def _next_lane_position(session: Session, status: models.ManufacturingStatus) -> int:
@@ -272,83 +259,31 @@ def _apply_eta(
     part.eta_by_id = current.id
 
 
-def _serialize_parts(
-    parts: list[models.ManufacturingPart],
-    session: Session,
-    current: models.User,
-) -> list[schemas.ManufacturingPartRead]:
-    user_map = _load_users_map(session, parts)
-    serialized: list[schemas.ManufacturingPartRead] = []
-    for part in parts:
-        created_by = _assignment_from_user(user_map.get(part.created_by_id))
-        approved_by = _assignment_from_user(user_map.get(part.approved_by_id))
-        assigned_students = _assignments_from_ids(part.assigned_student_ids, user_map)
-        assigned_leads = _assignments_from_ids(part.assigned_lead_ids, user_map)
-        can_assign = _is_lead(current)
-        can_edit = can_assign or _can_touch(part, current)
-        can_move = can_edit and (can_assign or not part.status_locked)
-        eta_by = _assignment_from_user(user_map.get(part.eta_by_id)) if part.eta_by_id else None
-        serialized.append(
-            schemas.ManufacturingPartRead(
-                id=part.id,
-                part_name=part.part_name,
-                subsystem=part.subsystem,
-                material=part.material,
-                quantity=part.quantity,
-                manufacturing_type=part.manufacturing_type.value,
-                cad_link=part.cad_link,
-                cam_link=part.cam_link,
-                cam_student=part.cam_student,
-                cnc_operator=part.cnc_operator,
-                material_stock=part.material_stock,
-                printer_assignment=part.printer_assignment,
-                slicer_profile=part.slicer_profile,
-                filament_type=part.filament_type,
-                tool_type=part.tool_type,
-                dimensions=part.dimensions,
-                responsible_student=part.responsible_student,
-                notes=part.notes,
-                priority=part.priority.value,
-                status=part.status.value,
-                status_label=STATUS_LABELS[part.status],
-                status_locked=part.status_locked,
-                lock_reason=part.lock_reason,
-                created_at=part.created_at,
-                updated_at=part.updated_at,
-                last_status_change=part.last_status_change,
-                created_by=created_by if created_by else schemas.ManufacturingAssignment(id=part.created_by_id, name=part.created_by_name, role="unknown"),
-                approved_by=approved_by,
-                assigned_students=assigned_students,
-                assigned_leads=assigned_leads,
-                can_edit=can_edit,
-                can_move=can_move,
-                can_assign=can_assign,
-                student_eta_minutes=part.student_eta_minutes,
-                eta_note=part.eta_note,
-                eta_updated_at=part.eta_updated_at,
-                eta_by=eta_by,
-                eta_target=part.eta_target,
-                actual_start=part.actual_start,
-                actual_complete=part.actual_complete,
-                cad_file_name=part.cad_file_name,
-                cad_file_url=_file_url_from_path(part.cad_file_path),
-                cam_file_name=part.cam_file_name,
-                cam_file_url=_file_url_from_path(part.cam_file_path),
-            )
-        )
-    return serialized
-
-
 @router.get("/parts", response_model=list[schemas.ManufacturingPartRead])
 def list_parts(
     status: str | None = Query(default=None),
     manufacturing_type: str | None = Query(default=None),
     priority: str | None = Query(default=None),
     search: str | None = Query(default=None, max_length=80),
+    assignee: str | None = Query(default=None, description="'me' or a user id"),
     session: Session = Depends(get_session),
     current: models.User = Depends(deps.get_current_user),
 ):
     statement = select(models.ManufacturingPart)
+    if assignee:
+        if assignee == "me":
+            assignee_id = current.id
+        elif assignee.isdigit():
+            assignee_id = int(assignee)
+        else:
+            raise HTTPException(status_code=422, detail="assignee must be 'me' or a user id")
+        statement = statement.where(
+            models.ManufacturingPart.id.in_(
+                select(models.ManufacturingAssignment.part_id).where(
+                    models.ManufacturingAssignment.user_id == assignee_id
+                )
+            )
+        )
     if status:
         statement = statement.where(models.ManufacturingPart.status == _status_from_value(status))
     if manufacturing_type:
@@ -375,7 +310,7 @@ def list_parts(
             part.created_at,
         )
     )
-    return _serialize_parts(parts, session, current)
+    return parts_to_read(parts, session, current)
 
 
 @router.post("/parts", response_model=schemas.ManufacturingPartRead)
@@ -423,17 +358,18 @@ def create_part(
         responsible_student=payload.responsible_student,
         created_by_id=current.id,
         created_by_name=current.full_name,
-        assigned_student_ids=assigned_student_ids,
-        assigned_lead_ids=assigned_lead_ids,
         lane_position=lane_position,
     )
     _validate_required_fields(part)
     _auto_promote_if_ready(session, part)
     part.updated_at = datetime.utcnow()
     session.add(part)
+    session.flush()
+    _set_assignments(session, part.id, models.AssignmentRole.student, assigned_student_ids)
+    _set_assignments(session, part.id, models.AssignmentRole.lead, assigned_lead_ids)
     session.commit()
     session.refresh(part)
-    return _serialize_parts([part], session, current)[0]
+    return parts_to_read([part], session, current)[0]
 
 
 @router.patch("/parts/{part_id}", response_model=schemas.ManufacturingPartRead)
@@ -446,7 +382,7 @@ def update_part(
     part = session.get(models.ManufacturingPart, part_id)
     if not part:
         raise HTTPException(status_code=404, detail="Part not found")
-    if not _can_touch(part, current) and not _is_lead(current):
+    if not _can_touch(session, part, current):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     _ensure_positive_quantity(payload.quantity)
     if payload.part_name is not None:
@@ -501,20 +437,20 @@ def update_part(
             raise HTTPException(status_code=403, detail="Only leads can assign students")
         student_ids = _dedupe_ids(payload.assigned_student_ids)
         _validate_assignment_targets(session, student_ids, {models.Role.student})
-        part.assigned_student_ids = student_ids
+        _set_assignments(session, part.id, models.AssignmentRole.student, student_ids)
     if payload.assigned_lead_ids is not None:
         if not _is_lead(current):
             raise HTTPException(status_code=403, detail="Only leads can assign leads")
         lead_ids = _dedupe_ids(payload.assigned_lead_ids)
         _validate_assignment_targets(session, lead_ids, {models.Role.lead, models.Role.admin})
-        part.assigned_lead_ids = lead_ids
+        _set_assignments(session, part.id, models.AssignmentRole.lead, lead_ids)
     _validate_required_fields(part)
     _auto_promote_if_ready(session, part)
     part.updated_at = datetime.utcnow()
     session.add(part)
     session.commit()
     session.refresh(part)
-    return _serialize_parts([part], session, current)[0]
+    return parts_to_read([part], session, current)[0]
 
 
 @router.post("/parts/{part_id}/status", response_model=schemas.ManufacturingPartRead)
@@ -529,10 +465,10 @@ def change_status(
         raise HTTPException(status_code=404, detail="Part not found")
     target = _status_from_value(payload.status)
     if part.status == target:
-        return _serialize_parts([part], session, current)[0]
+        return parts_to_read([part], session, current)[0]
     if part.status_locked and not _is_lead(current):
         raise HTTPException(status_code=403, detail="This part is locked by a lead")
-    if not _can_touch(part, current):
+    if not _can_touch(session, part, current):
         raise HTTPException(status_code=403, detail="Insufficient permissions to move this part")
     if not _is_lead(current):
         allowed = STUDENT_TRANSITIONS.get(part.status, set())
@@ -550,7 +486,7 @@ def change_status(
     session.add(part)
     session.commit()
     session.refresh(part)
-    return _serialize_parts([part], session, current)[0]
+    return parts_to_read([part], session, current)[0]
 
 
 @router.post("/parts/{part_id}/claim", response_model=schemas.ManufacturingPartRead)
@@ -563,16 +499,14 @@ def claim_part(
     part = session.get(models.ManufacturingPart, part_id)
     if not part:
         raise HTTPException(status_code=404, detail="Part not found")
-    assignments = part.assigned_student_ids or []
-    if current.id not in assignments:
-        assignments.append(current.id)
-        part.assigned_student_ids = assignments
+    if not _is_assigned(session, part.id, current.id, models.AssignmentRole.student):
+        _add_assignment(session, part.id, models.AssignmentRole.student, current.id)
     _apply_eta(part, payload, current)
     part.updated_at = datetime.utcnow()
     session.add(part)
     session.commit()
     session.refresh(part)
-    return _serialize_parts([part], session, current)[0]
+    return parts_to_read([part], session, current)[0]
 
 
 @router.post("/parts/{part_id}/unclaim", response_model=schemas.ManufacturingPartRead)
@@ -584,9 +518,14 @@ def unclaim_part(
     part = session.get(models.ManufacturingPart, part_id)
     if not part:
         raise HTTPException(status_code=404, detail="Part not found")
-    assignments = part.assigned_student_ids or []
-    if current.id in assignments:
-        part.assigned_student_ids = [uid for uid in assignments if uid != current.id]
+    if _is_assigned(session, part.id, current.id, models.AssignmentRole.student):
+        session.execute(
+            delete(models.ManufacturingAssignment).where(
+                models.ManufacturingAssignment.part_id == part.id,
+                models.ManufacturingAssignment.role == models.AssignmentRole.student,
+                models.ManufacturingAssignment.user_id == current.id,
+            )
+        )
         if part.eta_by_id == current.id:
             part.student_eta_minutes = None
             part.eta_note = None
@@ -596,7 +535,7 @@ def unclaim_part(
         session.add(part)
         session.commit()
         session.refresh(part)
-    return _serialize_parts([part], session, current)[0]
+    return parts_to_read([part], session, current)[0]
 
 
 @router.post("/parts/{part_id}/eta", response_model=schemas.ManufacturingPartRead)
@@ -609,18 +548,21 @@ def update_eta(
     part = session.get(models.ManufacturingPart, part_id)
     if not part:
         raise HTTPException(status_code=404, detail="Part not found")
-    assignments = part.assigned_student_ids or []
-    if not _is_lead(current) and current.id not in assignments:
+    if not _is_lead(current) and not _is_assigned(session, part.id, current.id, models.AssignmentRole.student):
         raise HTTPException(status_code=403, detail="Only assignees or leads can set ETA")
     _apply_eta(part, payload, current)
     part.updated_at = datetime.utcnow()
     session.add(part)
     session.commit()
     session.refresh(part)
-    return _serialize_parts([part], session, current)[0]
+    return parts_to_read([part], session, current)[0]
 
 
-@router.post("/parts/{part_id}/files", response_model=schemas.ManufacturingPartRead)
+@router.post(
+    "/parts/{part_id}/files",
+    response_model=schemas.ManufacturingPartRead,
+    dependencies=[Depends(ratelimit.limit(ratelimit.upload_by_ip))],
+)
 async def upload_part_files(
     part_id: int,
     cad_file: UploadFile | None = File(None),
@@ -631,7 +573,7 @@ async def upload_part_files(
     part = session.get(models.ManufacturingPart, part_id)
     if not part:
         raise HTTPException(status_code=404, detail="Part not found")
-    if not _can_touch(part, current) and not _is_lead(current):
+    if not _can_touch(session, part, current):
         raise HTTPException(status_code=403, detail="Insufficient permissions to upload files")
     if not cad_file and not cam_file:
         raise HTTPException(status_code=422, detail="Upload at least one file")
@@ -640,7 +582,7 @@ async def upload_part_files(
     session.add(part)
     session.commit()
     session.refresh(part)
-    return _serialize_parts([part], session, current)[0]
+    return parts_to_read([part], session, current)[0]
 
 
 @router.delete("/parts/{part_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -654,6 +596,9 @@ def delete_part(
         raise HTTPException(status_code=404, detail="Part not found")
     if not (_is_lead(current) or part.created_by_id == current.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to delete this part")
+    session.execute(
+        delete(models.ManufacturingAssignment).where(models.ManufacturingAssignment.part_id == part_id)
+    )
     session.delete(part)
     session.commit()
     _remove_part_files(part_id)
@@ -663,7 +608,7 @@ def delete_part(
 @router.get("/summary", response_model=schemas.ManufacturingSummary)
 def manufacturing_summary(
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.get_current_user),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
     counts = {status.value: 0 for status in models.ManufacturingStatus}
     urgent = 0
@@ -692,7 +637,7 @@ def manufacturing_summary(
 @router.get("/lookups", response_model=schemas.ManufacturingLookupResponse)
 def manufacturing_lookups(
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.require_roles(models.Role.lead.value, models.Role.admin.value)),
+    _: deps.Principal = Depends(deps.require_role_claims(models.Role.lead.value, models.Role.admin.value)),
 ):
     users = session.exec(select(models.User).order_by(models.User.full_name)).all()
     payload = [
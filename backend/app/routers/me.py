@@ -0,0 +1,159 @@
+"""The caller's own queue: claimed jobs, assigned parts, open tickets, pending orders."""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import case, func
+from sqlmodel import Session, select
+from .. import models, schemas
+from ..core import deps, versions
+from ..core.config import get_settings
+from ..core.database import get_session
+from ..core.http import not_modified
+from ..services import serializers
+
+router = APIRouter(prefix="/me", tags=["me"])
+settings = get_settings()
+
+SECTIONS = ("jobs", "parts", "tickets", "orders")
+# Every table the payload reads, including user names and assignments.
+WORK_TABLES = ("shopjob", "manufacturingpart", "manufacturing_assignment", "ticket", "orderrequest", "user")
+
+_cache: OrderedDict[tuple, tuple[str, bytes]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key: tuple, token: str) -> bytes | None:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None or entry[0] != token:
+            return None
+        _cache.move_to_end(key)
+        return entry[1]
+
+
+def _store(key: tuple, token: str, body: bytes) -> None:
+    with _cache_lock:
+        _cache[key] = (token, body)
+        _cache.move_to_end(key)
+        while len(_cache) > settings.my_work_cache_entries:
+            _cache.popitem(last=False)
+
+
+def _parse_sections(raw: str | None) -> tuple[str, ...]:
+    if not raw:
+        return SECTIONS
+    requested = {part.strip() for part in raw.split(",") if part.strip()}
+    unknown = requested.difference(SECTIONS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown section '{sorted(unknown)[0]}'")
+    return tuple(section for section in SECTIONS if section in requested)
+
+
+def _page(session: Session, model: Any, where: list, order_by: list, limit: int, offset: int) -> tuple[list, int]:
+    """One page of ``model`` rows plus the total match count, in a single query."""
+    rows = session.exec(
+        select(model, func.count().over()).where(*where).order_by(*order_by).limit(limit).offset(offset)
+    ).all()
+    if rows:
+        return [row[0] for row in rows], rows[0][1]
+    if not offset:
+        return [], 0
+    return [], session.exec(select(func.count()).select_from(model).where(*where)).one()
+
+
+def _jobs(session: Session, principal: deps.Principal, limit: int, offset: int) -> tuple[list, int]:
+    found, total = _page(
+        session,
+        models.ShopJob,
+        [
+            models.ShopJob.claimed_by_id == principal.id,
+            models.ShopJob.status.not_in((models.JobStatus.completed, models.JobStatus.rejected)),
+        ],
+        [models.ShopJob.queue_position, models.ShopJob.created_at],
+        limit,
+        offset,
+    )
+    return [serializers.job_to_dict(job, session) for job in found], total
+
+
+def _parts(session: Session, principal: deps.Principal, limit: int, offset: int) -> tuple[list, int]:
+    part = models.ManufacturingPart
+    found, total = _page(
+        session,
+        part,
+        [
+            part.id.in_(
+                select(models.ManufacturingAssignment.part_id).where(
+                    models.ManufacturingAssignment.user_id == principal.id
+                )
+            ),
+            part.status != models.ManufacturingStatus.completed,
+        ],
+        # Same order as the board: status lane, then priority, then lane position.
+        [
+            case(serializers.STATUS_ORDER, value=part.status),
+            case(serializers.PRIORITY_WEIGHT, value=part.priority, else_=1),
+            part.lane_position,
+            part.created_at,
+        ],
+        limit,
+        offset,
+    )
+    return serializers.parts_to_read(found, session, principal), total
+
+
+def _tickets(session: Session, principal: deps.Principal, limit: int, offset: int) -> tuple[list, int]:
+    found, total = _page(
+        session,
+        models.Ticket,
+        [models.Ticket.requester_id == principal.id, models.Ticket.status != models.TicketStatus.resolved],
+        [models.Ticket.created_at.desc()],
+        limit,
+        offset,
+    )
+    return [serializers.ticket_to_read(ticket) for ticket in found], total
+
+
+def _orders(session: Session, principal: deps.Principal, limit: int, offset: int) -> tuple[list, int]:
+    found, total = _page(
+        session,
+        models.OrderRequest,
+        [models.OrderRequest.requester_id == principal.id, models.OrderRequest.status == models.OrderStatus.pending],
+        [models.OrderRequest.created_at.desc()],
+        limit,
+        offset,
+    )
+    return [serializers.order_to_read(order) for order in found], total
+
+
+LOADERS = {"jobs": _jobs, "parts": _parts, "tickets": _tickets, "orders": _orders}
+
+
+@router.get("/work", response_model=schemas.MyWork)
+def my_work(
+    request: Request,
+    sections: str | None = Query(None, description="Comma-separated subset of jobs,parts,tickets,orders"),
+    limit: int = Query(25, ge=1, le=100, description="Page size, applied to each section"),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(get_session),
+    principal: deps.Principal = Depends(deps.get_principal),
+):
+    selected = _parse_sections(sections)
+    key = (principal.id, principal.role.value, selected, limit, offset)
+    # Taken before reading, so a write that lands mid-request only makes the
+    # cached body newer than its token, never older.
+    token = versions.token(WORK_TABLES, *map(str, key))
+    etag = f'W/"{token}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    body = _cached(key, token)
+    if body is None:
+        payload: dict[str, Any] = {"limit": limit, "offset": offset, "totals": {}}
+        for section in selected:
+            payload[section], payload["totals"][section] = LOADERS[section](session, principal, limit, offset)
+        body = schemas.MyWork(**payload).model_dump_json().encode("utf-8")
+        _store(key, token, body)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,28 @@
+"""Prometheus scrape endpoint for the request and SQL metrics."""
+from __future__ import annotations
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from .. import models
+from ..core import deps, metrics
+from ..core.config import get_settings
+
+router = APIRouter(tags=["metrics"])
+settings = get_settings()
+
+
+def _authorize(token: deps.OptionalTokenDep, session: deps.SessionDep) -> None:
+    # Scrapers send METRICS_TOKEN as a bearer token; people use an admin login.
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    if settings.metrics_token and secrets.compare_digest(token, settings.metrics_token):
+        return
+    user = deps.get_current_user(token, session)
+    if user.role != models.Role.admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(_authorize)])
+async def scrape():
+    # async so rendering runs on the event loop, the only thread that updates the counters.
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -4,6 +4,7 @@ from .. import models, schemas
 from ..core.database import get_session
 from ..core import deps
 from ..services.google_sheets import append_order_to_sheet
+from ..services.serializers import order_to_read
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -49,37 +50,16 @@ def create_order(
         session.add(order)
         session.commit()
         session.refresh(order)
-    return schemas.OrderRead(
-        id=order.id,
-        requester_name=order.requester_name,
-        part_name=order.part_name,
-        vendor_link=order.vendor_link,
-        price_usd=order.price_usd,
-        justification=order.justification,
-        status=order.status.value,
-        created_at=order.created_at,
-    )
+    return order_to_read(order)
 
 
 @router.get("/", response_model=list[schemas.OrderRead])
 def list_orders(
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.get_current_user),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
     orders = session.exec(select(models.OrderRequest).order_by(models.OrderRequest.created_at.desc())).all()
-    return [
-        schemas.OrderRead(
-            id=order.id,
-            requester_name=order.requester_name,
-            part_name=order.part_name,
-            vendor_link=order.vendor_link,
-            price_usd=order.price_usd,
-            justification=order.justification,
-            status=order.status.value,
-            created_at=order.created_at,
-        )
-        for order in orders
-    ]
+    return [order_to_read(order) for order in orders]
 
 
 @router.patch("/{order_id}", response_model=schemas.OrderRead)
@@ -98,16 +78,7 @@ def update_order(
     session.add(order)
     session.commit()
     session.refresh(order)
-    return schemas.OrderRead(
-        id=order.id,
-        requester_name=order.requester_name,
-        part_name=order.part_name,
-        vendor_link=order.vendor_link,
-        price_usd=order.price_usd,
-        justification=order.justification,
-        status=order.status.value,
-        created_at=order.created_at,
-    )
+    return order_to_read(order)
 
 
 @router.delete("/{order_id}")
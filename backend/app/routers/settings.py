@@ -1,7 +1,7 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
-from ..core.database import get_session
+from ..core.database import get_session, read_snapshot
 from ..core import deps
 from .. import models
 from ..models_config import AppConfig
@@ -51,7 +51,7 @@ def _blank_sheet_payload():
 @router.get("/sheets")
 def list_sheet_links(
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.get_current_user),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
     payload = _blank_sheet_payload()
     rows = session.exec(select(models.SheetLink)).all()
@@ -100,7 +100,8 @@ def sync_section_to_sheet(
     if not link or not link.url:
         raise HTTPException(status_code=404, detail="No sheet URL attached for this section")
 
-    title, headers, rows = get_section_dataset(section, session)
+    with read_snapshot() as snapshot:
+        title, headers, rows = get_section_dataset(section, snapshot)
 
     # If the link is an Apps Script Web App, POST JSON to it
     if "script.google.com/macros" in (link.url or ""):
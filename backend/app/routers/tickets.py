@@ -5,6 +5,7 @@ from sqlmodel import Session, select
 from .. import models, schemas
 from ..core.database import get_session
 from ..core import deps
+from ..services.serializers import ticket_to_read
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
 
@@ -44,14 +45,14 @@ def create_ticket(
     session.add(ticket)
     session.commit()
     session.refresh(ticket)
-    return _to_read(ticket)
+    return ticket_to_read(ticket)
 
 
 @router.get("/", response_model=list[schemas.TicketRead])
 def list_tickets(
     type: str | None = None,
     session: Session = Depends(get_session),
-    _: models.User = Depends(deps.get_current_user),
+    _: deps.Principal = Depends(deps.get_principal),
 ):
     statement = select(models.Ticket).order_by(models.Ticket.created_at.desc())
     if type:
@@ -61,7 +62,7 @@ def list_tickets(
             raise HTTPException(status_code=422, detail="Invalid ticket type") from exc
         statement = statement.where(models.Ticket.type == ticket_type)
     tickets = session.exec(statement).all()
-    return [_to_read(t) for t in tickets]
+    return [ticket_to_read(t) for t in tickets]
 
 
 @router.patch("/{ticket_id}", response_model=schemas.TicketRead)
@@ -82,7 +83,7 @@ def update_ticket_status(
     session.add(ticket)
     session.commit()
     session.refresh(ticket)
-    return _to_read(ticket)
+    return ticket_to_read(ticket)
 
 
 @router.delete("/{ticket_id}")
@@ -97,17 +98,3 @@ def delete_ticket(
     session.delete(ticket)
     session.commit()
     return {"status": "deleted"}
-
-
-def _to_read(ticket: models.Ticket) -> schemas.TicketRead:
-    return schemas.TicketRead(
-        id=ticket.id,
-        type=ticket.type.value,
-        subject=ticket.subject,
-        details=ticket.details,
-        priority=ticket.priority.value,
-        status=ticket.status.value,
-        requester_name=ticket.requester_name,
-        created_at=ticket.created_at,
-        updated_at=ticket.updated_at,
-    )
@@ -65,6 +65,19 @@ class PendingUserRead(BaseModel):
 class ApprovePending(BaseModel):
     role: str
 
+class BulkApprovePending(BaseModel):
+    request_ids: list[int]
+    role: str | None = None
+
+class BulkRowError(BaseModel):
+    row: int
+    email: str | None = None
+    detail: str
+
+class BulkUserResult(BaseModel):
+    created: list[UserRead]
+    errors: list[BulkRowError]
+
 class AttendanceScan(BaseModel):
     barcode_id: Optional[str] = None
     student_id: Optional[str] = None
@@ -193,10 +206,56 @@ class InventoryItemRead(BaseModel):
     vendor_link: str | None
     updated_at: datetime
 
+class FacetCount(BaseModel):
+    value: str | None
+    count: int
+
+class InventoryFacets(BaseModel):
+    location: list[FacetCount]
+    part_type: list[FacetCount]
+
+class InventoryPage(BaseModel):
+    items: list[InventoryItemRead]
+    next_cursor: str | None
+    # Only on the first page: counts for the filters, each facet ignoring its own filter.
+    total: int | None = None
+    facets: InventoryFacets | None = None
+
+class LowStockItem(InventoryItemRead):
+    usage_per_day: float
+    # None when the item has no recent usage to project from.
+    days_left: float | None
+    suggested_order: int
+
 class InventoryAdjust(BaseModel):
     delta: int
     reason: str = "manual"
     note: str | None = None
+    # Refuse with 409 rather than take stock below zero.
+    reserve: bool = False
+
+class InventoryPickLine(BaseModel):
+    item_id: int
+    delta: int
+
+class InventoryBatchAdjust(BaseModel):
+    lines: list[InventoryPickLine] = Field(min_length=1, max_length=500)
+    reason: str = "manual"
+    note: str | None = None
+    reserve: bool = False
+
+class InventoryImportError(BaseModel):
+    row: int
+    sku: str | None = None
+    detail: str
+
+class InventoryImportResult(BaseModel):
+    dry_run: bool
+    inserted: int
+    updated: int
+    # errors lists at most the first 1000 of error_count.
+    error_count: int
+    errors: list[InventoryImportError]
 
 class InventoryTransactionRead(BaseModel):
     id: int
@@ -350,3 +409,12 @@ class ManufacturingEtaUpdate(BaseModel):
     eta_minutes: int = Field(ge=0)
     eta_note: str | None = None
     eta_target: datetime | None = None
+
+class MyWork(BaseModel):
+    limit: int
+    offset: int
+    totals: dict[str, int]
+    jobs: list[ShopJobRead] = []
+    parts: list[ManufacturingPartRead] = []
+    tickets: list[TicketRead] = []
+    orders: list[OrderRead] = []
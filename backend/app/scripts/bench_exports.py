@@ -0,0 +1,140 @@
+from __future__ import annotations
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine
+from app import models
+from app.services.export_data import get_section_dataset
+
+
+def seed(engine, rows: int, users: int) -> None:
+    rng = random.Random(1234)
+    start = datetime(2024, 1, 1, 15, 30)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.User),
+            [
+                {
+                    "id": idx,
+                    "email": f"user{idx}@example.com",
+                    "full_name": f"Student {idx}",
+                    "role": models.Role.student if idx % 10 else models.Role.lead,
+                    "hashed_password": "x",
+                    "is_active": True,
+                    "created_at": start,
+                }
+                for idx in range(1, users + 1)
+            ],
+        )
+        conn.execute(
+            insert(models.AttendanceEntry),
+            [
+                {
+                    "user_id": rng.randint(1, users),
+                    "recorded_student_id": f"{rng.randint(100000, 999999)}",
+                    "recorded_barcode_id": None,
+                    "check_in": start + timedelta(minutes=idx),
+                    "check_out": start + timedelta(minutes=idx, seconds=rng.randint(0, 9000)) if idx % 7 else None,
+                    "status": rng.choice(list(models.AttendanceStatus)),
+                    "note": "late bus" if idx % 13 == 0 else None,
+                }
+                for idx in range(rows)
+            ],
+        )
+        conn.execute(
+            insert(models.ManufacturingPart),
+            [
+                {
+                    "part_name": f"Bracket {idx}",
+                    "subsystem": rng.choice(["drive", "intake", "arm", "climber"]),
+                    "material": "6061",
+                    "quantity": rng.randint(1, 8),
+                    "manufacturing_type": rng.choice(list(models.ManufacturingType)),
+                    "cad_link": f"https://cad.example.com/{idx}",
+                    "priority": rng.choice(list(models.ManufacturingPriority)),
+                    "status": rng.choice(list(models.ManufacturingStatus)),
+                    "created_by_id": rng.randint(1, users),
+                    "created_by_name": "Someone",
+                    "approved_by_id": rng.randint(1, users) if idx % 3 else None,
+                    "created_at": start + timedelta(minutes=idx),
+                    "updated_at": start + timedelta(minutes=idx, microseconds=idx % 1000),
+                    "last_status_change": start,
+                    "student_eta_minutes": 30 if idx % 2 else None,
+                }
+                for idx in range(rows)
+            ],
+        )
+        assignments = []
+        for part_id in range(1, rows + 1):
+            for position, user_id in enumerate(rng.sample(range(1, users + 1), 2)):
+                assignments.append(
+                    {"part_id": part_id, "role": models.AssignmentRole.student, "user_id": user_id, "position": position}
+                )
+            assignments.append(
+                {"part_id": part_id, "role": models.AssignmentRole.lead, "user_id": rng.randint(1, users), "position": 0}
+            )
+        conn.execute(insert(models.ManufacturingAssignment), assignments)
+        conn.execute(
+            insert(models.InventoryItem),
+            [
+                {
+                    "part_name": f"Bolt {idx}",
+                    "sku": f"SKU-{idx}",
+                    "part_type": rng.choice(list(models.InventoryPartType)),
+                    "location": f"Bin {idx % 40}",
+                    "quantity": rng.randint(0, 500),
+                    "unit_cost": rng.random() * 20 if idx % 4 else None,
+                    "reorder_threshold": 10 if idx % 5 else None,
+                    "updated_at": start + timedelta(seconds=idx),
+                }
+                for idx in range(rows)
+            ],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ORM and columnar export engines")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows per seeded table")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--sections",
+        nargs="+",
+        default=["attendance", "manufacturing", "inventory"],
+        choices=[section.value for section in models.SheetSection],
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        SQLModel.metadata.create_all(engine)
+        print(f"Seeding {args.rows} rows per table...")
+        seed(engine, args.rows, args.users)
+        print(f"{'section':<16}{'orm (s)':>10}{'columnar (s)':>14}{'speedup':>10}")
+        for name in args.sections:
+            section = models.SheetSection(name)
+            timings: dict[str, float] = {}
+            outputs: dict[str, list] = {}
+            for mode in ("orm", "columnar"):
+                best = float("inf")
+                for _ in range(args.repeat):
+                    with Session(engine) as session:
+                        began = time.perf_counter()
+                        _, _, rows = get_section_dataset(section, session, mode=mode)
+                        best = min(best, time.perf_counter() - began)
+                timings[mode] = best
+                outputs[mode] = [list(row) for row in rows]
+            if outputs["orm"] != outputs["columnar"]:
+                raise SystemExit(f"{name}: engines produced different output")
+            print(
+                f"{name:<16}{timings['orm']:>10.3f}{timings['columnar']:>14.3f}"
+                f"{timings['orm'] / timings['columnar']:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
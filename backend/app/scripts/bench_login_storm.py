@@ -0,0 +1,115 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+def _summary(label: str, samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{label:<22} n={len(ordered):<4} p50={statistics.median(ordered) * 1000:7.1f}ms "
+        f"p95={p95 * 1000:7.1f}ms max={ordered[-1] * 1000:7.1f}ms"
+    )
+
+
+async def _run(args) -> None:
+    import httpx
+    from sqlmodel import Session
+    from app.main import app
+    from app.core.database import engine, init_db
+    from app.core.security import get_password_hash, shutdown_password_pool
+    from app import models
+
+    # ASGITransport does not run startup handlers.
+    init_db()
+    hashed = get_password_hash("storm-password")
+    with Session(engine) as session:
+        session.add(models.User(email="kiosk@bench.local", full_name="Kiosk", role=models.Role.admin, hashed_password=hashed))
+        for idx in range(args.logins):
+            session.add(
+                models.User(
+                    email=f"student{idx}@bench.local",
+                    full_name=f"Student {idx}",
+                    hashed_password=hashed,
+                    barcode_id=f"BC{idx:04d}",
+                )
+            )
+        session.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def login(email: str) -> float:
+            began = time.perf_counter()
+            resp = await client.post("/auth/login", data={"username": email, "password": "storm-password"})
+            resp.raise_for_status()
+            return time.perf_counter() - began
+
+        # Also warms the hashing pool so process start-up is not measured.
+        await login("kiosk@bench.local")
+        token = (
+            await client.post("/auth/login", data={"username": "kiosk@bench.local", "password": "storm-password"})
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        scan_count = 0
+
+        async def scan() -> float:
+            nonlocal scan_count
+            barcode = f"BC{scan_count % args.logins:04d}"
+            mode = "in" if (scan_count // args.logins) % 2 == 0 else "out"
+            scan_count += 1
+            began = time.perf_counter()
+            resp = await client.post(
+                "/attendance/scan",
+                json={"barcode_id": barcode, "mode": mode, "timestamp": datetime.utcnow().isoformat()},
+                headers=headers,
+            )
+            resp.raise_for_status()
+            return time.perf_counter() - began
+
+        baseline = [await scan() for _ in range(args.scans)]
+
+        storm = asyncio.gather(*(login(f"student{idx}@bench.local") for idx in range(args.logins)))
+        storm_started = time.perf_counter()
+        during: list[float] = []
+        while not storm.done():
+            during.append(await scan())
+        logins = await storm
+        storm_seconds = time.perf_counter() - storm_started
+
+    shutdown_password_pool()
+    print(_summary("scan (idle)", baseline))
+    print(_summary("scan (during storm)", during))
+    print(_summary("login", logins))
+    print(f"{args.logins} logins finished in {storm_seconds:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure kiosk scan latency during a login storm")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--scans", type=int, default=30, help="baseline scans before the storm")
+    parser.add_argument(
+        "--hash-workers",
+        type=int,
+        default=None,
+        help="override PASSWORD_HASH_WORKERS; 0 hashes on the request threadpool",
+    )
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="login-storm-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+    os.environ["UPLOAD_ROOT"] = str(Path(tmp) / "uploads")
+    # Every simulated client shares one address; measure hashing, not throttling.
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    if args.hash_workers is not None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.hash_workers)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
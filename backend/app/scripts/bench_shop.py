@@ -0,0 +1,425 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+PASSWORD = "bench-password"
+SIZE_OPTIONS = ("users", "attendance", "parts", "jobs", "items", "orders", "tickets")
+RUN_OPTIONS = ("clients", "duration", "warmup", "seed")
+
+# The SPA's polling, weighted by requests per minute from one open tab of
+# each view: attendance every 5s, jobs and orders every 10s, the dashboard
+# every 15s, manufacturing every 20s, plus kiosk scans and searches.
+# (name, weight, persona, method, path)
+MIX = [
+    ("scan", 12, "kiosk", "POST", "/attendance/scan"),
+    ("attendance summary", 16, "lead", "GET", "/attendance/summary/today"),
+    ("attendance logs_by_date", 12, "lead", "GET", "/attendance/logs_by_date"),
+    ("attendance today_logs", 4, "lead", "GET", "/attendance/today_logs"),
+    ("manufacturing summary", 4, "lead", "GET", "/manufacturing/summary"),
+    ("manufacturing parts", 7, "lead", "GET", "/manufacturing/parts"),
+    ("orders", 10, "lead", "GET", "/orders/"),
+    ("jobs", 6, "student", "GET", "/jobs/"),
+    ("inventory search", 2, "student", "GET", "/inventory/items/page"),
+    ("me work", 2, "student", "GET", "/me/work"),
+    ("schedules", 1, "student", "GET", "/schedules/"),
+]
+SEARCH_TERMS = ("bolt", "SKU-12", "bin 3", "bearing", "spacer", "zz-no-match")
+
+
+def _rows(model, rows: list[dict]) -> list[dict]:
+    # Older revisions lack some columns; drop what the model does not have so
+    # the same seed works on both sides of --compare.
+    columns = set(model.__table__.columns.keys())
+    return [{key: value for key, value in row.items() if key in columns} for row in rows]
+
+
+def seed(engine, args, rng: random.Random) -> None:
+    from sqlalchemy import insert
+    from app import models
+    from app.core.security import get_password_hash
+
+    now = datetime.utcnow()
+    hashed = get_password_hash(PASSWORD)
+    leads = range(2, 22)
+    students = range(22, args.users + 1)
+    assignment_role = getattr(models, "AssignmentRole", None)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.User),
+            _rows(
+                models.User,
+                [
+                    {
+                        "id": idx,
+                        "email": f"user{idx}@bench.local",
+                        "full_name": f"Member {idx}",
+                        "role": models.Role.admin if idx == 1 else models.Role.lead if idx in leads else models.Role.student,
+                        "hashed_password": hashed,
+                        "barcode_id": f"BC{idx:04d}",
+                        "student_id": f"{100000 + idx}",
+                        "is_active": True,
+                        "created_at": now - timedelta(days=200),
+                    }
+                    for idx in range(1, args.users + 1)
+                ],
+            ),
+        )
+        conn.execute(
+            insert(models.ScheduleBlock),
+            _rows(
+                models.ScheduleBlock,
+                [
+                    {"weekday": day, "start_time": datetime(2000, 1, 1, 15).time(), "end_time": datetime(2000, 1, 1, 21).time()}
+                    for day in range(7)
+                ],
+            ),
+        )
+        # A season of closed entries, so every kiosk scan starts checked out.
+        conn.execute(
+            insert(models.AttendanceEntry),
+            _rows(
+                models.AttendanceEntry,
+                [
+                    {
+                        "user_id": user_id,
+                        "recorded_barcode_id": f"BC{user_id:04d}",
+                        "check_in": check_in,
+                        "check_out": check_in + timedelta(minutes=rng.randint(30, 300)),
+                        "status": rng.choice(list(models.AttendanceStatus)),
+                        "note": "late bus" if idx % 13 == 0 else None,
+                    }
+                    for idx in range(args.attendance)
+                    for user_id in [rng.choice(students)]
+                    for check_in in [now - timedelta(days=1 + idx * 180 // max(args.attendance, 1), minutes=rng.randint(0, 600))]
+                ],
+            ),
+        )
+        parts = []
+        assignments = []
+        for idx in range(1, args.parts + 1):
+            assigned = rng.sample(students, 2)
+            lead = rng.choice(leads)
+            parts.append(
+                {
+                    "id": idx,
+                    "part_name": f"Bracket {idx}",
+                    "subsystem": rng.choice(["drive", "intake", "arm", "climber"]),
+                    "material": "6061",
+                    "quantity": rng.randint(1, 8),
+                    "manufacturing_type": rng.choice(list(models.ManufacturingType)),
+                    "cad_link": f"https://cad.example.com/{idx}",
+                    "priority": rng.choice(list(models.ManufacturingPriority)),
+                    "status": rng.choice(list(models.ManufacturingStatus)),
+                    "created_by_id": lead,
+                    "created_by_name": f"Member {lead}",
+                    "lane_position": idx,
+                    "created_at": now - timedelta(minutes=idx),
+                    "updated_at": now - timedelta(minutes=idx),
+                    "last_status_change": now - timedelta(minutes=idx),
+                    # Revisions before the assignment table kept these inline.
+                    "assigned_student_ids": assigned,
+                    "assigned_lead_ids": [lead],
+                }
+            )
+            if assignment_role is not None:
+                assignments.extend(
+                    {"part_id": idx, "role": assignment_role.student, "user_id": user_id, "position": position}
+                    for position, user_id in enumerate(assigned)
+                )
+                assignments.append({"part_id": idx, "role": assignment_role.lead, "user_id": lead, "position": 0})
+        conn.execute(insert(models.ManufacturingPart), _rows(models.ManufacturingPart, parts))
+        if assignments:
+            conn.execute(insert(models.ManufacturingAssignment), assignments)
+        conn.execute(
+            insert(models.ShopJob),
+            _rows(
+                models.ShopJob,
+                [
+                    {
+                        "shop": models.ShopType.cnc if idx % 2 else models.ShopType.printing,
+                        "part_name": f"Job {idx}",
+                        "owner_name": f"Member {owner}",
+                        "submitter_id": owner,
+                        "file_name": f"job{idx}.tap",
+                        "file_path": f"jobs/job{idx}.tap",
+                        "status": rng.choice(list(models.JobStatus)),
+                        "created_at": now - timedelta(minutes=idx),
+                        "queue_position": idx // 2,
+                        "claimed_by_id": rng.choice(students) if idx % 3 == 0 else None,
+                    }
+                    for idx in range(args.jobs)
+                    for owner in [rng.choice(students)]
+                ],
+            ),
+        )
+        conn.execute(
+            insert(models.InventoryItem),
+            _rows(
+                models.InventoryItem,
+                [
+                    {
+                        "part_name": f"{rng.choice(['Bolt', 'Bearing', 'Spacer', 'Shaft', 'Gear'])} {idx}",
+                        "sku": f"SKU-{idx}",
+                        "part_type": rng.choice(list(models.InventoryPartType)),
+                        "location": f"Bin {idx % 40}",
+                        "quantity": rng.randint(0, 500),
+                        "unit_cost": round(rng.random() * 20, 2) if idx % 4 else None,
+                        "reorder_threshold": 10 if idx % 5 else None,
+                        "tags": "fastener" if idx % 3 == 0 else None,
+                        "updated_at": now - timedelta(seconds=idx),
+                    }
+                    for idx in range(args.items)
+                ],
+            ),
+        )
+        conn.execute(
+            insert(models.OrderRequest),
+            _rows(
+                models.OrderRequest,
+                [
+                    {
+                        "requester_id": requester,
+                        "requester_name": f"Member {requester}",
+                        "part_name": f"Order {idx}",
+                        "vendor_link": "https://vendor.example.com/item",
+                        "price_usd": round(rng.random() * 200, 2),
+                        "status": rng.choice(list(models.OrderStatus)),
+                        "created_at": now - timedelta(hours=idx),
+                    }
+                    for idx in range(args.orders)
+                    for requester in [rng.choice(students)]
+                ],
+            ),
+        )
+        if hasattr(models, "Ticket"):
+            conn.execute(
+                insert(models.Ticket),
+                _rows(
+                    models.Ticket,
+                    [
+                        {
+                            "type": rng.choice(list(models.TicketType)),
+                            "subject": f"Ticket {idx}",
+                            "details": "Details",
+                            "requester_id": requester,
+                            "requester_name": f"Member {requester}",
+                            "status": rng.choice(list(models.TicketStatus)),
+                            "created_at": now - timedelta(hours=idx),
+                            "updated_at": now - timedelta(hours=idx),
+                        }
+                        for idx in range(args.tickets)
+                        for requester in [rng.choice(students)]
+                    ],
+                ),
+            )
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _run(args) -> dict:
+    import httpx
+    from sqlalchemy import text
+    from app.main import app
+    from app.core.database import engine, init_db
+
+    rng = random.Random(args.seed)
+    # ASGITransport does not run startup handlers.
+    init_db()
+    began = time.perf_counter()
+    seed(engine, args, rng)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    seeded = time.perf_counter() - began
+    print(f"seeded in {seeded:.1f}s", file=sys.stderr)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        async def token(user_id: int) -> dict[str, str]:
+            resp = await client.post("/auth/login", data={"username": f"user{user_id}@bench.local", "password": PASSWORD})
+            resp.raise_for_status()
+            return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+        headers = {"lead": await token(2), "student": await token(22), "kiosk": await token(23)}
+        # Kiosk scans cycle through the students, alternating in and out.
+        barcodes = [f"BC{idx:04d}" for idx in range(24, args.users + 1)]
+        checked_in: set[str] = set()
+        scans = 0
+        weights = [entry[1] for entry in MIX]
+        samples: dict[str, list[float]] = {entry[0]: [] for entry in MIX}
+        errors: dict[str, dict[str, int]] = {entry[0]: {} for entry in MIX}
+        recording = False
+
+        def request_for(entry, client_rng: random.Random) -> tuple[str, dict]:
+            nonlocal scans
+            name, _weight, persona, _method, path = entry
+            kwargs: dict = {"headers": headers[persona]}
+            if name == "scan":
+                barcode = barcodes[scans % len(barcodes)]
+                scans += 1
+                mode = "out" if barcode in checked_in else "in"
+                checked_in.symmetric_difference_update({barcode})
+                kwargs["json"] = {"barcode_id": barcode, "mode": mode, "timestamp": datetime.utcnow().isoformat()}
+            elif name == "jobs":
+                kwargs["params"] = {"shop": client_rng.choice(["cnc", "printing"])}
+            elif name == "inventory search":
+                kwargs["params"] = {"q": client_rng.choice(SEARCH_TERMS)}
+            return path, kwargs
+
+        async def user(client_id: int, deadline: float) -> None:
+            client_rng = random.Random(args.seed * 1000 + client_id)
+            while time.perf_counter() < deadline:
+                entry = client_rng.choices(MIX, weights)[0]
+                path, kwargs = request_for(entry, client_rng)
+                started = time.perf_counter()
+                resp = await client.request(entry[3], path, **kwargs)
+                elapsed = time.perf_counter() - started
+                if not recording:
+                    continue
+                if resp.status_code >= 400:
+                    errors[entry[0]][str(resp.status_code)] = errors[entry[0]].get(str(resp.status_code), 0) + 1
+                else:
+                    samples[entry[0]].append(elapsed)
+
+        if args.warmup > 0:
+            await asyncio.gather(*(user(idx, time.perf_counter() + args.warmup) for idx in range(args.clients)))
+        recording = True
+        started = time.perf_counter()
+        await asyncio.gather(*(user(idx, started + args.duration) for idx in range(args.clients)))
+        wall = time.perf_counter() - started
+
+    routes = {}
+    for name, values in samples.items():
+        ordered = sorted(values)
+        routes[name] = {
+            "n": len(ordered),
+            "errors": errors[name],
+            "rps": len(ordered) / wall,
+            "p50": statistics.median(ordered) if ordered else None,
+            "p95": _percentile(ordered, 0.95) if ordered else None,
+            "p99": _percentile(ordered, 0.99) if ordered else None,
+            "max": ordered[-1] if ordered else None,
+        }
+    return {
+        "revision": args.label or _describe(BACKEND_ROOT) or "unknown",
+        "wall": wall,
+        "seconds_to_seed": seeded,
+        "rps": sum(route["n"] for route in routes.values()) / wall,
+        "routes": routes,
+    }
+
+
+def _describe(path: Path) -> str | None:
+    result = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=path, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def _ms(value: float | None) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def _print_report(report: dict) -> None:
+    print(f"revision {report['revision']}: {report['rps']:.1f} req/s over {report['wall']:.1f}s")
+    print(f"{'route':<26}{'n':>6}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  errors")
+    for name, route in report["routes"].items():
+        errors = ", ".join(f"{status}x{count}" for status, count in sorted(route["errors"].items())) or ""
+        print(
+            f"{name:<26}{route['n']:>6}{route['rps']:>8.2f}{_ms(route['p50']):>9}{_ms(route['p95']):>9}"
+            f"{_ms(route['p99']):>9}{_ms(route['max']):>9}  {errors}"
+        )
+
+
+def _print_comparison(base: dict, head: dict) -> None:
+    def change(old: float | None, new: float | None) -> str:
+        if not old or new is None:
+            return "-"
+        return f"{(new - old) / old * 100:+.0f}%"
+
+    print(f"base {base['revision']} vs head {head['revision']}")
+    print(f"{'route':<26}{'p50 base':>9}{'head':>9}{'':>6}{'p95 base':>10}{'head':>9}{'':>6}{'p99 base':>10}{'head':>9}{'':>6}")
+    for name, new in head["routes"].items():
+        old = base["routes"].get(name, {})
+        row = f"{name:<26}"
+        for key in ("p50", "p95", "p99"):
+            row += f"{_ms(old.get(key)):>{10 if key != 'p50' else 9}}{_ms(new[key]):>9}{change(old.get(key), new[key]):>6}"
+        print(row)
+    print(f"{'throughput':<26}{base['rps']:>9.1f}{head['rps']:>9.1f}{change(base['rps'], head['rps']):>6} req/s")
+
+
+def _child(backend: Path, args, label: str) -> dict:
+    # Run this script against another checkout: PYTHONPATH picks its app package.
+    out = Path(tempfile.mkdtemp(prefix="bench-shop-")) / "report.json"
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--json", str(out), "--label", label]
+    for name in (*SIZE_OPTIONS, *RUN_OPTIONS):
+        cmd += [f"--{name}", str(getattr(args, name))]
+    env = {**os.environ, "PYTHONPATH": str(backend)}
+    result = subprocess.run(cmd, cwd=backend, env=env)
+    if result.returncode:
+        sys.exit(f"benchmark of {label} failed")
+    return json.loads(out.read_text())
+
+
+def _compare(args) -> None:
+    top = Path(subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=BACKEND_ROOT, capture_output=True, text=True, check=True).stdout.strip())
+    tree = Path(tempfile.mkdtemp(prefix="bench-shop-tree-")) / "tree"
+    subprocess.run(["git", "worktree", "add", "--detach", str(tree), args.compare], cwd=top, check=True, capture_output=True)
+    try:
+        base = _child(tree / BACKEND_ROOT.relative_to(top), args, args.compare)
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", str(tree)], cwd=top, capture_output=True)
+    head = _child(BACKEND_ROOT, args, _describe(BACKEND_ROOT) or "working tree")
+    print()
+    _print_comparison(base, head)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the SPA polling mix and kiosk scans against a seeded shop")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--attendance", type=int, default=50_000)
+    parser.add_argument("--parts", type=int, default=5_000)
+    parser.add_argument("--jobs", type=int, default=2_000)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--tickets", type=int, default=300)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent simulated browsers")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds of traffic first")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", type=Path, default=None, help="also write the report here")
+    parser.add_argument("--compare", metavar="REV", default=None, help="benchmark REV (in a git worktree) and then this tree")
+    parser.add_argument("--label", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.users < 30:
+        parser.error("--users must be at least 30")
+
+    if args.compare:
+        _compare(args)
+        return
+
+    tmp = tempfile.mkdtemp(prefix="bench-shop-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+    os.environ["UPLOAD_ROOT"] = str(Path(tmp) / "uploads")
+    # Every simulated client shares one address; measure the app, not throttling.
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    os.environ.setdefault("PASSWORD_HASH_AUTOTUNE", "false")
+    report = asyncio.run(_run(args))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
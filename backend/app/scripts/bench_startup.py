@@ -0,0 +1,120 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Runs in a fresh interpreter per sample so nothing is already imported.
+CHILD = r"""
+import json, sys, time
+began = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client_ready = time.perf_counter()
+with TestClient(app.main.app) as client:
+    started = time.perf_counter()
+    client.get("/settings/app").raise_for_status()
+    served = time.perf_counter()
+forbidden = [name for name in sys.argv[1].split(",") if name and name in sys.modules]
+print(json.dumps({
+    "import": imported - began,
+    "startup": started - client_ready,
+    "first_request": served - started,
+    "forbidden": forbidden,
+}))
+"""
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _child(env: dict[str, str], forbid: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", CHILD, forbid]
+    result = subprocess.run(cmd, cwd=BACKEND_ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(f"startup failed:\n{result.stderr[-4000:]}")
+    return result
+
+
+def _import_report(stderr: str, top: int) -> None:
+    # -X importtime prints a module after everything it imported, so the rows
+    # between the previous top-level line and "app.main" are what the app pulls in.
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.split("|")
+        if name.rstrip() == " app.main":
+            break
+        if len(name) - len(name.lstrip()) == 1:
+            # A finished top-level import that is not app.main (site, encodings, ...).
+            rows = []
+            continue
+        rows.append((int(own.split(":")[1]), int(cumulative), name.rstrip()))
+    # Nesting is two spaces per level; direct dependencies of app.main sit at three.
+    packages = [row for row in rows if len(row[2]) - len(row[2].lstrip()) == 3]
+    print("app.main dependencies by cumulative import time:")
+    for _own, cumulative, name in sorted(packages, key=lambda row: row[1], reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name.strip()}")
+    print("slowest individual modules (self time):")
+    for own, _cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {own / 1000:8.1f} ms  {name.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend import and startup time")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules to list in the import report")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=1500.0,
+        help="fail (exit 1) when median import+startup exceeds this; 0 disables the check",
+    )
+    parser.add_argument(
+        "--forbid",
+        default="googleapiclient,google.oauth2,pyarrow",
+        help="comma-separated modules that must not be loaded by startup",
+    )
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-startup-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{Path(tmp) / 'bench.db'}",
+        "UPLOAD_ROOT": str(Path(tmp) / "uploads"),
+    }
+    # Measure what the README's systemd unit runs unless told otherwise: the
+    # budget includes spawning and warming the hash workers.
+    env.setdefault("PASSWORD_HASH_WORKERS", "1")
+
+    # The first run creates the database and bytecode caches; later runs measure a restart.
+    first = json.loads(_child(env, args.forbid).stdout)
+    samples = [json.loads(_child(env, args.forbid).stdout) for _ in range(args.samples)]
+    print(f"first start (new database): {(first['import'] + first['startup']) * 1000:.1f} ms")
+    for phase in ("import", "startup", "first_request"):
+        values = [sample[phase] * 1000 for sample in samples]
+        print(f"{phase:<14} p50={statistics.median(values):7.1f}ms max={max(values):7.1f}ms")
+    total = statistics.median((sample["import"] + sample["startup"]) * 1000 for sample in samples)
+    print(f"{'restart':<14} p50={total:7.1f}ms")
+
+    _import_report(_child(env, args.forbid, importtime=True).stderr, args.top)
+
+    failed = False
+    loaded = sorted({name for sample in samples for name in sample["forbidden"]})
+    if loaded:
+        print(f"FAIL: startup imported {', '.join(loaded)}")
+        failed = True
+    if args.budget_ms and total > args.budget_ms:
+        print(f"FAIL: restart p50 {total:.1f}ms exceeds budget {args.budget_ms:.0f}ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
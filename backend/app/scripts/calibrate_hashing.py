@@ -0,0 +1,58 @@
+from __future__ import annotations
+import argparse
+from collections import Counter
+from pathlib import Path
+from passlib.context import CryptContext
+from sqlmodel import Session, select
+from app.core.config import get_settings
+from app.core.database import engine
+from app.core.hashing import SCHEMES, HashPolicy, calibrate
+from app import models
+
+
+def _report(policy: HashPolicy) -> None:
+    context = CryptContext(**policy.context_kwargs())
+    with Session(engine) as session:
+        hashes = session.exec(select(models.User.hashed_password)).all()
+        hashes += session.exec(select(models.PendingUser.password_hash)).all()
+    stale = Counter()
+    for hashed in hashes:
+        if context.needs_update(hashed):
+            stale[hashed.split("$")[1] if hashed.startswith("$") else "unknown"] += 1
+    print(f"{sum(stale.values())} of {len(hashes)} stored hashes will be rehashed at next login")
+    for prefix, count in stale.most_common():
+        print(f"  ${prefix}$: {count}")
+
+
+def _write_env(path: Path, lines: list[str]) -> None:
+    keys = {line.split("=", 1)[0] for line in lines}
+    kept = []
+    if path.exists():
+        kept = [line for line in path.read_text().splitlines() if line.split("=", 1)[0].strip() not in keys]
+    path.write_text("\n".join([*kept, *lines]) + "\n")
+    print(f"Updated {path}")
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Pick password-hash cost for this host")
+    parser.add_argument("--scheme", choices=SCHEMES, default=settings.password_scheme)
+    parser.add_argument("--target-ms", type=float, default=settings.password_hash_target_ms)
+    parser.add_argument("--memory-kib", type=int, default=settings.password_argon2_memory_kib, help="argon2 only")
+    parser.add_argument("--report", action="store_true", help="count stored hashes the new policy would rehash")
+    parser.add_argument("--write-env", type=Path, metavar="PATH", help="store the result in an env file, e.g. .env")
+    args = parser.parse_args()
+
+    policy = calibrate(args.scheme, args.target_ms, args.memory_kib)
+    print(f"{policy.scheme} cost {policy.cost}: {policy.measured_ms:.0f}ms per hash (target {args.target_ms:.0f}ms)")
+    lines = policy.env_lines()
+    for line in lines:
+        print(line)
+    if args.report:
+        _report(policy)
+    if args.write_env:
+        _write_env(args.write_env, lines)
+
+
+if __name__ == "__main__":
+    main()
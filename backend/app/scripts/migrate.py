@@ -0,0 +1,31 @@
+from __future__ import annotations
+import argparse
+import sys
+from app.core import migrations
+from app.core.database import engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="run pending steps in a transaction that is rolled back; exit 1 if any are pending",
+    )
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        version = migrations.read_version(conn)
+    print(f"schema version: {'unversioned' if version is None else version} (latest {migrations.LATEST})")
+    if version == migrations.LATEST:
+        return
+    for name, seconds in migrations.upgrade(engine, dry_run=args.check):
+        print(f"  {name}: {seconds * 1000:.1f} ms")
+    if args.check:
+        print("dry run: rolled back")
+        sys.exit(1)
+    print(f"migrated to {migrations.LATEST}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Schedule and open-entry lookups behind attendance scans."""
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from sqlmodel import Session, select
+from .. import models
+from ..models_config import AppConfig
+
+
+@dataclass
+class ResolvedAttendee:
+    user: models.User | None
+    student_id: str | None
+    barcode_id: str | None
+
+
+def current_block(ts: datetime, session: Session) -> models.ScheduleBlock | None:
+    weekday = ts.weekday()
+    query = select(models.ScheduleBlock).where(
+        models.ScheduleBlock.weekday == weekday,
+        models.ScheduleBlock.active == True,  # noqa: E712
+    )
+    for block in session.exec(query):
+        if block.start_time <= ts.time() <= block.end_time:
+            return block
+    return None
+
+
+def restricted_to_schedule(session: Session) -> bool:
+    """Whether scans outside a schedule block are flagged; creates the config row if missing."""
+    config = session.get(AppConfig, 1)
+    if not config:
+        config = AppConfig(id=1, restrict_attendance_to_schedule=True)
+        session.add(config)
+        session.commit()
+        session.refresh(config)
+    return config.restrict_attendance_to_schedule
+
+
+def find_open_entry(session: Session, attendee: ResolvedAttendee) -> models.AttendanceEntry | None:
+    """The attendee's latest entry without a check-out, if any."""
+    statement = select(models.AttendanceEntry).where(models.AttendanceEntry.check_out.is_(None))
+    if attendee.user:
+        statement = statement.where(models.AttendanceEntry.user_id == attendee.user.id)
+    elif attendee.student_id:
+        statement = statement.where(models.AttendanceEntry.recorded_student_id == attendee.student_id)
+    elif attendee.barcode_id:
+        statement = statement.where(models.AttendanceEntry.recorded_barcode_id == attendee.barcode_id)
+    else:
+        return None
+    statement = statement.order_by(models.AttendanceEntry.check_in.desc())
+    return session.exec(statement).first()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+import json
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from queue import Empty, Full, Queue
+from typing import Iterator, Sequence
+from sqlmodel import Session
+from .. import models
+from ..core.config import get_settings
+from ..core.database import engine, read_snapshot
+from .export_data import HEADERS_MAP, TITLE_MAP, section_batches
+from .export_formats import ChunkSink, ExportFormat
+
+# Batches a section may run ahead of the archive writer before it blocks.
+FEED_DEPTH = 4
+# Formats that are already compressed are stored rather than deflated again.
+_STORED_EXTENSIONS = {".csv.gz", ".parquet", ".xlsx"}
+
+_DONE = object()
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _read_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=get_settings().export_workers,
+                thread_name_prefix="export-read",
+            )
+        return _pool
+
+
+class _InlineFeed:
+    """Reads a section on the writer thread from a shared snapshot session."""
+
+    def __init__(self, section: models.SheetSection, session: Session) -> None:
+        self.section = section
+        self.rows = 0
+        self._session = session
+
+    def __iter__(self) -> Iterator[Sequence[Sequence[str]]]:
+        for batch in section_batches(self.section, self._session):
+            self.rows += len(batch)
+            yield batch
+
+
+class _SectionFeed:
+    """Runs one section query on the read pool and hands batches to the writer."""
+
+    def __init__(self, section: models.SheetSection, cancel: threading.Event) -> None:
+        self.section = section
+        self.rows = 0
+        self._cancel = cancel
+        self._queue: Queue = Queue(maxsize=FEED_DEPTH)
+
+    def run(self) -> None:
+        try:
+            with Session(engine) as session:
+                for batch in section_batches(self.section, session):
+                    if not self._put(batch):
+                        return
+            self._put(_DONE)
+        except BaseException as exc:  # surfaced to the writer thread
+            self._put(exc)
+
+    def _put(self, item: object) -> bool:
+        while not self._cancel.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except Full:
+                continue
+        return False
+
+    def __iter__(self) -> Iterator[Sequence[Sequence[str]]]:
+        while True:
+            try:
+                item = self._queue.get(timeout=0.5)
+            except Empty:
+                if self._cancel.is_set():
+                    return
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            self.rows += len(item)
+            yield item
+
+
+def stream_bundle(sections: list[models.SheetSection], export_format: ExportFormat) -> Iterator[bytes]:
+    """Stream a ZIP with one entry per section followed by ``manifest.json``.
+
+    With ``EXPORT_SNAPSHOT`` enabled every section is read from one snapshot,
+    which means sequentially on a single connection; otherwise sections are
+    queried concurrently on the read pool, each in its own transaction.
+    """
+    if get_settings().export_snapshot:
+        with read_snapshot() as session:
+            yield from _write_bundle([_InlineFeed(section, session) for section in sections], export_format)
+        return
+    cancel = threading.Event()
+    feeds = [_SectionFeed(section, cancel) for section in sections]
+    pool = _read_pool()
+    for feed in feeds:
+        pool.submit(feed.run)
+    try:
+        yield from _write_bundle(feeds, export_format)
+    finally:
+        cancel.set()
+
+
+def _write_bundle(feeds: list[_InlineFeed] | list[_SectionFeed], export_format: ExportFormat) -> Iterator[bytes]:
+    started = time.perf_counter()
+    generated_at = datetime.utcnow()
+    compress_type = (
+        zipfile.ZIP_STORED if export_format.extension in _STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    )
+    sink = ChunkSink()
+    manifest_sections = []
+    with zipfile.ZipFile(sink, "w") as archive:
+        for feed in feeds:
+            section_started = time.perf_counter()
+            info = zipfile.ZipInfo(
+                f"{feed.section.value}{export_format.extension}",
+                date_time=generated_at.timetuple()[:6],
+            )
+            info.compress_type = compress_type
+            with archive.open(info, "w") as entry:
+                title = TITLE_MAP[feed.section]
+                for chunk in export_format.writer(title, HEADERS_MAP[feed.section], feed):
+                    entry.write(chunk)
+                    yield sink.drain()
+            manifest_sections.append(
+                {
+                    "section": feed.section.value,
+                    "file": info.filename,
+                    "title": TITLE_MAP[feed.section],
+                    "rows": feed.rows,
+                    "seconds": round(time.perf_counter() - section_started, 3),
+                }
+            )
+        manifest = {
+            "generated_at": generated_at.isoformat(),
+            "format": export_format.extension.lstrip("."),
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "sections": manifest_sections,
+        }
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    yield sink.drain()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from pathlib import Path
+from typing import Iterator
+from ..core.config import get_settings
+
+_evict_lock = threading.Lock()
+
+
+def cache_dir() -> Path:
+    folder = get_settings().upload_root / ".cache" / "exports"
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def _entry_path(key: str, extension: str) -> Path:
+    # The cache sits under the public /uploads mount, so names are keyed with
+    # the app secret to keep cached exports unguessable.
+    digest = hmac.new(get_settings().secret_key.encode("utf-8"), key.encode("utf-8"), hashlib.sha256)
+    return cache_dir() / f"{digest.hexdigest()[:40]}{extension}"
+
+
+def lookup(key: str, extension: str) -> Path | None:
+    path = _entry_path(key, extension)
+    try:
+        os.utime(path)  # mtime doubles as the LRU clock
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def fill(key: str, extension: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Pass ``chunks`` through while writing them to the cache.
+
+    The entry only becomes visible once the stream completes; an aborted
+    download leaves nothing behind.
+    """
+    final = _entry_path(key, extension)
+    partial = final.with_name(f".{final.name}.{secrets.token_hex(4)}.part")
+    completed = False
+    try:
+        with partial.open("wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                yield chunk
+        os.replace(partial, final)
+        completed = True
+    finally:
+        if not completed:
+            partial.unlink(missing_ok=True)
+    evict()
+
+
+def evict(max_bytes: int | None = None) -> None:
+    limit = max_bytes if max_bytes is not None else get_settings().export_cache_max_mb * 1024 * 1024
+    with _evict_lock:
+        entries = []
+        total = 0
+        for entry in os.scandir(cache_dir()):
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        if total <= limit:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= limit:
+                break
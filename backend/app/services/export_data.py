@@ -1,7 +1,29 @@
 from __future__ import annotations
-from typing import List, Tuple
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+from sqlalchemy import String, type_coerce
+from sqlalchemy import select as core_select
 from sqlmodel import Session, select
 from .. import models
+from ..core.config import get_settings
+
+_TICKET_TABLES = ("ticket",)
+_JOB_TABLES = ("shopjob", "user")
+
+# Tables each section reads; their write versions make up the snapshot token.
+SECTION_TABLES = {
+    models.SheetSection.attendance: ("attendanceentry",),
+    models.SheetSection.manufacturing: ("manufacturingpart", "manufacturing_assignment", "user"),
+    models.SheetSection.cnc: _JOB_TABLES,
+    models.SheetSection.printing: _JOB_TABLES,
+    models.SheetSection.orders: ("orderrequest",),
+    models.SheetSection.inventory: ("inventoryitem",),
+    models.SheetSection.tickets_feature: _TICKET_TABLES,
+    models.SheetSection.tickets_issue: _TICKET_TABLES,
+}
+
+# Rows fetched per ``fetchmany`` call by the columnar engine.
+EXPORT_BATCH_SIZE = 2000
 
 TITLE_MAP = {
     models.SheetSection.attendance: "Attendance",
@@ -14,13 +36,100 @@ TITLE_MAP = {
     models.SheetSection.tickets_issue: "Issues",
 }
 
+_TICKET_HEADERS = ["ID", "Type", "Subject", "Priority", "Status", "Requester", "CreatedAt", "UpdatedAt", "Details"]
+_JOB_HEADERS = ["ID", "Part", "Owner", "Status", "QueuePos", "ClaimedBy", "CreatedAt", "Notes", "FileName"]
+
+HEADERS_MAP = {
+    models.SheetSection.attendance: ["ID", "StudentID", "Barcode", "CheckIn", "CheckOut", "Status", "Note"],
+    models.SheetSection.manufacturing: [
+        "ID",
+        "Part",
+        "Subsystem",
+        "Material",
+        "Quantity",
+        "Type",
+        "Priority",
+        "Status",
+        "AssignedStudents",
+        "AssignedLeads",
+        "CADLink",
+        "CAMLink",
+        "CAMStudent",
+        "CNCOoperator",
+        "MaterialStock",
+        "PrinterAssignment",
+        "SlicerProfile",
+        "FilamentType",
+        "ToolType",
+        "Dimensions",
+        "ResponsibleStudent",
+        "Notes",
+        "CreatedBy",
+        "ApprovedBy",
+        "CreatedAt",
+        "UpdatedAt",
+        "EtaMinutes",
+        "EtaTarget",
+        "CadFileName",
+        "CamFileName",
+    ],
+    models.SheetSection.cnc: _JOB_HEADERS,
+    models.SheetSection.printing: _JOB_HEADERS,
+    models.SheetSection.orders: ["ID", "Requester", "Part", "PriceUSD", "Status", "VendorLink", "CreatedAt", "Justification"],
+    models.SheetSection.inventory: [
+        "ID",
+        "Part",
+        "SKU",
+        "PartType",
+        "Location",
+        "Qty",
+        "UnitCost",
+        "ReorderAt",
+        "Vendor",
+        "Tags",
+        "VendorLink",
+        "UpdatedAt",
+    ],
+    models.SheetSection.tickets_feature: _TICKET_HEADERS,
+    models.SheetSection.tickets_issue: _TICKET_HEADERS,
+}
+
+
+def get_section_dataset(
+    section: models.SheetSection,
+    session: Session,
+    mode: str | None = None,
+) -> Tuple[str, List[str], List[Sequence[str]]]:
+    """Return ``(title, headers, rows)`` for a section.
+
+    ``mode`` picks the engine: ``"columnar"`` (Core selects, batched column
+    formatting) or ``"orm"`` (full model hydration). Defaults to the
+    ``EXPORT_MODE`` setting.
+    """
+    if (mode or get_settings().export_mode) == "orm":
+        return _orm_section_dataset(section, session)
+    rows = [row for batch in iter_section_batches(section, session) for row in batch]
+    return TITLE_MAP[section], HEADERS_MAP[section], rows
 
-def get_section_dataset(section: models.SheetSection, session: Session) -> Tuple[str, List[str], List[List[str]]]:
+
+def section_batches(
+    section: models.SheetSection,
+    session: Session,
+    mode: str | None = None,
+) -> Iterator[Sequence[Sequence[str]]]:
+    """Like ``get_section_dataset`` but yields row batches for streaming writers."""
+    if (mode or get_settings().export_mode) == "orm":
+        yield _orm_section_dataset(section, session)[2]
+        return
+    yield from iter_section_batches(section, session)
+
+
+def _orm_section_dataset(section: models.SheetSection, session: Session) -> Tuple[str, List[str], List[List[str]]]:
     title = TITLE_MAP[section]
 
     if section == models.SheetSection.attendance:
         entries = session.exec(select(models.AttendanceEntry).order_by(models.AttendanceEntry.check_in)).all()
-        headers = ["ID", "StudentID", "Barcode", "CheckIn", "CheckOut", "Status", "Note"]
+        headers = HEADERS_MAP[section]
         rows = [
             [
                 str(e.id),
@@ -37,60 +146,36 @@ def get_section_dataset(section: models.SheetSection, session: Session) -> Tuple
         parts = session.exec(
             select(models.ManufacturingPart).order_by(models.ManufacturingPart.created_at.desc())
         ).all()
-        user_ids: set[int] = set()
+        assigned: dict[tuple[int, models.AssignmentRole], list[int]] = {}
+        for part_id, role, user_id in session.exec(
+            select(
+                models.ManufacturingAssignment.part_id,
+                models.ManufacturingAssignment.role,
+                models.ManufacturingAssignment.user_id,
+            ).order_by(models.ManufacturingAssignment.position)
+        ):
+            assigned.setdefault((part_id, role), []).append(user_id)
+        user_ids: set[int] = {user_id for ids in assigned.values() for user_id in ids}
         for part in parts:
             user_ids.add(part.created_by_id)
             if part.approved_by_id:
                 user_ids.add(part.approved_by_id)
-            for sid in part.assigned_student_ids or []:
-                user_ids.add(sid)
-            for lid in part.assigned_lead_ids or []:
-                user_ids.add(lid)
         user_map: dict[int, str] = {}
         if user_ids:
             assignments = session.exec(
                 select(models.User).where(models.User.id.in_(user_ids))
             ).all()
             user_map = {user.id: user.full_name for user in assignments}
-        headers = [
-            "ID",
-            "Part",
-            "Subsystem",
-            "Material",
-            "Quantity",
-            "Type",
-            "Priority",
-            "Status",
-            "AssignedStudents",
-            "AssignedLeads",
-            "CADLink",
-            "CAMLink",
-            "CAMStudent",
-            "CNCOoperator",
-            "MaterialStock",
-            "PrinterAssignment",
-            "SlicerProfile",
-            "FilamentType",
-            "ToolType",
-            "Dimensions",
-            "ResponsibleStudent",
-            "Notes",
-            "CreatedBy",
-            "ApprovedBy",
-            "CreatedAt",
-            "UpdatedAt",
-            "EtaMinutes",
-            "EtaTarget",
-            "CadFileName",
-            "CamFileName",
-        ]
+        headers = HEADERS_MAP[section]
         rows = []
         for part in parts:
             student_names = [
-                user_map.get(student_id, str(student_id)) for student_id in (part.assigned_student_ids or [])
+                user_map.get(student_id, str(student_id))
+                for student_id in assigned.get((part.id, models.AssignmentRole.student), [])
             ]
             lead_names = [
-                user_map.get(lead_id, str(lead_id)) for lead_id in (part.assigned_lead_ids or [])
+                user_map.get(lead_id, str(lead_id))
+                for lead_id in assigned.get((part.id, models.AssignmentRole.lead), [])
             ]
             rows.append(
                 [
@@ -129,7 +214,12 @@ def get_section_dataset(section: models.SheetSection, session: Session) -> Tuple
     elif section in (models.SheetSection.cnc, models.SheetSection.printing):
         shop = models.ShopType.cnc if section == models.SheetSection.cnc else models.ShopType.printing
         jobs = session.exec(select(models.ShopJob).where(models.ShopJob.shop == shop).order_by(models.ShopJob.queue_position)).all()
-        headers = ["ID", "Part", "Owner", "Status", "QueuePos", "ClaimedBy", "CreatedAt", "Notes", "FileName"]
+        claimed_ids = {j.claimed_by_id for j in jobs if j.claimed_by_id}
+        claimed_map: dict[int, str] = {}
+        if claimed_ids:
+            claimers = session.exec(select(models.User).where(models.User.id.in_(claimed_ids))).all()
+            claimed_map = {user.id: user.full_name for user in claimers}
+        headers = HEADERS_MAP[section]
         rows = [
             [
                 str(j.id),
@@ -137,7 +227,7 @@ def get_section_dataset(section: models.SheetSection, session: Session) -> Tuple
                 j.owner_name,
                 j.status.value,
                 str(j.queue_position),
-                j.claimed_by_name or "",
+                claimed_map.get(j.claimed_by_id, "") if j.claimed_by_id else "",
                 j.created_at.isoformat(),
                 j.notes or "",
                 j.file_name,
@@ -146,7 +236,7 @@ def get_section_dataset(section: models.SheetSection, session: Session) -> Tuple
         ]
     elif section == models.SheetSection.orders:
         orders = session.exec(select(models.OrderRequest).order_by(models.OrderRequest.created_at.desc())).all()
-        headers = ["ID", "Requester", "Part", "PriceUSD", "Status", "VendorLink", "CreatedAt", "Justification"]
+        headers = HEADERS_MAP[section]
         rows = [
             [
                 str(o.id),
@@ -162,20 +252,7 @@ def get_section_dataset(section: models.SheetSection, session: Session) -> Tuple
         ]
     elif section == models.SheetSection.inventory:
         items = session.exec(select(models.InventoryItem).order_by(models.InventoryItem.part_name)).all()
-        headers = [
-            "ID",
-            "Part",
-            "SKU",
-            "PartType",
-            "Location",
-            "Qty",
-            "UnitCost",
-            "ReorderAt",
-            "Vendor",
-            "Tags",
-            "VendorLink",
-            "UpdatedAt",
-        ]
+        headers = HEADERS_MAP[section]
         rows = [
             [
                 str(it.id),
@@ -196,7 +273,7 @@ def get_section_dataset(section: models.SheetSection, session: Session) -> Tuple
     else:
         type_val = models.TicketType.feature if section == models.SheetSection.tickets_feature else models.TicketType.issue
         tickets = session.exec(select(models.Ticket).where(models.Ticket.type == type_val).order_by(models.Ticket.created_at.desc())).all()
-        headers = ["ID", "Type", "Subject", "Priority", "Status", "Requester", "CreatedAt", "UpdatedAt", "Details"]
+        headers = HEADERS_MAP[section]
         rows = [
             [
                 str(t.id),
@@ -213,3 +290,350 @@ def get_section_dataset(section: models.SheetSection, session: Session) -> Tuple
         ]
 
     return title, headers, rows
+
+
+# Columnar engine: Core selects of only the exported columns, fetched in
+# ``fetchmany`` batches, transposed and formatted one column at a time.
+
+
+def _enum_table(enum_cls: type) -> dict[Any, str]:
+    table: dict[Any, str] = {None: ""}
+    for member in enum_cls:
+        table[member] = member.value
+        table[member.name] = member.value
+    return table
+
+
+_ATTENDANCE_STATUS = _enum_table(models.AttendanceStatus)
+_MANUFACTURING_TYPE = _enum_table(models.ManufacturingType)
+_MANUFACTURING_PRIORITY = _enum_table(models.ManufacturingPriority)
+_MANUFACTURING_STATUS = _enum_table(models.ManufacturingStatus)
+_JOB_STATUS = _enum_table(models.JobStatus)
+_ORDER_STATUS = _enum_table(models.OrderStatus)
+_PART_TYPE = _enum_table(models.InventoryPartType)
+_TICKET_TYPE = _enum_table(models.TicketType)
+_TICKET_PRIORITY = _enum_table(models.TicketPriority)
+_TICKET_STATUS = _enum_table(models.TicketStatus)
+
+
+def _text(values: Sequence[str | None]) -> list[str]:
+    return [value or "" for value in values]
+
+
+def _ints(values: Sequence[int | None]) -> list[str]:
+    return ["" if value is None else str(value) for value in values]
+
+
+def _money(values: Sequence[float | None]) -> list[str]:
+    return ["" if value is None else f"{value:.2f}" for value in values]
+
+
+def _enums(values: Sequence[Any], table: dict[Any, str]) -> list[str]:
+    return list(map(table.__getitem__, values))
+
+
+def _isoformat(values: Sequence[datetime | str | None]) -> list[str]:
+    # SQLite hands back the stored "YYYY-MM-DD HH:MM:SS.ffffff" text, which is
+    # rewritten to match datetime.isoformat() without parsing every value.
+    out: list[str] = []
+    append = out.append
+    for value in values:
+        if value is None:
+            append("")
+        elif value.__class__ is str:
+            append(value[:10] + "T" + (value[11:19] if value.endswith(".000000") else value[11:]))
+        else:
+            append(value.isoformat())
+    return out
+
+
+def _assignee_names(
+    session: Session,
+    part_ids: Sequence[int],
+    names: dict[int, str],
+) -> tuple[list[str], list[str]]:
+    """Student and lead name columns for one batch of parts."""
+    c = models.ManufacturingAssignment.__table__.c
+    rows = session.connection().execute(
+        core_select(c.part_id, c.role, c.user_id)
+        .where(c.part_id.in_(part_ids))
+        .order_by(c.part_id, c.role, c.position)
+    )
+    grouped: dict[tuple[int, Any], list[str]] = {}
+    for part_id, role, user_id in rows:
+        grouped.setdefault((part_id, role), []).append(names.get(user_id, str(user_id)))
+    student, lead = models.AssignmentRole.student, models.AssignmentRole.lead
+    return (
+        ["; ".join(grouped.get((part_id, student), ())) for part_id in part_ids],
+        ["; ".join(grouped.get((part_id, lead), ())) for part_id in part_ids],
+    )
+
+
+def _column_batches(session: Session, statement: Any, batch_size: int) -> Iterator[tuple[tuple, ...]]:
+    result = session.connection().execute(statement)
+    try:
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            yield tuple(zip(*rows))
+    finally:
+        result.close()
+
+
+def _user_names(session: Session) -> dict[int, str]:
+    users = models.User.__table__.c
+    return dict(session.connection().execute(core_select(users.id, users.full_name)).all())
+
+
+def _section_plan(
+    section: models.SheetSection,
+    session: Session,
+    wire: Callable[[Any], Any],
+) -> tuple[Any, Callable[[tuple], Iterable[list[str]]]]:
+    if section == models.SheetSection.attendance:
+        c = models.AttendanceEntry.__table__.c
+        statement = core_select(
+            c.id,
+            c.recorded_student_id,
+            c.recorded_barcode_id,
+            wire(c.check_in),
+            wire(c.check_out),
+            wire(c.status),
+            c.note,
+        ).order_by(c.check_in)
+
+        def fmt(cols: tuple) -> Iterable[list[str]]:
+            ids, student_ids, barcodes, check_in, check_out, status, note = cols
+            return (
+                list(map(str, ids)),
+                _text(student_ids),
+                _text(barcodes),
+                _isoformat(check_in),
+                _isoformat(check_out),
+                _enums(status, _ATTENDANCE_STATUS),
+                _text(note),
+            )
+
+        return statement, fmt
+
+    if section == models.SheetSection.manufacturing:
+        c = models.ManufacturingPart.__table__.c
+        names = _user_names(session)
+        statement = core_select(
+            c.id,
+            c.part_name,
+            c.subsystem,
+            c.material,
+            c.quantity,
+            wire(c.manufacturing_type),
+            wire(c.priority),
+            wire(c.status),
+            c.cad_link,
+            c.cam_link,
+            c.cam_student,
+            c.cnc_operator,
+            c.material_stock,
+            c.printer_assignment,
+            c.slicer_profile,
+            c.filament_type,
+            c.tool_type,
+            c.dimensions,
+            c.responsible_student,
+            c.notes,
+            c.created_by_id,
+            c.created_by_name,
+            c.approved_by_id,
+            wire(c.created_at),
+            wire(c.updated_at),
+            c.student_eta_minutes,
+            wire(c.eta_target),
+            c.cad_file_name,
+            c.cam_file_name,
+        ).order_by(c.created_at.desc())
+
+        def fmt(cols: tuple) -> Iterable[list[str]]:
+            ids, part_names, subsystems, materials, quantities, types, priorities, statuses, cad_links = cols[:9]
+            optional_text = cols[9:20]  # cam_link through notes
+            (created_by_ids, created_by_names, approved_by_ids, created_at, updated_at,
+             eta_minutes, eta_target, cad_files, cam_files) = cols[20:]
+            students, leads = _assignee_names(session, ids, names)
+            return (
+                list(map(str, ids)),
+                part_names,
+                subsystems,
+                materials,
+                list(map(str, quantities)),
+                _enums(types, _MANUFACTURING_TYPE),
+                _enums(priorities, _MANUFACTURING_PRIORITY),
+                _enums(statuses, _MANUFACTURING_STATUS),
+                students,
+                leads,
+                cad_links,
+                *[_text(values) for values in optional_text],
+                [names.get(uid, fallback) for uid, fallback in zip(created_by_ids, created_by_names)],
+                [names.get(uid, "") if uid else "" for uid in approved_by_ids],
+                _isoformat(created_at),
+                _isoformat(updated_at),
+                _ints(eta_minutes),
+                _isoformat(eta_target),
+                _text(cad_files),
+                _text(cam_files),
+            )
+
+        return statement, fmt
+
+    if section in (models.SheetSection.cnc, models.SheetSection.printing):
+        shop = models.ShopType.cnc if section == models.SheetSection.cnc else models.ShopType.printing
+        c = models.ShopJob.__table__.c
+        names = _user_names(session)
+        statement = (
+            core_select(
+                c.id,
+                c.part_name,
+                c.owner_name,
+                wire(c.status),
+                c.queue_position,
+                c.claimed_by_id,
+                wire(c.created_at),
+                c.notes,
+                c.file_name,
+            )
+            .where(c.shop == shop)
+            .order_by(c.queue_position)
+        )
+
+        def fmt(cols: tuple) -> Iterable[list[str]]:
+            ids, part_names, owners, statuses, positions, claimed_by, created_at, notes, file_names = cols
+            return (
+                list(map(str, ids)),
+                part_names,
+                owners,
+                _enums(statuses, _JOB_STATUS),
+                list(map(str, positions)),
+                [names.get(uid, "") if uid else "" for uid in claimed_by],
+                _isoformat(created_at),
+                _text(notes),
+                file_names,
+            )
+
+        return statement, fmt
+
+    if section == models.SheetSection.orders:
+        c = models.OrderRequest.__table__.c
+        statement = core_select(
+            c.id,
+            c.requester_name,
+            c.part_name,
+            c.price_usd,
+            wire(c.status),
+            c.vendor_link,
+            wire(c.created_at),
+            c.justification,
+        ).order_by(c.created_at.desc())
+
+        def fmt(cols: tuple) -> Iterable[list[str]]:
+            ids, requesters, part_names, prices, statuses, links, created_at, justifications = cols
+            return (
+                list(map(str, ids)),
+                requesters,
+                part_names,
+                _money(prices),
+                _enums(statuses, _ORDER_STATUS),
+                links,
+                _isoformat(created_at),
+                _text(justifications),
+            )
+
+        return statement, fmt
+
+    if section == models.SheetSection.inventory:
+        c = models.InventoryItem.__table__.c
+        statement = core_select(
+            c.id,
+            c.part_name,
+            c.sku,
+            wire(c.part_type),
+            c.location,
+            c.quantity,
+            c.unit_cost,
+            c.reorder_threshold,
+            c.vendor_name,
+            c.tags,
+            c.vendor_link,
+            wire(c.updated_at),
+        ).order_by(c.part_name)
+
+        def fmt(cols: tuple) -> Iterable[list[str]]:
+            (ids, part_names, skus, part_types, locations, quantities, unit_costs, thresholds,
+             vendors, tags, links, updated_at) = cols
+            return (
+                list(map(str, ids)),
+                part_names,
+                _text(skus),
+                _enums(part_types, _PART_TYPE),
+                _text(locations),
+                list(map(str, quantities)),
+                _money(unit_costs),
+                _ints(thresholds),
+                _text(vendors),
+                _text(tags),
+                _text(links),
+                _isoformat(updated_at),
+            )
+
+        return statement, fmt
+
+    type_val = models.TicketType.feature if section == models.SheetSection.tickets_feature else models.TicketType.issue
+    c = models.Ticket.__table__.c
+    statement = (
+        core_select(
+            c.id,
+            wire(c.type),
+            c.subject,
+            wire(c.priority),
+            wire(c.status),
+            c.requester_name,
+            wire(c.created_at),
+            wire(c.updated_at),
+            c.details,
+        )
+        .where(c.type == type_val)
+        .order_by(c.created_at.desc())
+    )
+
+    def fmt(cols: tuple) -> Iterable[list[str]]:
+        ids, types, subjects, priorities, statuses, requesters, created_at, updated_at, details = cols
+        return (
+            list(map(str, ids)),
+            _enums(types, _TICKET_TYPE),
+            subjects,
+            _enums(priorities, _TICKET_PRIORITY),
+            _enums(statuses, _TICKET_STATUS),
+            requesters,
+            _isoformat(created_at),
+            _isoformat(updated_at),
+            details,
+        )
+
+    return statement, fmt
+
+
+def iter_section_batches(
+    section: models.SheetSection,
+    session: Session,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[list[tuple[str, ...]]]:
+    """Yield formatted rows for ``section`` in batches of up to ``batch_size``."""
+    if session.get_bind().dialect.name == "sqlite":
+        # Skip the per-value DateTime/Enum result processors; the formatters
+        # handle the raw stored text directly.
+        def wire(column: Any) -> Any:
+            return type_coerce(column, String)
+    else:
+        def wire(column: Any) -> Any:
+            return column
+
+    statement, fmt = _section_plan(section, session, wire)
+    for cols in _column_batches(session, statement, batch_size):
+        yield list(zip(*fmt(cols)))
@@ -0,0 +1,197 @@
+from __future__ import annotations
+import csv
+import io
+import json
+import re
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Sequence
+from xml.sax.saxutils import escape
+
+Batches = Iterable[Sequence[Sequence[str]]]
+
+
+class ChunkSink:
+    """Write-only file object whose contents are drained by the caller.
+
+    It exposes ``tell`` but not ``seek``, so ``zipfile`` and pyarrow treat it
+    as an unseekable stream and never need to rewind.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_csv(title: str, headers: Sequence[str], batches: Batches) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_csv_gz(title: str, headers: Sequence[str], batches: Batches) -> Iterator[bytes]:
+    # wbits=31 produces a gzip container rather than a raw zlib stream.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in stream_csv(title, headers, batches):
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_jsonl(title: str, headers: Sequence[str], batches: Batches) -> Iterator[bytes]:
+    keys = list(headers)
+    for batch in batches:
+        lines = [json.dumps(dict(zip(keys, row)), ensure_ascii=False) for row in batch]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def stream_parquet(title: str, headers: Sequence[str], batches: Batches) -> Iterator[bytes]:
+    # Every batch becomes one row group, so memory stays bounded by batch size.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([pa.field(name, pa.string()) for name in headers])
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            if not batch:
+                continue
+            columns = [pa.array(values, type=pa.string()) for values in zip(*batch)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _xlsx_cell(value: str) -> str:
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_XML_INVALID.sub("", value))}</t></is></c>'
+
+
+def _xlsx_rows(headers: Sequence[str], batches: Batches) -> Iterator[str]:
+    yield "".join(["<row>", *map(_xlsx_cell, headers), "</row>"])
+    for batch in batches:
+        yield "".join(["".join(["<row>", *map(_xlsx_cell, row), "</row>"]) for row in batch])
+
+
+def stream_xlsx(title: str, headers: Sequence[str], batches: Batches) -> Iterator[bytes]:
+    """Single-sheet workbook using inline strings, written entry by entry."""
+    sink = ChunkSink()
+    sheet_name = escape(re.sub(r"[\[\]:*?/\\]", " ", title)[:31] or "Sheet1", {'"': "&quot;"})
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, body in _XLSX_STATIC.items():
+            archive.writestr(name, body)
+        archive.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        yield sink.drain()
+        with archive.open("xl/worksheets/sheet1.xml", "w") as entry:
+            entry.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            for chunk in _xlsx_rows(headers, batches):
+                entry.write(chunk.encode("utf-8"))
+                yield sink.drain()
+            entry.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    extension: str
+    media_type: str
+    writer: Callable[..., Iterator[bytes]]
+    requires: str | None = None
+
+
+EXPORT_FORMATS: dict[str, ExportFormat] = {
+    "csv": ExportFormat(".csv", "text/csv", stream_csv),
+    "csv.gz": ExportFormat(".csv.gz", "application/gzip", stream_csv_gz),
+    "jsonl": ExportFormat(".jsonl", "application/x-ndjson", stream_jsonl),
+    "parquet": ExportFormat(".parquet", "application/vnd.apache.parquet", stream_parquet, requires="pyarrow"),
+    "xlsx": ExportFormat(
+        ".xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        stream_xlsx,
+    ),
+}
+
+
+def format_available(export_format: ExportFormat) -> bool:
+    if not export_format.requires:
+        return True
+    try:
+        __import__(export_format.requires)
+    except ImportError:
+        return False
+    return True
@@ -1,7 +1,5 @@
 from __future__ import annotations
 from typing import Any
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
 from ..core.config import get_settings
 
 settings = get_settings()
@@ -10,6 +8,10 @@ settings = get_settings()
 def append_order_to_sheet(values: list[Any]) -> str | None:
     if not (settings.google_service_account_file and settings.google_sheet_id):
         return None
+    # The Google client stack is slow to import; only pay for it once Sheets is configured.
+    from google.oauth2.service_account import Credentials
+    from googleapiclient.discovery import build
+
     creds = Credentials.from_service_account_file(
         settings.google_service_account_file,
         scopes=["https://www.googleapis.com/auth/spreadsheets"],
@@ -0,0 +1,48 @@
+"""Recent consumption rates for inventory items, updated one adjustment at a time.
+
+Each item keeps the units it has consumed as an exponentially decayed sum
+(``usage_decayed``) as of its last consumption (``usage_at``). Recording a
+consumption decays the sum to that moment and adds the units, so neither
+recording nor reading a rate touches the transaction history. Divided by the
+decay time constant the sum is a units-per-day rate: steady use of r a day
+settles at r, and usage counts half as much after
+``INVENTORY_USAGE_HALF_LIFE_DAYS``.
+"""
+from __future__ import annotations
+import math
+from datetime import datetime
+from .. import models
+from ..core.config import get_settings
+
+# Corrections fix a miscount; they are not usage.
+CONSUMING_REASONS = {models.InventoryReason.manual, models.InventoryReason.job}
+
+
+def _tau_days() -> float:
+    return get_settings().inventory_usage_half_life_days / math.log(2)
+
+
+def decayed(value: float, since: datetime | None, now: datetime) -> float:
+    if since is None or not value:
+        return value
+    days = max((now - since).total_seconds() / 86400, 0.0)
+    return value * math.exp(-days / _tau_days())
+
+
+def record(item: models.InventoryItem, delta: int, reason: models.InventoryReason, at: datetime | None = None) -> None:
+    """Fold a stock adjustment into the item's usage if it consumed stock."""
+    if delta >= 0 or reason not in CONSUMING_REASONS:
+        return
+    at = at or datetime.utcnow()
+    item.usage_decayed = decayed(item.usage_decayed, item.usage_at, at) - delta
+    item.usage_at = at
+
+
+def rate_per_day(item: models.InventoryItem, now: datetime) -> float:
+    return decayed(item.usage_decayed, item.usage_at, now) / _tau_days()
+
+
+def suggested_order(item: models.InventoryItem, rate: float) -> int:
+    """Units that bring the item back above its threshold with INVENTORY_REORDER_COVER_DAYS of usage to spare."""
+    cover = max(math.ceil(rate * get_settings().inventory_reorder_cover_days), 1)
+    return (item.reorder_threshold or 0) - item.quantity + cover
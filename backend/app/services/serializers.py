@@ -0,0 +1,200 @@
+"""Response shapes for rows that more than one router returns."""
+from __future__ import annotations
+from pathlib import Path
+from sqlmodel import Session, select
+from .. import models, schemas
+from ..core import deps
+from ..core.config import get_settings
+
+STATUS_LABELS = {
+    models.ManufacturingStatus.design_submitted: "Design Submitted",
+    models.ManufacturingStatus.ready_for_manufacturing: "Ready for Manufacturing",
+    models.ManufacturingStatus.in_progress: "In Progress",
+    models.ManufacturingStatus.quality_check: "Quality Check",
+    models.ManufacturingStatus.completed: "Completed",
+}
+
+# Board order: status lane first, then priority.
+STATUS_ORDER = {status: idx for idx, status in enumerate(STATUS_LABELS.keys())}
+
+PRIORITY_WEIGHT = {
+    models.ManufacturingPriority.urgent: 0,
+    models.ManufacturingPriority.normal: 1,
+    models.ManufacturingPriority.low: 2,
+}
+
+
+def file_url(path: str | None) -> str | None:
+    """Public URL of a stored upload, or None when it is outside UPLOAD_ROOT."""
+    if not path:
+        return None
+    try:
+        rel = Path(path).resolve().relative_to(get_settings().upload_root.resolve())
+        return f"/uploads/{rel.as_posix()}"
+    except Exception:
+        return None
+
+
+def job_to_dict(job: models.ShopJob, session: Session) -> dict:
+    claimed_name = None
+    if job.claimed_by_id:
+        user = session.get(models.User, job.claimed_by_id)
+        claimed_name = user.full_name if user else None
+    return {
+        "id": job.id,
+        "shop": job.shop.value,
+        "part_name": job.part_name,
+        "owner_name": job.owner_name,
+        "status": job.status.value,
+        "notes": job.notes,
+        "file_name": job.file_name,
+        "created_at": job.created_at,
+        "file_url": file_url(job.file_path),
+        "queue_position": job.queue_position,
+        "claimed_by_id": job.claimed_by_id,
+        "claimed_by_name": claimed_name,
+        "claimed_at": job.claimed_at,
+    }
+
+
+def ticket_to_read(ticket: models.Ticket) -> schemas.TicketRead:
+    return schemas.TicketRead(
+        id=ticket.id,
+        type=ticket.type.value,
+        subject=ticket.subject,
+        details=ticket.details,
+        priority=ticket.priority.value,
+        status=ticket.status.value,
+        requester_name=ticket.requester_name,
+        created_at=ticket.created_at,
+        updated_at=ticket.updated_at,
+    )
+
+
+def order_to_read(order: models.OrderRequest) -> schemas.OrderRead:
+    return schemas.OrderRead(
+        id=order.id,
+        requester_name=order.requester_name,
+        part_name=order.part_name,
+        vendor_link=order.vendor_link,
+        price_usd=order.price_usd,
+        justification=order.justification,
+        status=order.status.value,
+        created_at=order.created_at,
+    )
+
+
+def _load_users_map(session: Session, parts: list[models.ManufacturingPart]) -> dict[int, models.User]:
+    ids: set[int] = set()
+    for part in parts:
+        ids.add(part.created_by_id)
+        if part.approved_by_id:
+            ids.add(part.approved_by_id)
+        if part.eta_by_id:
+            ids.add(part.eta_by_id)
+    if not ids:
+        return {}
+    rows = session.exec(select(models.User).where(models.User.id.in_(ids))).all()
+    return {row.id: row for row in rows if row}
+
+
+def _assignment_from_user(user: models.User | None) -> schemas.ManufacturingAssignment | None:
+    if not user:
+        return None
+    return schemas.ManufacturingAssignment(id=user.id, name=user.full_name, role=user.role.value)
+
+
+def _assigned_users(
+    session: Session,
+    part_ids: list[int],
+) -> dict[int, dict[models.AssignmentRole, list[models.User]]]:
+    """Assignees per part in assignment order, resolved in one joined query."""
+    if not part_ids:
+        return {}
+    assignment = models.ManufacturingAssignment
+    rows = session.exec(
+        select(assignment.part_id, assignment.role, models.User)
+        .join(models.User, models.User.id == assignment.user_id)
+        .where(assignment.part_id.in_(part_ids))
+        .order_by(assignment.part_id, assignment.role, assignment.position)
+    ).all()
+    grouped: dict[int, dict[models.AssignmentRole, list[models.User]]] = {}
+    for part_id, role, user in rows:
+        grouped.setdefault(part_id, {}).setdefault(role, []).append(user)
+    return grouped
+
+
+def parts_to_read(
+    parts: list[models.ManufacturingPart],
+    session: Session,
+    current: models.User | deps.Principal,
+) -> list[schemas.ManufacturingPartRead]:
+    """Serialize parts with their people and what ``current`` may do to each."""
+    user_map = _load_users_map(session, parts)
+    assigned = _assigned_users(session, [part.id for part in parts])
+    can_assign = current.role in (models.Role.lead, models.Role.admin)
+    serialized: list[schemas.ManufacturingPartRead] = []
+    for part in parts:
+        created_by = _assignment_from_user(user_map.get(part.created_by_id))
+        approved_by = _assignment_from_user(user_map.get(part.approved_by_id))
+        part_assignees = assigned.get(part.id, {})
+        students = part_assignees.get(models.AssignmentRole.student, [])
+        leads = part_assignees.get(models.AssignmentRole.lead, [])
+        assigned_students = [_assignment_from_user(user) for user in students]
+        assigned_leads = [_assignment_from_user(user) for user in leads]
+        can_edit = (
+            can_assign
+            or part.created_by_id == current.id
+            or current.id in {user.id for user in students + leads}
+        )
+        can_move = can_edit and (can_assign or not part.status_locked)
+        eta_by = _assignment_from_user(user_map.get(part.eta_by_id)) if part.eta_by_id else None
+        serialized.append(
+            schemas.ManufacturingPartRead(
+                id=part.id,
+                part_name=part.part_name,
+                subsystem=part.subsystem,
+                material=part.material,
+                quantity=part.quantity,
+                manufacturing_type=part.manufacturing_type.value,
+                cad_link=part.cad_link,
+                cam_link=part.cam_link,
+                cam_student=part.cam_student,
+                cnc_operator=part.cnc_operator,
+                material_stock=part.material_stock,
+                printer_assignment=part.printer_assignment,
+                slicer_profile=part.slicer_profile,
+                filament_type=part.filament_type,
+                tool_type=part.tool_type,
+                dimensions=part.dimensions,
+                responsible_student=part.responsible_student,
+                notes=part.notes,
+                priority=part.priority.value,
+                status=part.status.value,
+                status_label=STATUS_LABELS[part.status],
+                status_locked=part.status_locked,
+                lock_reason=part.lock_reason,
+                created_at=part.created_at,
+                updated_at=part.updated_at,
+                last_status_change=part.last_status_change,
+                created_by=created_by if created_by else schemas.ManufacturingAssignment(id=part.created_by_id, name=part.created_by_name, role="unknown"),
+                approved_by=approved_by,
+                assigned_students=assigned_students,
+                assigned_leads=assigned_leads,
+                can_edit=can_edit,
+                can_move=can_move,
+                can_assign=can_assign,
+                student_eta_minutes=part.student_eta_minutes,
+                eta_note=part.eta_note,
+                eta_updated_at=part.eta_updated_at,
+                eta_by=eta_by,
+                eta_target=part.eta_target,
+                actual_start=part.actual_start,
+                actual_complete=part.actual_complete,
+                cad_file_name=part.cad_file_name,
+                cad_file_url=file_url(part.cad_file_path),
+                cam_file_name=part.cam_file_name,
+                cam_file_url=file_url(part.cam_file_path),
+            )
+        )
+    return serialized
@@ -1,8 +1,6 @@
 from __future__ import annotations
 import re
 from typing import Any, Iterable
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
 
 
 SCOPES = [
@@ -16,6 +14,10 @@ def _spreadsheet_id_from_url(url: str) -> str | None:
 
 
 def get_sheets_service(service_account_file: str):
+    # Deferred: the Google client stack is slow to import and only needed for a sync.
+    from google.oauth2.service_account import Credentials
+    from googleapiclient.discovery import build
+
     creds = Credentials.from_service_account_file(service_account_file, scopes=SCOPES)
     return build("sheets", "v4", credentials=creds)
 
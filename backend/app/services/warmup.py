@@ -0,0 +1,134 @@
+"""Warm-up run by a startup handler, before the server accepts connections.
+
+The first kiosk scan and board load after a restart otherwise pay for opening
+pooled connections, compiling SQL into SQLAlchemy's statement cache, reading
+SQLite pages from the SD card and spawning the password-hash workers. Here
+read-only endpoints are called in-process through the ASGI app with a token
+for an existing account, so routing, dependencies, queries and response
+serialization all run once. The scan path writes, so its lookups run directly
+in a session that is rolled back.
+"""
+from __future__ import annotations
+import inspect
+import logging
+import time
+from datetime import datetime
+from typing import Any
+from fastapi import FastAPI
+from sqlalchemy import case
+from sqlmodel import Session, select
+from .. import models
+from ..core import security
+from ..core.database import engine
+from . import attendance
+
+logger = logging.getLogger("uvicorn.error")
+
+WARM_PATHS = (
+    "/auth/me",
+    "/manufacturing/parts",
+    "/jobs/",
+    "/inventory/items/page",
+    "/me/work",
+    "/attendance/summary/today",
+    "/attendance/today_logs",
+    "/tickets/",
+    "/orders/",
+)
+
+
+def _warm_connections() -> None:
+    # Each pooled connection pays its own connect and PRAGMA cost; do it now.
+    count = min(getattr(engine.pool, "size", lambda: 1)(), 4)
+    connections = [engine.connect() for _ in range(count)]
+    try:
+        for conn in connections:
+            conn.exec_driver_sql("SELECT 1").all()
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def _warm_scan() -> None:
+    with Session(engine) as session:
+        attendance.current_block(datetime.utcnow(), session)
+        attendance.restricted_to_schedule(session)
+        session.exec(select(models.User).where(models.User.barcode_id == "")).first()
+        session.exec(select(models.User).where(models.User.student_id == "")).first()
+        attendance.find_open_entry(session, attendance.ResolvedAttendee(user=None, student_id="000000", barcode_id=None))
+        session.rollback()
+
+
+def _warm_token() -> str | None:
+    with Session(engine) as session:
+        user = session.exec(
+            select(models.User)
+            .where(models.User.is_active == True)  # noqa: E712
+            .order_by(case((models.User.role == models.Role.admin, 0), (models.User.role == models.Role.lead, 1), else_=2))
+            .limit(1)
+        ).first()
+    if user is None:
+        return None
+    return security.create_access_token(str(user.id), [user.role.value])
+
+
+async def _get(app: FastAPI, path: str, token: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"warmup"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+    }
+    status = 0
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(app: FastAPI) -> dict[str, Any]:
+    """Warm everything up; failures are logged and never block startup."""
+    began = time.perf_counter()
+    report: dict[str, Any] = {"steps": {}, "failed": []}
+
+    async def step(name: str, fn, *args) -> Any:
+        started = time.perf_counter()
+        try:
+            result = fn(*args)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as exc:  # noqa: BLE001 - warm-up is best effort
+            report["failed"].append(f"{name}: {exc!r}")
+            result = None
+        report["steps"][name] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    await step("connections", _warm_connections)
+    await step("scan", _warm_scan)
+    await step("password_pool", security.warm_password_pool)
+    token = await step("token", _warm_token)
+    if token:
+        for path in WARM_PATHS:
+            status = await step(path, _get, app, path, token)
+            if status and status != 200:
+                report["failed"].append(f"{path}: HTTP {status}")
+    report["ms"] = round((time.perf_counter() - began) * 1000, 1)
+    logger.info("Warm-up finished in %.0f ms%s", report["ms"], f" ({len(report['failed'])} failed)" if report["failed"] else "")
+    for failure in report["failed"]:
+        logger.warning("Warm-up: %s", failure)
+    return report
@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point the app at a scratch database first.
+_scratch = tempfile.mkdtemp(prefix="robotics-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_scratch}/test.db",
+    UPLOAD_ROOT=f"{_scratch}/uploads",
+    SECRET_KEY="test-secret",
+    PASSWORD_HASH_WORKERS="0",
+    PASSWORD_HASH_AUTOTUNE="false",
+    WARMUP_ENABLED="false",
+    RATE_LIMIT_ENABLED="false",
+)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    client.post(
+        "/auth/register",
+        json={"email": "admin@example.com", "full_name": "Admin", "role": "admin", "password": "pw"},
+    )
+    response = client.post("/auth/login", data={"username": "admin@example.com", "password": "pw"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,78 @@
+from passlib.context import CryptContext
+from app.core.config import Settings
+from app.core.hashing import BCRYPT_MIN_ROUNDS, policy_from_settings
+
+
+def _login(client, email, password):
+    return client.post("/auth/login", data={"username": email, "password": password})
+
+
+def test_created_user_can_log_in_and_change_password(client, admin_headers):
+    created = client.post(
+        "/auth/create",
+        json={"email": "Student@Example.com", "full_name": "Student", "role": "student", "password": "first"},
+        headers=admin_headers,
+    )
+    assert created.status_code == 200
+    assert created.json()["email"] == "student@example.com"
+    assert client.post(
+        "/auth/create",
+        json={"email": "student@example.com", "full_name": "Again", "role": "student", "password": "x"},
+        headers=admin_headers,
+    ).status_code == 409
+
+    assert _login(client, "student@example.com", "wrong").status_code == 401
+    tokens = _login(client, "student@example.com", "first").json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    updated = client.patch("/auth/me", json={"full_name": "Renamed", "password": "second"}, headers=headers)
+    assert updated.json()["full_name"] == "Renamed"
+    assert _login(client, "student@example.com", "first").status_code == 401
+    assert _login(client, "student@example.com", "second").status_code == 200
+
+
+def test_admin_update_resets_password(client, admin_headers):
+    user = client.post(
+        "/auth/create",
+        json={"email": "lead@example.com", "full_name": "Lead", "role": "lead", "password": "old"},
+        headers=admin_headers,
+    ).json()
+    response = client.patch(f"/auth/users/{user['id']}", json={"password": "new"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert _login(client, "lead@example.com", "new").status_code == 200
+    assert client.patch("/auth/users/999999", json={"password": "x"}, headers=admin_headers).status_code == 404
+
+
+def test_account_request_rejects_duplicates(client):
+    body = {"email": "new@example.com", "full_name": "New", "password": "pw", "requested_role": "student"}
+    assert client.post("/auth/request", json=body).status_code == 200
+    assert client.post("/auth/request", json=body).status_code == 409
+
+
+def test_metrics_report_hash_queue(client, admin_headers):
+    assert "password_hash_pending 0" in client.get("/metrics", headers=admin_headers).text
+
+
+def test_json_import_reports_non_string_email_per_row(client, admin_headers):
+    rows = (
+        '[{"email": 123, "full_name": "Number", "password": "pw"},'
+        ' {"email": ["x@example.com"], "full_name": "List", "password": "pw"},'
+        ' {"email": "json@example.com", "full_name": "Valid", "password": "pw"}]'
+    )
+    response = client.post(
+        "/auth/users/import",
+        files={"file": ("users.json", rows.encode("utf-8"), "application/json")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [user["email"] for user in result["created"]] == ["json@example.com"]
+    assert [(error["row"], error["email"]) for error in result["errors"]] == [(1, "123"), (2, "['x@example.com']")]
+
+
+def test_low_bcrypt_rounds_are_raised_to_the_floor():
+    policy = policy_from_settings(Settings(password_bcrypt_rounds=4, password_hash_autotune=False))
+    assert policy.cost == BCRYPT_MIN_ROUNDS
+    kwargs = policy.context_kwargs()
+    assert kwargs["bcrypt__min_rounds"] <= kwargs["bcrypt__default_rounds"] <= kwargs["bcrypt__max_rounds"]
+    CryptContext(**kwargs)
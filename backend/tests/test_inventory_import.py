@@ -0,0 +1,50 @@
+FULL_HEADER = "part_name,part_type,sku,location,quantity,unit_cost,reorder_threshold,vendor_name,tags,vendor_link\n"
+REQUIRED_HEADER = "part_name,part_type,sku,location,quantity,unit_cost,reorder_threshold\n"
+
+
+def _import(client, headers, body, **params):
+    return client.post(
+        "/inventory/items/import",
+        params=params,
+        files={"file": ("inventory.csv", body.encode("utf-8"), "text/csv")},
+        headers=headers,
+    )
+
+
+def _by_sku(client, headers, sku):
+    return next(item for item in client.get("/inventory/items", headers=headers).json() if item["sku"] == sku)
+
+
+def test_reimport_from_narrower_sheet_keeps_missing_columns(client, admin_headers):
+    full = FULL_HEADER + "Socket head cap screw,cots,NARROW-1,Bin 1,50,0.12,10,McMaster,fastener,https://mcmaster.com/x\n"
+    assert _import(client, admin_headers, full).json()["inserted"] == 1
+
+    narrow = REQUIRED_HEADER + "Socket head cap screw M3,cots,NARROW-1,Bin 2,40,0.15,12\n"
+    result = _import(client, admin_headers, narrow).json()
+    assert (result["inserted"], result["updated"], result["error_count"]) == (0, 1, 0)
+
+    item = _by_sku(client, admin_headers, "NARROW-1")
+    assert item["part_name"] == "Socket head cap screw M3"
+    assert item["location"] == "Bin 2"
+    assert item["quantity"] == 40
+    assert item["tags"] == "fastener"
+    assert item["vendor_name"] == "McMaster"
+    assert item["vendor_link"] == "https://mcmaster.com/x"
+
+
+def test_reimport_overwrites_columns_the_sheet_carries(client, admin_headers):
+    _import(client, admin_headers, FULL_HEADER + "Nut,custom,WIDE-1,Bin 1,5,,,,fastener,\n")
+    _import(client, admin_headers, FULL_HEADER + "Nut,custom,WIDE-1,Bin 1,5,,,,,\n")
+    assert _by_sku(client, admin_headers, "WIDE-1")["tags"] is None
+
+
+def test_dry_run_writes_nothing(client, admin_headers):
+    result = _import(client, admin_headers, REQUIRED_HEADER + "Washer,custom,DRY-1,Bin 3,5,,\n", dry_run=True).json()
+    assert (result["dry_run"], result["inserted"]) == (True, 1)
+    assert all(item["sku"] != "DRY-1" for item in client.get("/inventory/items", headers=admin_headers).json())
+
+
+def test_new_cots_item_without_vendor_column_is_reported(client, admin_headers):
+    result = _import(client, admin_headers, REQUIRED_HEADER + "Bearing,cots,NEW-COTS-1,Bin 4,2,,\n").json()
+    assert result["inserted"] == 0
+    assert [(error["row"], error["sku"]) for error in result["errors"]] == [(2, "NEW-COTS-1")]
@@ -0,0 +1,36 @@
+def test_my_work_lists_assigned_parts_with_file_urls_and_revalidates(client, admin_headers):
+    created = client.post(
+        "/manufacturing/parts",
+        json={
+            "part_name": "Intake roller",
+            "subsystem": "Intake",
+            "material": "Aluminum",
+            "quantity": 2,
+            "manufacturing_type": "manual",
+            "cad_link": "https://cad.example.com/roller",
+            "tool_type": "Lathe",
+            "dimensions": "40 x 120 mm",
+            "responsible_student": "Sam",
+        },
+        headers=admin_headers,
+    )
+    assert created.status_code == 200
+    part_id = created.json()["id"]
+    uploaded = client.post(
+        f"/manufacturing/parts/{part_id}/files",
+        files={"cad_file": ("roller.step", b"solid", "application/octet-stream")},
+        headers=admin_headers,
+    )
+    assert uploaded.json()["cad_file_url"] == f"/uploads/manufacturing/{part_id}/cad_roller.step"
+
+    response = client.get("/me/work", params={"sections": "parts"}, headers=admin_headers)
+    assert response.status_code == 200
+    [part] = [part for part in response.json()["parts"] if part["id"] == part_id]
+    assert part["cad_file_url"] == uploaded.json()["cad_file_url"]
+    assert part["can_edit"] and part["can_assign"]
+
+    etag = response.headers["ETag"]
+    revalidated = client.get(
+        "/me/work", params={"sections": "parts"}, headers={**admin_headers, "If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
@@ -21,10 +21,27 @@ export type InventoryItem = {
   updated_at: string;
 };
 
+type FacetCount = { value: string | null; count: number };
+
+type InventoryPage = {
+  items: InventoryItem[];
+  next_cursor: string | null;
+  total: number | null;
+  facets: { location: FacetCount[]; part_type: FacetCount[] } | null;
+};
+
+type LowStockItem = InventoryItem & {
+  usage_per_day: number;
+  days_left: number | null;
+  suggested_order: number;
+};
+
 type Props = {
   canEdit: boolean;
 };
 
+const PAGE_SIZE = 50;
+
 type SortKey =
   | "part_name"
   | "part_type"
@@ -52,6 +69,10 @@ const SORT_OPTIONS: Array<{ key: SortKey; label: string }> = [
 export function InventoryTab({ canEdit }: Props) {
   const { user } = useAuth();
   const [items, setItems] = useState<InventoryItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [total, setTotal] = useState(0);
+  const [locationFacets, setLocationFacets] = useState<FacetCount[]>([]);
+  const [lowStock, setLowStock] = useState<LowStockItem[]>([]);
   const [query, setQuery] = useState("");
   const [loading, setLoading] = useState(false);
   const [orderItem, setOrderItem] = useState<InventoryItem | null>(null);
@@ -66,82 +87,81 @@ export function InventoryTab({ canEdit }: Props) {
   });
   const [expandedTags, setExpandedTags] = useState<Record<number, boolean>>({});
 
-  useEffect(() => {
-    fetchItems();
-  }, []);
-
   useEffect(() => {
     if (searchTimeout.current) {
       window.clearTimeout(searchTimeout.current);
     }
     searchTimeout.current = window.setTimeout(() => {
-      fetchItems(query || undefined);
+      fetchItems();
     }, 320);
     return () => {
       if (searchTimeout.current) {
         window.clearTimeout(searchTimeout.current);
       }
     };
-  }, [query]);
+  }, [query, typeFilter, locationFilter, sort]);
+
+  useEffect(() => {
+    fetchLowStock();
+  }, []);
+
+  function pageParams(cursor?: string) {
+    // Filtering and sorting happen on the server, one page at a time.
+    const direction = sort.direction === "desc" ? "-" : "";
+    return {
+      q: query || undefined,
+      part_type: typeFilter === "all" ? undefined : typeFilter,
+      location: locationFilter === "all" ? undefined : locationFilter === "__none__" ? "" : locationFilter,
+      sort: sort.key === "part_name" ? `${direction}part_name` : `${direction}${sort.key},part_name`,
+      limit: PAGE_SIZE,
+      cursor,
+    };
+  }
 
-  async function fetchItems(search?: string) {
+  async function fetchItems() {
     setLoading(true);
     try {
-      const res = await api.get<InventoryItem[]>("/inventory/items", { params: { q: search } });
-      setItems(res.data);
+      const res = await api.get<InventoryPage>("/inventory/items/page", { params: pageParams() });
+      setItems(res.data.items);
+      setNextCursor(res.data.next_cursor);
+      setTotal(res.data.total ?? res.data.items.length);
+      setLocationFacets(res.data.facets?.location ?? []);
     } finally {
       setLoading(false);
     }
   }
 
-  function handleSearch() {
-    fetchItems(query || undefined);
+  async function fetchLowStock() {
+    const res = await api.get<LowStockItem[]>("/inventory/low-stock");
+    setLowStock(res.data);
   }
 
-  const { locations, hasUnassigned } = useMemo(() => {
-    const locationSet = new Set<string>();
-    let includeUnassigned = false;
-    items.forEach((item) => {
-      if (item.location) {
-        locationSet.add(item.location);
-      } else {
-        includeUnassigned = true;
-      }
-    });
-    return {
-      locations: Array.from(locationSet).sort((a, b) => a.localeCompare(b)),
-      hasUnassigned: includeUnassigned,
-    };
-  }, [items]);
-
-  const filteredItems = useMemo(() => {
-    const filtered = items.filter((item) => {
-      const currentType = item.part_type ?? "custom";
-      if (typeFilter !== "all" && currentType !== typeFilter) {
-        return false;
-      }
-      if (locationFilter !== "all") {
-        if (locationFilter === "__none__") {
-          if (item.location) return false;
-        } else if (item.location !== locationFilter) {
-          return false;
-        }
-      }
-      return true;
-    });
+  async function loadMore() {
+    if (!nextCursor) return;
+    setLoading(true);
+    try {
+      const res = await api.get<InventoryPage>("/inventory/items/page", { params: pageParams(nextCursor) });
+      setItems((prev) => [...prev, ...res.data.items]);
+      setNextCursor(res.data.next_cursor);
+    } finally {
+      setLoading(false);
+    }
+  }
 
-    const sorted = [...filtered].sort((a, b) => {
-      const multiplier = sort.direction === "asc" ? 1 : -1;
-      const aValue = sortableValue(a, sort.key);
-      const bValue = sortableValue(b, sort.key);
-      if (typeof aValue === "number" && typeof bValue === "number") {
-        return (aValue - bValue) * multiplier;
-      }
-      return String(aValue).localeCompare(String(bValue)) * multiplier;
-    });
+  function handleSearch() {
+    fetchItems();
+  }
 
-    return sorted;
-  }, [items, typeFilter, locationFilter, sort]);
+  const { locations, hasUnassigned } = useMemo(
+    () => ({
+      locations: locationFacets
+        .map((facet) => facet.value)
+        .filter((value): value is string => Boolean(value))
+        .sort((a, b) => a.localeCompare(b)),
+      hasUnassigned: locationFacets.some((facet) => facet.value === null),
+    }),
+    [locationFacets],
+  );
 
   const updateSortKey = (key: SortKey) => {
     setSort((prev) => ({ key, direction: prev.key === key ? prev.direction : "asc" }));
@@ -152,17 +172,18 @@ export function InventoryTab({ canEdit }: Props) {
   };
 
   async function adjust(itemId: number, delta: number) {
-    await api.post(`/inventory/items/${itemId}/adjust`, { delta, reason: "manual" });
-    fetchItems(query || undefined);
+    const res = await api.post<InventoryItem>(`/inventory/items/${itemId}/adjust`, { delta, reason: "manual" });
+    setItems((prev) => prev.map((item) => (item.id === itemId ? res.data : item)));
+    fetchLowStock();
   }
 
   async function remove(itemId: number) {
     if (!window.confirm("Delete this inventory item?")) return;
     await api.delete(`/inventory/items/${itemId}`);
-    fetchItems(query || undefined);
+    fetchItems();
   }
 
-  const emptyState = !loading && filteredItems.length === 0;
+  const emptyState = !loading && items.length === 0;
 
   const handleInventoryImport = async (rows: CsvRecord[], range?: { start: number; end: number }) => {
     const failures: string[] = [];
@@ -178,7 +199,7 @@ export function InventoryTab({ canEdit }: Props) {
       }
     }
     if (created) {
-      await fetchItems(query || undefined);
+      await fetchItems();
     }
     if (failures.length) {
       throw new Error(
@@ -201,7 +222,7 @@ export function InventoryTab({ canEdit }: Props) {
         <AddItemModal
           onClose={() => setAddModalOpen(false)}
           onCreated={async () => {
-            await fetchItems(query || undefined);
+            await fetchItems();
             setAddModalOpen(false);
           }}
         />
@@ -211,7 +232,7 @@ export function InventoryTab({ canEdit }: Props) {
           item={editingItem}
           onClose={() => setEditingItem(null)}
           onSaved={async () => {
-            await fetchItems(query || undefined);
+            await fetchItems();
             setEditingItem(null);
           }}
           onDeleted={async () => {
@@ -233,12 +254,65 @@ export function InventoryTab({ canEdit }: Props) {
         }}
       />
 
+      {lowStock.length > 0 && (
+        <div className="card inventory-table-card">
+          <div className="inventory-table-card__head">
+            <div>
+              <h3>Low stock</h3>
+              <p>
+                {lowStock.length} item{lowStock.length === 1 ? "" : "s"} at or below the reorder threshold, soonest to
+                run out first.
+              </p>
+            </div>
+          </div>
+          <div className="table-scroll">
+            <table>
+              <thead>
+                <tr>
+                  <th>Name</th>
+                  <th>Location</th>
+                  <th>Qty</th>
+                  <th>Use / day</th>
+                  <th>Days left</th>
+                  <th>Suggested order</th>
+                  <th className="table-actions">Actions</th>
+                </tr>
+              </thead>
+              <tbody>
+                {lowStock.map((item) => (
+                  <tr key={item.id}>
+                    <td title={item.part_name}>
+                      <strong>{item.part_name}</strong>
+                    </td>
+                    <td className="inventory-meta">{item.location ?? "Unassigned"}</td>
+                    <td>
+                      <div className="inventory-qty">
+                        <span className="low">{item.quantity}</span>
+                        <small>Reorder @ {item.reorder_threshold}</small>
+                      </div>
+                    </td>
+                    <td className="inventory-meta">{item.usage_per_day > 0 ? item.usage_per_day.toFixed(2) : "—"}</td>
+                    <td className="inventory-meta">{item.days_left ?? "—"}</td>
+                    <td>{item.suggested_order}</td>
+                    <td className="table-actions inventory-actions">
+                      <button type="button" onClick={() => setOrderItem(item)}>
+                        Submit order
+                      </button>
+                    </td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        </div>
+      )}
+
       <div className="card inventory-table-card">
         <div className="inventory-table-card__head">
           <div>
             <h3>Inventory</h3>
             <p>
-              Showing {filteredItems.length} of {items.length} items
+              Showing {items.length} of {total} items
             </p>
           </div>
           <div className="inventory-table-card__headActions">
@@ -267,7 +341,15 @@ export function InventoryTab({ canEdit }: Props) {
               <button className="button-primary" type="button" onClick={handleSearch} disabled={loading}>
                 Search
               </button>
-              <button className="refresh-btn" type="button" onClick={() => fetchItems(query || undefined)} disabled={loading}>
+              <button
+                className="refresh-btn"
+                type="button"
+                onClick={() => {
+                  fetchItems();
+                  fetchLowStock();
+                }}
+                disabled={loading}
+              >
                 Refresh
               </button>
             </div>
@@ -329,7 +411,7 @@ export function InventoryTab({ canEdit }: Props) {
               </tr>
             </thead>
             <tbody>
-              {filteredItems.map((item) => {
+              {items.map((item) => {
                 const partType = item.part_type ?? "custom";
                 const lowOnHand =
                   typeof item.reorder_threshold === "number" && item.reorder_threshold >= 0
@@ -427,6 +509,13 @@ export function InventoryTab({ canEdit }: Props) {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+          <div style={{ textAlign: "center", padding: "0.75rem" }}>
+            <button type="button" className="refresh-btn" onClick={loadMore} disabled={loading}>
+              Load more
+            </button>
+          </div>
+        )}
       </div>
     </section>
   );
@@ -943,15 +1032,3 @@ function QuickOrderModal({
     </div>
   );
 }
-
-function sortableValue(item: InventoryItem, key: SortKey): string | number {
-  switch (key) {
-    case "quantity":
-    case "reorder_threshold":
-      return item[key] ?? 0;
-    case "updated_at":
-      return new Date(item.updated_at).getTime();
-    default:
-      return (item[key] as string | null) ?? "";
-  }
-}